@@ -0,0 +1,84 @@
+"""Стоимость выбора хендлеров на один update: линейный can_handle vs RoutingTable.
+
+Запуск: PYTHONPATH=. python benchmarks/routing.py
+"""
+
+import timeit
+
+from bot.handlers import get_handlers
+from bot.handlers.tools.handler import Handler, HandlerStatus
+from bot.routing import RoutingTable
+
+
+class SyntheticCommand(Handler):
+    update_kinds = ("message",)
+    states = (None,)
+
+    def __init__(self, number: int) -> None:
+        self._text = f"/command_{number}"
+        self.texts = (self._text,)
+
+    def can_handle(self, update, state, data_json, storage, messenger) -> bool:
+        return (
+            state is None
+            and "message" in update
+            and "text" in update["message"]
+            and update["message"]["text"] == self._text
+        )
+
+    async def handle(self, update, state, data_json, storage, messenger):
+        return HandlerStatus.STOP
+
+
+UPDATES = [
+    {
+        "update_id": 1,
+        "message": {"from": {"id": 1}, "chat": {"id": 1}, "text": "/help"},
+    },
+    {
+        "update_id": 2,
+        "callback_query": {
+            "id": "cb",
+            "from": {"id": 1},
+            "message": {"message_id": 1, "chat": {"id": 1}},
+            "data": "task_done:1",
+        },
+    },
+]
+
+
+def linear(handlers: list[Handler], update: dict) -> list[Handler]:
+    return [h for h in handlers if h.can_handle(update, None, {}, None, None)]
+
+
+def routed(routes: RoutingTable, update: dict) -> list[Handler]:
+    return [
+        h
+        for h in routes.candidates(update, None)
+        if h.can_handle(update, None, {}, None, None)
+    ]
+
+
+def main() -> None:
+    number = 20_000
+    print(f"{'handlers':>10} {'linear, µs':>12} {'routed, µs':>12}")
+    for extra in (0, 16, 64, 256, 1024):
+        handlers = get_handlers() + [SyntheticCommand(i) for i in range(extra)]
+        routes = RoutingTable(handlers)
+
+        linear_s = timeit.timeit(
+            lambda: [linear(handlers, u) for u in UPDATES], number=number
+        )
+        routed_s = timeit.timeit(
+            lambda: [routed(routes, u) for u in UPDATES], number=number
+        )
+        per_update = number * len(UPDATES)
+        print(
+            f"{len(handlers):>10} "
+            f"{linear_s / per_update * 1e6:>12.2f} "
+            f"{routed_s / per_update * 1e6:>12.2f}"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,146 @@
+"""EXPLAIN горячих запросов к tasks/user_settings на синтетических данных.
+
+Схема создаётся миграциями в отдельной схеме bench (основные таблицы не
+трогаются), заполняется generate_series и удаляется в конце. Скрипт падает
+с ненулевым кодом, если в плане какого-то запроса есть Seq Scan.
+
+Запуск: PYTHONPATH=. python benchmarks/task_queries.py [число задач]
+Нужны те же POSTGRES_* переменные, что и боту.
+"""
+
+import asyncio
+import json
+import os
+import sys
+import time
+from datetime import UTC, date, datetime, time as dt_time, timedelta
+
+import asyncpg
+from dotenv import load_dotenv
+
+from bot.infrastructure.migrations import MIGRATIONS
+from bot.infrastructure.queries import QUERIES
+
+SCHEMA = "bench"
+USERS = 100_000
+DEFAULT_TASKS = 10_000_000
+
+# Даты и время раскладываются по ~60 дням и всем минутам суток; 70% задач
+# закрыты, у 10% нет даты, по прошедшим дням напоминания уже отправлены.
+SEED = [
+    # Без этого каждая строка сида шлёт pg_notify в task_changes.
+    "ALTER TABLE tasks DISABLE TRIGGER tasks_notify_change",
+    f"""
+    INSERT INTO users (telegram_id)
+    SELECT g FROM generate_series(1, {USERS}) AS g
+    """,
+    f"""
+    INSERT INTO user_settings (telegram_id, morning_digest_time, evening_review_time)
+    SELECT g,
+           TIME '06:00' + (g % 240) * INTERVAL '1 minute',
+           TIME '19:00' + (g % 240) * INTERVAL '1 minute'
+    FROM generate_series(1, {USERS}) AS g
+    """,
+    """
+    INSERT INTO tasks (telegram_id, text, task_date, task_time, status, notified, due_at)
+    SELECT t.telegram_id, 'task ' || t.g, t.task_date, t.task_time,
+           t.status,
+           COALESCE(t.status <> 'active' OR t.task_date < CURRENT_DATE, FALSE),
+           task_due_at(t.telegram_id, t.task_date, t.task_time)
+    FROM (
+        SELECT g,
+               1 + g % {users} AS telegram_id,
+               CASE WHEN g % 10 = 0 THEN NULL
+                    ELSE CURRENT_DATE + (g % 60 - 30) END AS task_date,
+               CASE WHEN g % 3 = 0 THEN NULL
+                    ELSE TIME '00:00' + (g % 1440) * INTERVAL '1 minute' END AS task_time,
+               CASE WHEN g % 10 < 7 THEN 'done' ELSE 'active' END AS status
+        FROM generate_series(1, $1::int) AS g
+    ) AS t
+    """,
+    "ALTER TABLE tasks ENABLE TRIGGER tasks_notify_change",
+    "ANALYZE",
+]
+
+# Запросы берутся из реестра StoragePostgres, параметры — типичные.
+TODAY = date.today()
+CASES = {
+    "get_tasks_by_filter:show_today": [42],
+    "get_tasks_by_filter:show_nodate": [42],
+    "get_tasks_page:show_nodate:after": [42, dt_time(12, 0), 0, 11],
+    # Горизонт напоминаний: ближайший час.
+    "get_due_tasks": [datetime.now(UTC) + timedelta(hours=1)],
+    "get_scheduled_digests:morning_digest_time": [
+        ["Europe/Moscow"],
+        [dt_time(8, 59)],
+        [dt_time(9, 0)],
+        [TODAY],
+        [TODAY],
+        False,
+    ],
+}
+
+
+def collect_nodes(plan: dict) -> list[dict]:
+    nodes = [plan]
+    for child in plan.get("Plans", []):
+        nodes.extend(collect_nodes(child))
+    return nodes
+
+
+async def main() -> int:
+    load_dotenv()
+    tasks_count = int(sys.argv[1]) if len(sys.argv) > 1 else DEFAULT_TASKS
+
+    conn = await asyncpg.connect(
+        host=os.getenv("POSTGRES_HOST"),
+        port=int(os.getenv("POSTGRES_HOST_PORT")),
+        user=os.getenv("POSTGRES_USER"),
+        password=os.getenv("POSTGRES_PASSWORD"),
+        database=os.getenv("POSTGRES_DATABASE"),
+    )
+    failed = 0
+    try:
+        await conn.execute(f"DROP SCHEMA IF EXISTS {SCHEMA} CASCADE")
+        await conn.execute(f"CREATE SCHEMA {SCHEMA}")
+        await conn.execute(f"SET search_path TO {SCHEMA}")
+        for _, _, statements in MIGRATIONS:
+            for statement in statements:
+                await conn.execute(statement)
+
+        start = time.time()
+        for statement in SEED:
+            if "$1" in statement:
+                await conn.execute(statement.format(users=USERS), tasks_count)
+            else:
+                await conn.execute(statement)
+        print(f"seeded {tasks_count} tasks in {time.time() - start:.1f}s\n")
+
+        for name, params in CASES.items():
+            raw = await conn.fetchval(
+                f"EXPLAIN (ANALYZE, FORMAT JSON) {QUERIES[name]}", *params
+            )
+            plan = json.loads(raw)[0]
+            nodes = collect_nodes(plan["Plan"])
+            scans = sorted(
+                {
+                    f"{n['Node Type']}({n.get('Index Name') or n.get('Relation Name')})"
+                    for n in nodes
+                    if "Scan" in n["Node Type"]
+                }
+            )
+            seq_scan = any(n["Node Type"] == "Seq Scan" for n in nodes)
+            failed += seq_scan
+            print(
+                f"{'✗' if seq_scan else '✓'} {name:<46} "
+                f"{plan['Execution Time']:>9.2f}ms  {', '.join(scans)}"
+            )
+    finally:
+        await conn.execute(f"DROP SCHEMA IF EXISTS {SCHEMA} CASCADE")
+        await conn.close()
+
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(asyncio.run(main()))
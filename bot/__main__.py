@@ -1,27 +1,88 @@
+import asyncio
+import os
+from datetime import timedelta
+
+import bot.long_polling
 from bot.dispatcher import Dispatcher
-from bot.handlers import get_handlers
 from bot.domain.messenger import Messenger
 from bot.domain.storage import Storage
+from bot.handlers import get_handlers
 from bot.infrastructure.messenger_telegram import MessengerTelegram
 from bot.infrastructure.storage_postgres import StoragePostgres
-from bot.notifier import start_notifier
-import bot.long_polling
-import asyncio
+from bot.notifier import run_notifier_as_leader
+from bot.update_log_writer import UpdateLogWriter
+from bot.update_offset_tracker import UpdateOffsetTracker
+from bot.webhook import start_webhook
 
 
 async def main() -> None:
-    storage: Storage = StoragePostgres()
+    compact_update_json = os.getenv("TELEGRAM_UPDATES_COMPACT_JSON", "false") == "true"
+    storage: Storage = StoragePostgres(compact_update_json=compact_update_json)
     messenger: Messenger = MessengerTelegram()
+    update_log_writer = UpdateLogWriter(
+        storage,
+        batch_size=int(os.getenv("UPDATE_LOG_BATCH_SIZE", "200")),
+        flush_interval_ms=int(os.getenv("UPDATE_LOG_FLUSH_INTERVAL_MS", "500")),
+        max_buffer_size=int(os.getenv("UPDATE_LOG_MAX_BUFFER_SIZE", "10000")),
+    )
+    offset_tracker = UpdateOffsetTracker(
+        storage,
+        checkpoint_interval_ms=int(os.getenv("UPDATE_OFFSET_CHECKPOINT_MS", "1000")),
+        dedup_window=int(os.getenv("UPDATE_DEDUP_WINDOW", "10000")),
+    )
     try:
+        update_log_writer.start()
+        offset_tracker.start()
+
         dispatcher = Dispatcher(storage, messenger)
-        dispatcher.add_handlers(*get_handlers())
+        dispatcher.add_handlers(*get_handlers(update_log_writer))
 
-        asyncio.create_task(start_notifier(storage, messenger))
+        # NOTIFIER_EMBEDDED=false — notifier запускается отдельно:
+        # python -m bot.run_notifier
+        if os.getenv("NOTIFIER_EMBEDDED", "true") == "true":
+            asyncio.create_task(
+                run_notifier_as_leader(
+                    storage,
+                    messenger,
+                    max_concurrency=int(os.getenv("NOTIFIER_MAX_CONCURRENCY", "32")),
+                    check_interval=float(
+                        os.getenv("NOTIFIER_LEADER_CHECK_INTERVAL", "5")
+                    ),
+                    catch_up=timedelta(
+                        minutes=int(os.getenv("DIGEST_CATCH_UP_MINUTES", "60"))
+                    ),
+                    compact_digests=os.getenv("DIGEST_COMPACT", "true") == "true",
+                )
+            )
 
-        await bot.long_polling.start_long_polling(dispatcher, messenger)
+        max_concurrency = int(os.getenv("DISPATCH_MAX_CONCURRENCY", "16"))
+        if os.getenv("BOT_MODE", "polling") == "webhook":
+            await start_webhook(
+                dispatcher,
+                messenger,
+                url=os.environ["WEBHOOK_URL"],
+                secret_token=os.getenv("WEBHOOK_SECRET_TOKEN") or None,
+                host=os.getenv("WEBHOOK_HOST", "0.0.0.0"),
+                port=int(os.getenv("WEBHOOK_PORT", "8080")),
+                path=os.getenv("WEBHOOK_PATH", "/webhook"),
+                max_concurrency=max_concurrency,
+                queue_size=int(os.getenv("UPDATE_QUEUE_SIZE", "1000")),
+                offset_tracker=offset_tracker,
+            )
+        else:
+            await bot.long_polling.start_long_polling(
+                dispatcher,
+                messenger,
+                max_concurrency=max_concurrency,
+                timeout=int(os.getenv("LONG_POLLING_TIMEOUT", "30")),
+                batch_size=int(os.getenv("LONG_POLLING_BATCH_SIZE", "100")),
+                offset_tracker=offset_tracker,
+            )
     except KeyboardInterrupt:
         print("\nBye!")
     finally:
+        await offset_tracker.close()
+        await update_log_writer.close()
         if hasattr(messenger, "close"):
             await messenger.close()
         if hasattr(storage, "close"):
@@ -1,9 +1,11 @@
-from bot.handlers.tools.handler import Handler, HandlerStatus
-import json
 import logging
 import time
+
 from bot.domain.messenger import Messenger
 from bot.domain.storage import Storage
+from bot.handlers.tools.handler import Handler, HandlerStatus
+from bot.routing import RoutingTable
+from bot.user_context import UserContext
 
 logger = logging.getLogger(__name__)
 logging.basicConfig(
@@ -16,12 +18,23 @@ logging.basicConfig(
 class Dispatcher:
     def __init__(self, storage: Storage, messenger: Messenger):
         self._handlers: list[Handler] = []
+        self._routes: RoutingTable = RoutingTable([])
         self._storage: Storage = storage
         self._messenger: Messenger = messenger
 
     def add_handlers(self, *handlers: list[Handler]) -> None:
         for handler in handlers:
             self._handlers.append(handler)
+        self._routes = RoutingTable(self._handlers)
+
+    def get_allowed_updates(self) -> list[str]:
+        # Список строится по хендлерам, которые обрабатывают updates.
+        # Хендлер без update_kinds (DatabaseLogger) только пишет то, что
+        # пришло, и не расширяет список. Передавать его нужно всегда: без
+        # allowed_updates Telegram оставляет список из прошлого вызова.
+        return sorted(
+            {kind for h in self._handlers if h.update_kinds for kind in h.update_kinds}
+        )
 
     def _get_telegram_id_from_update(self, update: dict) -> int | None:
         if "message" in update:
@@ -39,32 +52,34 @@ class Dispatcher:
             telegram_id = self._get_telegram_id_from_update(update)
             user = await self._storage.get_user(telegram_id) if telegram_id else None
 
-            user_state = user.get("state") if user else None
-            data_json_str = user.get("data_json") if user else "{}"
-
-            if data_json_str is None:
-                data_json_str = "{}"
-
-            data_json = json.loads(data_json_str)
+            context = (
+                UserContext(self._storage, telegram_id, user) if telegram_id else None
+            )
+            storage = context if context is not None else self._storage
+            user_state = context.state if context is not None else None
+            data_json = context.data if context is not None else {}
 
-            for handler in self._handlers:
+            for handler in self._routes.candidates(update, user_state):
                 if handler.can_handle(
                     update,
                     user_state,
                     data_json,
-                    self._storage,
+                    storage,
                     self._messenger,
                 ):
                     signal = await handler.handle(
                         update,
                         user_state,
                         data_json,
-                        self._storage,
+                        storage,
                         self._messenger,
                     )
                     if signal == HandlerStatus.STOP:
                         break
 
+            if context is not None:
+                await context.flush()
+
             duration_ms = (time.time() - start_time) * 1000
             logger.info(
                 f"[DISPATCH {update_id}] ← dispatch finished - {duration_ms:.2f}ms\n"
@@ -1,4 +1,52 @@
 from abc import ABC, abstractmethod
+from contextvars import ContextVar
+from enum import Enum
+
+
+class MessagePriority(Enum):
+    INTERACTIVE = 1
+    BULK = 2
+
+
+# Приоритет исходящих запросов для текущей asyncio-задачи: ответы пользователю
+# идут вне очереди, рассылки нотификатора помечают себя как BULK.
+message_priority: ContextVar[MessagePriority] = ContextVar(
+    "message_priority", default=MessagePriority.INTERACTIVE
+)
+
+
+class MessengerError(Exception):
+    def __init__(
+        self, method: str, description: str, error_code: int | None = None
+    ) -> None:
+        super().__init__(f"{method}: {description}")
+        self.method = method
+        self.description = description
+        self.error_code = error_code
+
+
+class MessengerRequestError(MessengerError):
+    """Запрос отклонён (4xx) — повтор не поможет."""
+
+
+class MessengerRateLimitError(MessengerError):
+    def __init__(
+        self, method: str, description: str, retry_after: float, error_code: int = 429
+    ) -> None:
+        super().__init__(method, description, error_code)
+        self.retry_after = retry_after
+
+
+class MessengerServerError(MessengerError):
+    """Ошибка на стороне API (5xx)."""
+
+
+class MessengerNetworkError(MessengerError):
+    """Соединение не удалось или оборвалось."""
+
+
+class MessengerConnectError(MessengerNetworkError):
+    """Соединение не установлено — запрос точно не дошёл до API."""
 
 
 class Messenger(ABC):
@@ -8,6 +56,12 @@ class Messenger(ABC):
     @abstractmethod
     async def get_updates(self, **params) -> dict: ...
 
+    @abstractmethod
+    async def set_webhook(self, url: str, **params) -> dict: ...
+
+    @abstractmethod
+    async def delete_webhook(self, **params) -> dict: ...
+
     @abstractmethod
     async def answer_callback_query(self, callback_query_id: str, **params) -> dict: ...
 
@@ -1,13 +1,27 @@
 from abc import ABC, abstractmethod
+from collections.abc import Callable
+from datetime import datetime
 
 
 class Storage(ABC):
+    @abstractmethod
+    async def migrate_database(self) -> None: ...
+
     @abstractmethod
     async def recreate_database(self) -> None: ...
 
     @abstractmethod
     async def persist_update(self, update: dict) -> None: ...
 
+    @abstractmethod
+    async def persist_updates(self, updates: list[dict]) -> None: ...
+
+    @abstractmethod
+    async def get_update_offset(self) -> int: ...
+
+    @abstractmethod
+    async def save_update_offset(self, last_update_id: int) -> None: ...
+
     @abstractmethod
     async def ensure_user_exists(self, telegram_id: int) -> None: ...
 
@@ -23,6 +37,16 @@ class Storage(ABC):
     @abstractmethod
     async def update_user_data(self, telegram_id: int, new_data: dict) -> None: ...
 
+    @abstractmethod
+    async def merge_user_state_and_data(
+        self, telegram_id: int, state: str | None, data_patch: dict
+    ) -> None: ...
+
+    @abstractmethod
+    async def save_user_state_and_data(
+        self, telegram_id: int, state: str | None, data: dict | None
+    ) -> None: ...
+
     @abstractmethod
     async def create_task(
         self, telegram_id: int, text: str, task_date: str | None, task_time: str | None
@@ -33,33 +57,81 @@ class Storage(ABC):
         self, telegram_id: int, filter_type: str
     ) -> list[dict]: ...
 
+    @abstractmethod
+    async def get_tasks_page(
+        self,
+        telegram_id: int,
+        filter_type: str,
+        limit: int,
+        after: tuple[str, int] | None = None,
+        before: tuple[str, int] | None = None,
+    ) -> list[dict]: ...
+
     @abstractmethod
     async def get_user_settings(self, telegram_id: int) -> dict: ...
 
+    @abstractmethod
+    async def get_user_timezone(self, telegram_id: int) -> str: ...
+
+    @abstractmethod
+    async def update_user_timezone(self, telegram_id: int, timezone: str) -> None: ...
+
     @abstractmethod
     async def update_user_setting_time(
         self, telegram_id: int, setting_type: str, new_time: str
     ) -> None: ...
 
     @abstractmethod
-    async def get_due_tasks(
-        self, current_date: str, current_time: str
-    ) -> list[dict]: ...
+    async def get_due_tasks(self, until: datetime) -> list[dict]: ...
 
     @abstractmethod
-    async def mark_task_as_notified(self, task_id: int) -> None: ...
+    async def listen_task_changes(self, callback: Callable[[int], None]) -> None: ...
 
     @abstractmethod
-    async def get_users_for_time_check(
-        self, setting_type: str, current_time: str
-    ) -> list[dict]: ...
+    async def unlisten_task_changes(self) -> None: ...
+
+    @abstractmethod
+    async def try_acquire_leadership(self, name: str) -> bool: ...
+
+    @abstractmethod
+    async def check_leadership(self) -> bool: ...
 
     @abstractmethod
-    async def get_active_tasks_for_digest(
-        self, telegram_id: int, today_date: str
+    async def release_leadership(self) -> None: ...
+
+    @abstractmethod
+    async def claim_due_tasks(
+        self,
+        task_ids: list[int],
+        now: datetime,
+        lease_seconds: float,
     ) -> list[dict]: ...
 
     @abstractmethod
-    async def get_tasks_for_tomorrow(
-        self, telegram_id: int, tomorrow_date: str
+    async def extend_task_claims(
+        self, task_ids: list[int], lease_seconds: float
+    ) -> None: ...
+
+    @abstractmethod
+    async def release_task_claim(self, task_id: int) -> None: ...
+
+    @abstractmethod
+    async def mark_tasks_as_notified(self, task_ids: list[int]) -> None: ...
+
+    @abstractmethod
+    async def update_tasks_status(
+        self, task_ids: list[int], new_status: str
+    ) -> None: ...
+
+    @abstractmethod
+    async def get_scheduled_digests(
+        self,
+        setting_type: str,
+        windows: list[dict],
+        include_undated: bool = False,
     ) -> list[dict]: ...
+
+    @abstractmethod
+    async def mark_digest_sent(
+        self, setting_type: str, telegram_id: int, local_date: str
+    ) -> None: ...
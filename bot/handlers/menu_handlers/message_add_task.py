@@ -1,10 +1,13 @@
-from bot.handlers.tools.handler import Handler, HandlerStatus
 from bot.domain.messenger import Messenger
 from bot.domain.storage import Storage
+from bot.handlers.tools.handler import Handler, HandlerStatus
 from bot.interface.keyboards import REMOVE_KEYBOARD
 
 
 class MessageAddTask(Handler):
+    update_kinds = ("message",)
+    states = (None,)
+    texts = ("➕ Добавить задачу",)
 
     def can_handle(
         self,
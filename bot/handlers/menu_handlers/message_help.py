@@ -1,9 +1,12 @@
-from bot.handlers.tools.handler import Handler, HandlerStatus
 from bot.domain.messenger import Messenger
 from bot.domain.storage import Storage
+from bot.handlers.tools.handler import Handler, HandlerStatus
 
 
 class MessageHelp(Handler):
+    update_kinds = ("message",)
+    states = (None,)
+    texts = ("❓ Помощь", "/help")
 
     def can_handle(
         self,
@@ -1,10 +1,14 @@
-from bot.handlers.tools.handler import Handler, HandlerStatus
 from bot.domain.messenger import Messenger
 from bot.domain.storage import Storage
+from bot.handlers.tools.handler import Handler, HandlerStatus
 from bot.interface.keyboards import SETTINGS_KEYBOARD
+from bot.timezones import DEFAULT_TIMEZONE, SUPPORTED_TIMEZONES
 
 
 class MessageSettings(Handler):
+    update_kinds = ("message",)
+    states = (None,)
+    texts = ("⚙️ Настройки", "/settings")
 
     def can_handle(
         self,
@@ -39,11 +43,14 @@ class MessageSettings(Handler):
         settings = await storage.get_user_settings(telegram_id)
         current_morning = settings.get("morning_digest_time", "09:00")
         current_evening = settings.get("evening_review_time", "21:00")
+        current_timezone = settings.get("timezone", DEFAULT_TIMEZONE)
+        timezone_label = SUPPORTED_TIMEZONES.get(current_timezone, current_timezone)
 
         text = (
             f"Здесь можно настроить уведомления.\n\n"
             f"• Утренний дайджест: `{current_morning}`\n"
-            f"• Вечерний обзор: `{current_evening}`"
+            f"• Вечерний обзор: `{current_evening}`\n"
+            f"• Часовой пояс: {timezone_label}"
         )
 
         await messenger.send_message(
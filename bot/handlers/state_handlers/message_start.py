@@ -1,10 +1,12 @@
-from bot.handlers.tools.handler import Handler, HandlerStatus
 from bot.domain.messenger import Messenger
 from bot.domain.storage import Storage
+from bot.handlers.tools.handler import Handler, HandlerStatus
 from bot.interface.keyboards import MAIN_MENU_KEYBOARD
 
 
 class MessageStart(Handler):
+    update_kinds = ("message",)
+    texts = ("/start",)
 
     def can_handle(
         self,
@@ -1,13 +1,16 @@
-from datetime import datetime, timedelta
-from bot.handlers.tools.handler import Handler, HandlerStatus
+from datetime import timedelta
+
 from bot.domain.messenger import Messenger
 from bot.domain.storage import Storage
+from bot.handlers.tools.handler import Handler, HandlerStatus
 from bot.handlers.tools.task_card import format_task_card_text
-from bot.interface.keyboards import MAIN_MENU_KEYBOARD
 from bot.handlers.tools.time_parser import normalize_time
+from bot.interface.keyboards import MAIN_MENU_KEYBOARD
+from bot.timezones import local_now
 
 
 class PostponeHandler(Handler):
+    states = ("WAIT_POSTPONE_TIME",)
 
     def can_handle(
         self,
@@ -47,7 +50,7 @@ class PostponeHandler(Handler):
 
         new_date = None
         new_time = None
-        now = datetime.now()
+        now = local_now(await storage.get_user_timezone(telegram_id))
 
         if "message" in update:
             text = update["message"]["text"].strip()
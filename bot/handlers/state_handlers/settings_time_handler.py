@@ -1,11 +1,13 @@
-from bot.handlers.tools.handler import Handler, HandlerStatus
 from bot.domain.messenger import Messenger
 from bot.domain.storage import Storage
-from bot.interface.keyboards import MAIN_MENU_KEYBOARD
+from bot.handlers.tools.handler import Handler, HandlerStatus
 from bot.handlers.tools.time_parser import normalize_time
+from bot.interface.keyboards import MAIN_MENU_KEYBOARD
 
 
 class SettingsTimeHandler(Handler):
+    update_kinds = ("message",)
+    states = ("WAIT_SETTING_MORNING", "WAIT_SETTING_EVENING")
 
     def can_handle(
         self,
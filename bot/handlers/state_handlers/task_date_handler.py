@@ -1,11 +1,16 @@
 import json
-from datetime import datetime, timedelta
-from bot.handlers.tools.handler import Handler, HandlerStatus
+from datetime import timedelta
+
 from bot.domain.messenger import Messenger
 from bot.domain.storage import Storage
+from bot.handlers.tools.handler import Handler, HandlerStatus
+from bot.timezones import local_now
 
 
 class TaskDateHandler(Handler):
+    update_kinds = ("callback_query",)
+    states = ("WAIT_TASK_DATE",)
+    callback_prefixes = ("set_date_",)
 
     def can_handle(
         self,
@@ -37,8 +42,9 @@ class TaskDateHandler(Handler):
 
         messenger.answer_callback_query(update["callback_query"]["id"])
 
-        today = datetime.now().strftime("%Y-%m-%d")
-        tomorrow = (datetime.now() + timedelta(days=1)).strftime("%Y-%m-%d")
+        now = local_now(await storage.get_user_timezone(telegram_id))
+        today = now.strftime("%Y-%m-%d")
+        tomorrow = (now + timedelta(days=1)).strftime("%Y-%m-%d")
 
         date_map = {
             "set_date_today": today,
@@ -1,10 +1,12 @@
-from bot.handlers.tools.handler import Handler, HandlerStatus
 from bot.domain.messenger import Messenger
 from bot.domain.storage import Storage
+from bot.handlers.tools.handler import Handler, HandlerStatus
 from bot.interface.keyboards import TASK_DATE_KEYBOARD
 
 
 class TaskNameHandler(Handler):
+    update_kinds = ("message",)
+    states = ("WAIT_TASK_NAME",)
 
     def can_handle(
         self,
@@ -1,6 +1,6 @@
-from bot.handlers.tools.handler import Handler, HandlerStatus
 from bot.domain.messenger import Messenger
 from bot.domain.storage import Storage
+from bot.handlers.tools.handler import Handler, HandlerStatus
 from bot.handlers.tools.task_card import (
     format_task_card_text,
     get_task_card_reply_markup,
@@ -9,6 +9,9 @@ from bot.interface.keyboards import MAIN_MENU_KEYBOARD
 
 
 class TaskNoTimeHandler(Handler):
+    update_kinds = ("callback_query",)
+    states = ("WAIT_TASK_TIME",)
+    callback_prefixes = ("set_time_notime",)
 
     def can_handle(
         self,
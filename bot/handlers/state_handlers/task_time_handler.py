@@ -1,15 +1,17 @@
-from bot.handlers.tools.handler import Handler, HandlerStatus
 from bot.domain.messenger import Messenger
 from bot.domain.storage import Storage
+from bot.handlers.tools.handler import Handler, HandlerStatus
 from bot.handlers.tools.task_card import (
     format_task_card_text,
     get_task_card_reply_markup,
 )
-from bot.interface.keyboards import MAIN_MENU_KEYBOARD
 from bot.handlers.tools.time_parser import normalize_time
+from bot.interface.keyboards import MAIN_MENU_KEYBOARD
 
 
 class TaskTimeHandler(Handler):
+    update_kinds = ("message",)
+    states = ("WAIT_TASK_TIME",)
 
     def can_handle(
         self,
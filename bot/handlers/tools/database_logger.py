@@ -1,9 +1,13 @@
-from bot.domain.storage import Storage
 from bot.domain.messenger import Messenger
+from bot.domain.storage import Storage
 from bot.handlers.tools.handler import Handler, HandlerStatus
+from bot.update_log_writer import UpdateLogWriter
 
 
 class DatabaseLogger(Handler):
+    def __init__(self, writer: UpdateLogWriter | None = None) -> None:
+        self._writer = writer
+
     def can_handle(
         self,
         update: dict,
@@ -22,5 +26,8 @@ class DatabaseLogger(Handler):
         storage: Storage,
         messenger: Messenger,
     ) -> HandlerStatus:
-        await storage.persist_update(update)
+        if self._writer is not None:
+            await self._writer.add(update)
+        else:
+            await storage.persist_update(update)
         return HandlerStatus.CONTINUE
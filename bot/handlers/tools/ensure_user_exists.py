@@ -1,9 +1,14 @@
-from bot.handlers.tools.handler import Handler, HandlerStatus
 from bot.domain.messenger import Messenger
 from bot.domain.storage import Storage
+from bot.handlers.tools.handler import Handler, HandlerStatus
+from bot.lru_set import LRUSet
 
 
 class EnsureUserExists(Handler):
+    update_kinds = ("message", "callback_query")
+
+    def __init__(self, max_known_users: int = 100_000) -> None:
+        self._known_users = LRUSet(max_known_users)
 
     def _get_telegram_id(self, update: dict) -> int | None:
         if "message" in update:
@@ -31,6 +36,9 @@ class EnsureUserExists(Handler):
         messenger: Messenger,
     ) -> HandlerStatus:
         telegram_id = self._get_telegram_id(update)
-        if telegram_id:
+        if telegram_id in self._known_users:
+            self._known_users.add(telegram_id)
+        elif telegram_id:
             await storage.ensure_user_exists(telegram_id)
+            self._known_users.add(telegram_id)
         return HandlerStatus.CONTINUE
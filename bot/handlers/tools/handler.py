@@ -1,7 +1,8 @@
 from abc import ABC, abstractmethod
 from enum import Enum
-from bot.domain.storage import Storage
+
 from bot.domain.messenger import Messenger
+from bot.domain.storage import Storage
 
 
 class HandlerStatus(Enum):
@@ -10,6 +11,13 @@ class HandlerStatus(Enum):
 
 
 class Handler(ABC):
+    # Ключи маршрутизации для Dispatcher. None означает «любое значение»,
+    # а состояние None в states означает «пользователь без состояния».
+    update_kinds: tuple[str, ...] | None = None
+    states: tuple[str | None, ...] | None = None
+    texts: tuple[str, ...] | None = None
+    callback_prefixes: tuple[str, ...] | None = None
+
     @abstractmethod
     def can_handle(
         self,
@@ -1,9 +1,15 @@
-from bot.handlers.tools.handler import Handler, HandlerStatus
 from bot.domain.messenger import Messenger
 from bot.domain.storage import Storage
+from bot.handlers.tools.handler import Handler, HandlerStatus
+from bot.interface.keyboards import TIMEZONE_KEYBOARD
+from bot.timezones import SUPPORTED_TIMEZONES
 
 
 class SettingsCallbackHandler(Handler):
+    update_kinds = ("callback_query",)
+    states = (None,)
+    callback_prefixes = ("set_",)
+
     def can_handle(
         self,
         update: dict,
@@ -59,4 +65,22 @@ class SettingsCallbackHandler(Handler):
                 text="Введите новое время для вечернего обзора (например, 21:00):",
             )
 
+        elif callback_data == "set_timezone":
+            await messenger.edit_message_text(
+                chat_id=chat_id,
+                message_id=message_id,
+                text="Выберите часовой пояс:",
+                reply_markup=TIMEZONE_KEYBOARD,
+            )
+
+        elif callback_data.startswith("set_tz:"):
+            timezone = callback_data.removeprefix("set_tz:")
+            if timezone in SUPPORTED_TIMEZONES:
+                await storage.update_user_timezone(telegram_id, timezone)
+                await messenger.edit_message_text(
+                    chat_id=chat_id,
+                    message_id=message_id,
+                    text=f"Часовой пояс: {SUPPORTED_TIMEZONES[timezone]}",
+                )
+
         return HandlerStatus.STOP
@@ -1,6 +1,6 @@
-from bot.handlers.tools.handler import Handler, HandlerStatus
 from bot.domain.messenger import Messenger
 from bot.domain.storage import Storage
+from bot.handlers.tools.handler import Handler, HandlerStatus
 from bot.handlers.tools.task_card import (
     format_task_card_text,
     get_task_card_reply_markup,
@@ -8,6 +8,10 @@ from bot.handlers.tools.task_card import (
 
 
 class ShowTasksCallbackHandler(Handler):
+    update_kinds = ("callback_query",)
+    states = (None,)
+    callback_prefixes = ("show_",)
+
     def can_handle(
         self,
         update: dict,
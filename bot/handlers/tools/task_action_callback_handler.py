@@ -1,11 +1,19 @@
 import json
-from bot.handlers.tools.handler import Handler, HandlerStatus
+
 from bot.domain.messenger import Messenger
 from bot.domain.storage import Storage
-from bot.handlers.tools.task_card import format_task_card_text
+from bot.handlers.tools.handler import Handler, HandlerStatus
+from bot.handlers.tools.task_card import (
+    format_task_card_text,
+    get_task_card_reply_markup,
+)
 
 
 class TaskActionCallbackHandler(Handler):
+    update_kinds = ("callback_query",)
+    states = (None,)
+    callback_prefixes = ("task_",)
+
     def can_handle(
         self,
         update: dict,
@@ -41,6 +49,17 @@ class TaskActionCallbackHandler(Handler):
         except ValueError:
             return HandlerStatus.STOP
 
+        if action == "task_open":
+            task = await storage.get_task_by_id(task_id)
+            if task and task["telegram_id"] == telegram_id:
+                params = {}
+                if task["status"] == "active":
+                    params["reply_markup"] = get_task_card_reply_markup(task_id)
+                await messenger.send_message(
+                    chat_id=chat_id, text=format_task_card_text(task), **params
+                )
+            return HandlerStatus.STOP
+
         if action == "task_postpone":
             await storage.update_user_data(telegram_id, {"postpone_task_id": task_id})
             await storage.update_user_state(telegram_id, "WAIT_POSTPONE_TIME")
@@ -36,3 +36,110 @@ def get_task_card_reply_markup(task_id: int) -> str:
             ]
         }
     )
+
+
+MAX_MESSAGE_LENGTH = 4096
+MAX_LIST_BUTTONS = 50
+LIST_BUTTONS_PER_ROW = 5
+
+
+def format_task_list_messages(header: str, tasks: list[dict]) -> list[tuple[str, str]]:
+    """Список задач одним сообщением с кнопками-номерами вместо карточек.
+
+    Кнопка с номером присылает карточку задачи (task_open:{id}). Если список
+    не помещается в 4096 символов или MAX_LIST_BUTTONS кнопок, он делится на
+    несколько сообщений; нумерация сквозная.
+    """
+    messages: list[tuple[str, str]] = []
+    lines = [header]
+    buttons: list[dict] = []
+
+    def flush() -> None:
+        rows = [
+            buttons[i : i + LIST_BUTTONS_PER_ROW]
+            for i in range(0, len(buttons), LIST_BUTTONS_PER_ROW)
+        ]
+        messages.append(("\n".join(lines), json.dumps({"inline_keyboard": rows})))
+
+    for number, task in enumerate(tasks, start=1):
+        line = f"{number}. {format_task_card_text(task)}"
+        text_length = sum(len(item) + 1 for item in lines) + len(line)
+        if buttons and (
+            text_length > MAX_MESSAGE_LENGTH or len(buttons) == MAX_LIST_BUTTONS
+        ):
+            flush()
+            lines, buttons = [], []
+        used_length = sum(len(item) + 1 for item in lines)
+        lines.append(line[: MAX_MESSAGE_LENGTH - used_length])
+        buttons.append(
+            {"text": str(number), "callback_data": f"task_open:{task['id']}"}
+        )
+
+    flush()
+    return messages
+
+
+TASKS_PAGE_SIZE = 10
+TASK_LIST_TABS = {
+    "today": ("show_today", "📅 Сегодня", "📅 Задачи на сегодня"),
+    "tomorrow": ("show_tomorrow", "➡️ Завтра", "➡️ Задачи на завтра"),
+    "nodate": ("show_nodate", "📝 Без даты", "📝 Задачи без даты"),
+}
+
+
+def format_tasks_page(
+    tab: str, tasks: list[dict], has_prev: bool, has_next: bool
+) -> tuple[str, str]:
+    """Одна страница списка «Мои задачи»: текст и inline-клавиатура.
+
+    Курсор страницы — (время, id) первой или последней задачи, он кладётся
+    прямо в callback_data: tasks_page:{tab}:{p|n}:{id}:{время}.
+    """
+    _, _, title = TASK_LIST_TABS[tab]
+    lines = [f"{title}:"]
+    if not tasks:
+        lines.append("Список пуст.")
+
+    buttons: list[dict] = []
+    for number, task in enumerate(tasks, start=1):
+        lines.append(f"{number}. {format_task_card_text(task)}")
+        buttons.append(
+            {"text": str(number), "callback_data": f"task_open:{task['id']}"}
+        )
+    rows = [
+        buttons[i : i + LIST_BUTTONS_PER_ROW]
+        for i in range(0, len(buttons), LIST_BUTTONS_PER_ROW)
+    ]
+
+    navigation = []
+    if has_prev:
+        first = tasks[0]
+        navigation.append(
+            {
+                "text": "◀️",
+                "callback_data": f"tasks_page:{tab}:p:{first['id']}:"
+                f"{first.get('task_time') or '~'}",
+            }
+        )
+    if has_next:
+        last = tasks[-1]
+        navigation.append(
+            {
+                "text": "▶️",
+                "callback_data": f"tasks_page:{tab}:n:{last['id']}:"
+                f"{last.get('task_time') or '~'}",
+            }
+        )
+    if navigation:
+        rows.append(navigation)
+
+    rows.append(
+        [
+            {
+                "text": f"• {label}" if key == tab else label,
+                "callback_data": f"tasks_page:{key}",
+            }
+            for key, (_, label, _) in TASK_LIST_TABS.items()
+        ]
+    )
+    return "\n".join(lines), json.dumps({"inline_keyboard": rows})
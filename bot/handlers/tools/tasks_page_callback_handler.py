@@ -0,0 +1,108 @@
+from bot.domain.messenger import Messenger, MessengerRequestError
+from bot.domain.storage import Storage
+from bot.handlers.tools.handler import Handler, HandlerStatus
+from bot.handlers.tools.task_card import (
+    TASK_LIST_TABS,
+    TASKS_PAGE_SIZE,
+    format_tasks_page,
+)
+
+
+async def load_tasks_page(
+    storage: Storage,
+    telegram_id: int,
+    tab: str,
+    direction: str | None = None,
+    cursor: tuple[str, int] | None = None,
+) -> tuple[str, str]:
+    """Читает страницу вкладки keyset-запросом и рендерит её.
+
+    Запрашивается на одну задачу больше размера страницы — по ней видно,
+    есть ли что-то дальше в направлении листания.
+    """
+    filter_type, _, _ = TASK_LIST_TABS[tab]
+    limit = TASKS_PAGE_SIZE + 1
+
+    if direction == "p" and cursor is not None:
+        tasks = await storage.get_tasks_page(
+            telegram_id, filter_type, limit, before=cursor
+        )
+        has_prev = len(tasks) > TASKS_PAGE_SIZE
+        tasks = tasks[-TASKS_PAGE_SIZE:]
+        has_next = True
+    else:
+        after = cursor if direction == "n" else None
+        tasks = await storage.get_tasks_page(
+            telegram_id, filter_type, limit, after=after
+        )
+        has_next = len(tasks) > TASKS_PAGE_SIZE
+        tasks = tasks[:TASKS_PAGE_SIZE]
+        has_prev = after is not None
+
+    return format_tasks_page(tab, tasks, has_prev and bool(tasks), has_next)
+
+
+class TasksPageCallbackHandler(Handler):
+    update_kinds = ("callback_query",)
+    states = (None,)
+    callback_prefixes = ("tasks_page:",)
+
+    def can_handle(
+        self,
+        update: dict,
+        state: str,
+        data_json: dict,
+        storage: Storage,
+        messenger: Messenger,
+    ) -> bool:
+        return (
+            state is None
+            and "callback_query" in update
+            and update["callback_query"]["data"].startswith("tasks_page:")
+        )
+
+    async def handle(
+        self,
+        update: dict,
+        state: str,
+        data_json: dict,
+        storage: Storage,
+        messenger: Messenger,
+    ) -> HandlerStatus:
+        telegram_id = update["callback_query"]["from"]["id"]
+        chat_id = update["callback_query"]["message"]["chat"]["id"]
+        message_id = update["callback_query"]["message"]["message_id"]
+        callback_data = update["callback_query"]["data"]
+
+        await messenger.answer_callback_query(update["callback_query"]["id"])
+
+        # tasks_page:{tab}[:{p|n}:{id}:{время}] — время само содержит ':'.
+        parts = callback_data.split(":", 4)
+        tab = parts[1]
+        if tab not in TASK_LIST_TABS:
+            return HandlerStatus.STOP
+
+        direction = None
+        cursor = None
+        if len(parts) == 5:
+            try:
+                direction, cursor = parts[2], (parts[4], int(parts[3]))
+            except ValueError:
+                return HandlerStatus.STOP
+
+        text, reply_markup = await load_tasks_page(
+            storage, telegram_id, tab, direction, cursor
+        )
+        try:
+            await messenger.edit_message_text(
+                chat_id=chat_id,
+                message_id=message_id,
+                text=text,
+                reply_markup=reply_markup,
+            )
+        except MessengerRequestError as e:
+            # Повторное нажатие на текущую вкладку: Telegram отвечает 400.
+            if "message is not modified" not in e.description:
+                raise
+
+        return HandlerStatus.STOP
@@ -1,9 +1,24 @@
+import asyncio
+import logging
 import os
 import time
-import logging
+
 import aiohttp
 from dotenv import load_dotenv
-from bot.domain.messenger import Messenger
+
+from bot.domain.messenger import (
+    MessagePriority,
+    Messenger,
+    MessengerConnectError,
+    MessengerError,
+    MessengerNetworkError,
+    MessengerRateLimitError,
+    MessengerRequestError,
+    MessengerServerError,
+    message_priority,
+)
+from bot.infrastructure.rate_limiter import TelegramRateLimiter
+from bot.infrastructure.retry_policy import RetryPolicy
 
 load_dotenv()
 
@@ -15,13 +30,47 @@ logging.basicConfig(
 )
 
 
+RATE_LIMITED_METHODS = ("sendMessage", "editMessageText", "editMessageReplyMarkup")
+
+# После 5xx или обрыва соединения неизвестно, выполнил ли Telegram запрос,
+# а повтор sendMessage отправит сообщение второй раз. Такие методы повторяются
+# только после 429 и ошибок установки соединения — тогда запрос точно не
+# выполнен.
+NON_IDEMPOTENT_METHODS = ("sendMessage",)
+
+DEFAULT_RETRY_POLICIES = {
+    "interactive": RetryPolicy(max_attempts=3, max_delay=5, max_retry_after=10),
+    "bulk": RetryPolicy(max_attempts=8, max_delay=60, max_retry_after=300),
+    "polling": RetryPolicy(max_attempts=10, max_delay=30, max_retry_after=60),
+}
+
+
+def _is_safe_to_repeat(method: str, error: MessengerError) -> bool:
+    if method not in NON_IDEMPOTENT_METHODS:
+        return True
+    return isinstance(error, (MessengerRateLimitError, MessengerConnectError))
+
+
+def _call_class(method: str, priority: MessagePriority) -> str:
+    if method == "getUpdates":
+        return "polling"
+    return "bulk" if priority is MessagePriority.BULK else "interactive"
+
+
 class MessengerTelegram(Messenger):
-    def __init__(self) -> None:
+    def __init__(
+        self,
+        rate_limiter: TelegramRateLimiter | None = None,
+        retry_policies: dict[str, RetryPolicy] | None = None,
+        api_uri: str = "https://api.telegram.org",
+    ) -> None:
         self._token = os.getenv("TELEGRAM_TOKEN")
         if not self._token:
             raise ValueError("TELEGRAM_TOKEN не найден в .env")
-        self._base_uri = f"https://api.telegram.org/bot{self._token}"
+        self._base_uri = f"{api_uri}/bot{self._token}"
+        self._retry_policies = retry_policies or DEFAULT_RETRY_POLICIES
         self._session: aiohttp.ClientSession | None = None
+        self._rate_limiter = rate_limiter or TelegramRateLimiter()
 
     async def _get_session(self) -> aiohttp.ClientSession:
         if self._session is None or self._session.closed:
@@ -30,25 +79,79 @@ class MessengerTelegram(Messenger):
 
     async def _make_request(self, method: str, **params) -> dict:
         url = f"{self._base_uri}/{method}"
-        start_time = time.time()
-        logger.info(f"[HTTP] → POST {method} started")
+        chat_id = params.get("chat_id")
+        priority = message_priority.get()
+        policy = self._retry_policies[_call_class(method, priority)]
 
-        try:
-            session = await self._get_session()
-            async with session.post(url, json=params) as response:
-                response_json = await response.json()
-                assert response_json["ok"]
+        attempt = 0
+        while True:
+            attempt += 1
+            if method in RATE_LIMITED_METHODS:
+                await self._rate_limiter.acquire(chat_id, priority)
+
+            start_time = time.time()
+            logger.info(f"[HTTP] → POST {method} started")
 
+            try:
+                result = await self._post(method, url, params)
                 duration_ms = (time.time() - start_time) * 1000
                 logger.info(f"[HTTP] ← POST {method} finished - {duration_ms:.2f}ms")
-                return response_json["result"]
+                return result
 
-        except Exception as e:
-            duration_ms = (time.time() - start_time) * 1000
-            logger.error(
-                f"[HTTP] ✗ POST {method} failed - {duration_ms:.2f}ms - Error: {e}"
-            )
-            raise
+            except MessengerError as e:
+                duration_ms = (time.time() - start_time) * 1000
+                logger.error(
+                    f"[HTTP] ✗ POST {method} failed - {duration_ms:.2f}ms - Error: {e}"
+                )
+
+                delay = policy.next_delay(attempt, e)
+                if delay is None or not _is_safe_to_repeat(method, e):
+                    raise
+                if (
+                    isinstance(e, MessengerRateLimitError)
+                    and method in RATE_LIMITED_METHODS
+                ):
+                    self._rate_limiter.block(chat_id, e.retry_after)
+
+                logger.warning(
+                    f"[HTTP] ↻ POST {method} retry {attempt}/{policy.max_attempts - 1} "
+                    f"in {delay:.2f}s"
+                )
+                await asyncio.sleep(delay)
+
+    async def _post(self, method: str, url: str, params: dict) -> dict:
+        try:
+            session = await self._get_session()
+            async with session.post(url, json=params) as response:
+                status = response.status
+                try:
+                    response_json = await response.json(content_type=None)
+                except ValueError:
+                    response_json = None
+        except aiohttp.ClientConnectorError as e:
+            raise MessengerConnectError(method, str(e) or type(e).__name__) from e
+        except (TimeoutError, aiohttp.ClientError) as e:
+            raise MessengerNetworkError(method, str(e) or type(e).__name__) from e
+
+        if not isinstance(response_json, dict):
+            description = f"HTTP {status}, body is not JSON"
+            if status == 429:
+                raise MessengerRateLimitError(method, description, retry_after=1)
+            if status >= 500:
+                raise MessengerServerError(method, description, status)
+            raise MessengerRequestError(method, description, status)
+
+        if response_json.get("ok"):
+            return response_json["result"]
+
+        error_code = response_json.get("error_code", status)
+        description = response_json.get("description", "unknown error")
+        if error_code == 429:
+            retry_after = response_json.get("parameters", {}).get("retry_after", 1)
+            raise MessengerRateLimitError(method, description, retry_after)
+        if error_code >= 500:
+            raise MessengerServerError(method, description, error_code)
+        raise MessengerRequestError(method, description, error_code)
 
     async def close(self) -> None:
         """Закрыть HTTP-сессию."""
@@ -64,6 +167,12 @@ class MessengerTelegram(Messenger):
     async def get_updates(self, **params) -> list:
         return await self._make_request("getUpdates", **params)
 
+    async def set_webhook(self, url: str, **params) -> dict:
+        return await self._make_request("setWebhook", url=url, **params)
+
+    async def delete_webhook(self, **params) -> dict:
+        return await self._make_request("deleteWebhook", **params)
+
     async def delete_message(self, chat_id: int, message_id: int) -> dict:
         return await self._make_request(
             "deleteMessage", chat_id=chat_id, message_id=message_id
@@ -0,0 +1,221 @@
+# Версионированные миграции схемы. Каждая миграция — (версия, имя, список
+# SQL-выражений); применённые версии хранятся в schema_migrations.
+# Миграции только добавляются в конец, уже выкаченные не редактируются.
+#
+# Базовая миграция — ровно та схема из четырёх таблиц, которую прежний
+# recreate_database создавал при каждом старте. Она и все следующие написаны
+# идемпотентно (IF NOT EXISTS / OR REPLACE), поэтому накатываются и на пустую
+# БД, и на уже существующую схему без schema_migrations.
+
+MIGRATIONS_LOCK = "todo_bot_schema_migrations"
+
+MIGRATIONS: list[tuple[int, str, list[str]]] = [
+    (
+        1,
+        "baseline",
+        [
+            """
+            CREATE TABLE IF NOT EXISTS telegram_updates
+            (id SERIAL PRIMARY KEY, payload TEXT NOT NULL)
+            """,
+            """
+            CREATE TABLE IF NOT EXISTS users
+            (
+                id SERIAL PRIMARY KEY,
+                telegram_id BIGINT NOT NULL UNIQUE,
+                created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+                state TEXT DEFAULT NULL,
+                data_json TEXT DEFAULT NULL
+            )
+            """,
+            """
+            CREATE TABLE IF NOT EXISTS tasks
+            (
+                id SERIAL PRIMARY KEY,
+                telegram_id BIGINT NOT NULL,
+                text TEXT NOT NULL,
+                task_date TEXT DEFAULT NULL,
+                task_time TEXT DEFAULT NULL,
+                status TEXT NOT NULL DEFAULT 'active',
+                notified BOOLEAN DEFAULT FALSE,
+                created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+                FOREIGN KEY (telegram_id) REFERENCES users (telegram_id)
+            )
+            """,
+            """
+            CREATE TABLE IF NOT EXISTS user_settings
+            (
+                id SERIAL PRIMARY KEY,
+                telegram_id BIGINT NOT NULL UNIQUE,
+                morning_digest_time TEXT NOT NULL DEFAULT '09:00',
+                evening_review_time TEXT NOT NULL DEFAULT '21:00',
+                FOREIGN KEY (telegram_id) REFERENCES users (telegram_id)
+            )
+            """,
+        ],
+    ),
+    (
+        2,
+        "timezones_reminders_and_offsets",
+        [
+            """
+            ALTER TABLE user_settings
+                ADD COLUMN IF NOT EXISTS timezone TEXT NOT NULL
+                    DEFAULT 'Europe/Moscow',
+                ADD COLUMN IF NOT EXISTS morning_digest_sent_on TEXT DEFAULT NULL,
+                ADD COLUMN IF NOT EXISTS evening_review_sent_on TEXT DEFAULT NULL
+            """,
+            """
+            ALTER TABLE tasks
+                ADD COLUMN IF NOT EXISTS due_at TIMESTAMPTZ DEFAULT NULL,
+                ADD COLUMN IF NOT EXISTS claimed_until TIMESTAMP DEFAULT NULL
+            """,
+            """
+            CREATE INDEX IF NOT EXISTS user_settings_morning_digest_idx
+            ON user_settings
+                (timezone, morning_digest_time, morning_digest_sent_on)
+            """,
+            """
+            CREATE INDEX IF NOT EXISTS user_settings_evening_review_idx
+            ON user_settings
+                (timezone, evening_review_time, evening_review_sent_on)
+            """,
+            # task_date/task_time — локальное время пользователя, due_at —
+            # тот же момент в UTC, по нему работают напоминания.
+            """
+            CREATE OR REPLACE FUNCTION user_timezone(p_telegram_id BIGINT)
+            RETURNS TEXT AS $$
+                SELECT COALESCE(
+                    (SELECT timezone FROM user_settings
+                     WHERE telegram_id = p_telegram_id),
+                    'Europe/Moscow'
+                )
+            $$ LANGUAGE sql STABLE
+            """,
+            """
+            CREATE OR REPLACE FUNCTION task_due_at(
+                p_telegram_id BIGINT, p_date TEXT, p_time TEXT
+            ) RETURNS TIMESTAMPTZ AS $$
+                SELECT CASE
+                    WHEN p_date IS NULL OR p_time IS NULL THEN NULL
+                    ELSE (p_date || ' ' || p_time)::timestamp
+                        AT TIME ZONE user_timezone(p_telegram_id)
+                END
+            $$ LANGUAGE sql STABLE
+            """,
+            # Задачи, созданные до появления due_at, иначе не напомнят о себе.
+            """
+            UPDATE tasks
+            SET due_at = task_due_at(telegram_id, task_date, task_time)
+            WHERE due_at IS NULL AND status = 'active'
+            """,
+            """
+            CREATE OR REPLACE FUNCTION notify_task_change() RETURNS trigger AS $$
+            BEGIN
+                PERFORM pg_notify('task_changes', NEW.id::text);
+                RETURN NEW;
+            END;
+            $$ LANGUAGE plpgsql
+            """,
+            """
+            CREATE OR REPLACE TRIGGER tasks_notify_change
+            AFTER INSERT OR UPDATE OF due_at, status ON tasks
+            FOR EACH ROW EXECUTE FUNCTION notify_task_change()
+            """,
+            """
+            CREATE TABLE IF NOT EXISTS update_offsets
+            (
+                id SMALLINT PRIMARY KEY DEFAULT 1 CHECK (id = 1),
+                last_update_id BIGINT NOT NULL,
+                updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+            )
+            """,
+        ],
+    ),
+    (
+        3,
+        "task_indexes",
+        [
+            # Списки задач, дайджесты и keyset-страницы: все фильтруют по
+            # пользователю, статусу и дате. Покрывает и внешний ключ.
+            """
+            CREATE INDEX IF NOT EXISTS tasks_user_status_date_idx
+            ON tasks (telegram_id, status, task_date)
+            """,
+            # Скан напоминаний: частичный индекс содержит только ещё не
+            # отправленные активные задачи со временем и не растёт с историей.
+            """
+            CREATE INDEX IF NOT EXISTS tasks_pending_reminders_idx
+            ON tasks (due_at)
+            WHERE status = 'active' AND notified = FALSE AND due_at IS NOT NULL
+            """,
+        ],
+    ),
+    (
+        4,
+        "typed_dates_and_times",
+        [
+            # Даты и время хранятся типами DATE/TIME: сравнения и сортировка
+            # идут по значениям, а не по строкам. Строки HH:MM / YYYY-MM-DD
+            # остаются только на границе StoragePostgres.
+            "DROP FUNCTION IF EXISTS task_due_at(BIGINT, TEXT, TEXT)",
+            """
+            ALTER TABLE tasks
+                ALTER COLUMN task_date DROP DEFAULT,
+                ALTER COLUMN task_date TYPE DATE USING task_date::date,
+                ALTER COLUMN task_time DROP DEFAULT,
+                ALTER COLUMN task_time TYPE TIME USING task_time::time,
+                ALTER COLUMN claimed_until
+                    TYPE TIMESTAMPTZ USING claimed_until::timestamptz
+            """,
+            """
+            ALTER TABLE user_settings
+                ALTER COLUMN morning_digest_time DROP DEFAULT,
+                ALTER COLUMN morning_digest_time
+                    TYPE TIME USING morning_digest_time::time,
+                ALTER COLUMN morning_digest_time SET DEFAULT '09:00',
+                ALTER COLUMN evening_review_time DROP DEFAULT,
+                ALTER COLUMN evening_review_time
+                    TYPE TIME USING evening_review_time::time,
+                ALTER COLUMN evening_review_time SET DEFAULT '21:00',
+                ALTER COLUMN morning_digest_sent_on DROP DEFAULT,
+                ALTER COLUMN morning_digest_sent_on
+                    TYPE DATE USING morning_digest_sent_on::date,
+                ALTER COLUMN evening_review_sent_on DROP DEFAULT,
+                ALTER COLUMN evening_review_sent_on
+                    TYPE DATE USING evening_review_sent_on::date
+            """,
+            """
+            CREATE OR REPLACE FUNCTION task_due_at(
+                p_telegram_id BIGINT, p_date DATE, p_time TIME
+            ) RETURNS TIMESTAMPTZ AS $$
+                SELECT (p_date + p_time) AT TIME ZONE user_timezone(p_telegram_id)
+            $$ LANGUAGE sql STABLE
+            """,
+        ],
+    ),
+    (
+        5,
+        "jsonb_user_data",
+        [
+            # Данные FSM сливаются на сервере (data_json || $1::jsonb) —
+            # без чтения строки и гонки при двойном нажатии.
+            """
+            ALTER TABLE users
+                ALTER COLUMN data_json DROP DEFAULT,
+                ALTER COLUMN data_json
+                    TYPE JSONB USING NULLIF(data_json, '')::jsonb
+            """,
+        ],
+    ),
+]
+
+
+def get_pending_migrations(
+    applied_versions: set[int],
+) -> list[tuple[int, str, list[str]]]:
+    return [
+        migration
+        for migration in sorted(MIGRATIONS, key=lambda m: m[0])
+        if migration[0] not in applied_versions
+    ]
@@ -0,0 +1,208 @@
+# Реестр запросов StoragePostgres: каждый запрос объявлен здесь один раз под
+# своим именем и подготавливается на каждом соединении пула при его создании.
+# Запросы, которые раньше собирались f-строкой (колонка настройки, фильтр,
+# направление курсора), разворачиваются в отдельные именованные варианты.
+# DDL миграций и COPY сюда не входят.
+
+SETTING_TIME_COLUMNS = {
+    "morning_digest_time": "morning_digest_sent_on",
+    "evening_review_time": "evening_review_sent_on",
+}
+
+TASK_DATE_FILTERS = {
+    "show_today": "task_date = (CURRENT_TIMESTAMP AT TIME ZONE user_timezone($1))::date",
+    "show_tomorrow": "task_date = (CURRENT_TIMESTAMP AT TIME ZONE user_timezone($1))::date + 1",
+    "show_nodate": "task_date IS NULL",
+}
+
+# Keyset по (время, id): задачи без времени идут последними — для них ключ
+# TIME '24:00', больше любого времени суток.
+_PAGE_SORT_KEY = "COALESCE(task_time, TIME '24:00')"
+_PAGE_CURSORS = {
+    "first": ("", "ASC", "$2"),
+    "after": (
+        f"AND ({_PAGE_SORT_KEY}, id) > (COALESCE($2::time, TIME '24:00'), $3)",
+        "ASC",
+        "$4",
+    ),
+    "before": (
+        f"AND ({_PAGE_SORT_KEY}, id) < (COALESCE($2::time, TIME '24:00'), $3)",
+        "DESC",
+        "$4",
+    ),
+}
+
+QUERIES: dict[str, str] = {
+    "persist_update": "INSERT INTO telegram_updates (payload) VALUES ($1)",
+    "get_update_offset": "SELECT last_update_id FROM update_offsets WHERE id = 1",
+    "save_update_offset": """
+        INSERT INTO update_offsets (id, last_update_id) VALUES (1, $1)
+        ON CONFLICT (id) DO UPDATE
+        SET last_update_id = GREATEST(
+                update_offsets.last_update_id,
+                EXCLUDED.last_update_id
+            ),
+            updated_at = CURRENT_TIMESTAMP
+    """,
+    # Настройки вставляются независимо от того, новый ли пользователь: так
+    # восстанавливается и строка user_settings, которой нет у старого
+    # пользователя. Проверка внешнего ключа идёт в конце запроса и видит
+    # строку users из CTE.
+    "ensure_user_exists": """
+        WITH new_user AS (
+            INSERT INTO users (telegram_id) VALUES ($1)
+            ON CONFLICT (telegram_id) DO NOTHING
+        )
+        INSERT INTO user_settings (telegram_id) VALUES ($1)
+        ON CONFLICT (telegram_id) DO NOTHING
+    """,
+    "get_user": """
+        SELECT u.id, u.telegram_id, u.state, u.data_json, s.timezone
+        FROM users AS u
+        LEFT JOIN user_settings AS s ON s.telegram_id = u.telegram_id
+        WHERE u.telegram_id=$1
+    """,
+    "clear_user_state_and_temp_data": (
+        "UPDATE users SET state=NULL, data_json=NULL WHERE telegram_id=$1"
+    ),
+    "update_user_state": "UPDATE users SET state=$1 WHERE telegram_id=$2",
+    "update_user_data": """
+        UPDATE users SET data_json = COALESCE(data_json, '{}'::jsonb) || $1::jsonb
+        WHERE telegram_id=$2
+    """,
+    "merge_user_state_and_data": """
+        UPDATE users
+        SET state=$1, data_json = COALESCE(data_json, '{}'::jsonb) || $2::jsonb
+        WHERE telegram_id=$3
+    """,
+    "save_user_state_and_data": (
+        "UPDATE users SET state=$1, data_json=$2 WHERE telegram_id=$3"
+    ),
+    "create_task": """
+        INSERT INTO tasks
+            (telegram_id, text, task_date, task_time, due_at, status, notified)
+        VALUES ($1,$2,$3,$4,task_due_at($1,$3,$4),'active',FALSE)
+        RETURNING id
+    """,
+    "get_user_settings": """
+        SELECT morning_digest_time, evening_review_time, timezone
+        FROM user_settings WHERE telegram_id=$1
+    """,
+    "get_user_timezone": "SELECT user_timezone($1)",
+    "update_user_timezone": (
+        "UPDATE user_settings SET timezone=$1 WHERE telegram_id=$2"
+    ),
+    # Локальные дата и время задач не меняются, а их момент в UTC сдвигается
+    # вместе с часовым поясом.
+    "recompute_due_at": """
+        UPDATE tasks
+        SET due_at = task_due_at(telegram_id, task_date, task_time)
+        WHERE telegram_id=$1 AND status='active'
+    """,
+    "update_task_status": "UPDATE tasks SET status=$1 WHERE id=$2",
+    "update_tasks_status": "UPDATE tasks SET status=$1 WHERE id = ANY($2::int[])",
+    "update_task": """
+        UPDATE tasks
+        SET task_date=$1, task_time=$2, status=$3,
+            due_at=task_due_at(telegram_id, $1, $2)
+        WHERE id=$4
+    """,
+    "get_task_by_id": "SELECT * FROM tasks WHERE id=$1",
+    "get_due_tasks": """
+        SELECT t.*, t.telegram_id AS chat_id FROM tasks t
+        WHERE t.status='active' AND t.notified=FALSE AND t.due_at <= $1
+    """,
+    "try_acquire_leadership": "SELECT pg_try_advisory_lock(hashtext($1))",
+    # pg_advisory_lock(bigint) хранит ключ в classid (старшие 32 бита) и objid
+    # (младшие) с objsubid = 1.
+    "check_leadership": """
+        SELECT EXISTS (
+            SELECT 1 FROM pg_locks
+            WHERE locktype = 'advisory'
+                AND pid = pg_backend_pid()
+                AND granted
+                AND objsubid = 1
+                AND ((classid::bigint << 32) | objid::bigint) = hashtext($1)::bigint
+        )
+    """,
+    "claim_due_tasks": """
+        UPDATE tasks
+        SET claimed_until = CURRENT_TIMESTAMP + make_interval(secs => $3)
+        WHERE id IN (
+            SELECT id FROM tasks
+            WHERE id = ANY($1::int[])
+                AND status = 'active' AND notified = FALSE
+                AND due_at <= $2
+                AND (claimed_until IS NULL OR claimed_until < CURRENT_TIMESTAMP)
+            FOR UPDATE SKIP LOCKED
+        )
+        RETURNING *, telegram_id AS chat_id
+    """,
+    "extend_task_claims": """
+        UPDATE tasks
+        SET claimed_until = CURRENT_TIMESTAMP + make_interval(secs => $2)
+        WHERE id = ANY($1::int[])
+            AND notified = FALSE AND claimed_until IS NOT NULL
+    """,
+    "release_task_claim": "UPDATE tasks SET claimed_until=NULL WHERE id=$1",
+    "mark_tasks_as_notified": """
+        UPDATE tasks SET notified=TRUE, claimed_until=NULL
+        WHERE id = ANY($1::int[])
+    """,
+}
+
+for filter_type, date_condition in TASK_DATE_FILTERS.items():
+    QUERIES[f"get_tasks_by_filter:{filter_type}"] = f"""
+        SELECT * FROM tasks
+        WHERE telegram_id=$1 AND status='active'
+        AND {date_condition}
+    """
+    for cursor, (cursor_condition, order, limit) in _PAGE_CURSORS.items():
+        QUERIES[f"get_tasks_page:{filter_type}:{cursor}"] = f"""
+            SELECT * FROM tasks
+            WHERE telegram_id=$1 AND status='active'
+                AND {date_condition}
+                {cursor_condition}
+            ORDER BY {_PAGE_SORT_KEY} {order}, id {order}
+            LIMIT {limit}
+        """
+
+for setting_type, sent_column in SETTING_TIME_COLUMNS.items():
+    QUERIES[f"update_user_setting_time:{setting_type}"] = (
+        f"UPDATE user_settings SET {setting_type}=$1 WHERE telegram_id=$2"
+    )
+    # Окна приходят массивами, по одному на часовой пояс: каждая строка
+    # unnest — это сканирование индекса (timezone, time). Отметка об отправке
+    # ставится в том же запросе, что и выборка, то есть до отправки:
+    # пропущенное окно догоняется, повторно дайджест не уйдёт, а неудачная
+    # отправка не повторяется (at-most-once).
+    # Отметка *_sent_on ставится отдельно, per chat после отправки
+    # (mark_digest_sent), поэтому выборка только читает.
+    QUERIES[f"get_scheduled_digests:{setting_type}"] = f"""
+        WITH windows AS (
+            SELECT * FROM unnest(
+                $1::text[], $2::time[], $3::time[], $4::date[], $5::date[]
+            ) AS w(timezone, window_start, window_end, local_date, task_date)
+        ),
+        due AS (
+            SELECT s.telegram_id, w.local_date, w.task_date
+            FROM user_settings AS s
+            JOIN windows AS w ON s.timezone = w.timezone
+            WHERE s.{setting_type} BETWEEN w.window_start AND w.window_end
+                AND (s.{sent_column} IS NULL OR s.{sent_column} < w.local_date)
+        )
+        SELECT d.telegram_id, d.local_date,
+               t.id, t.text, t.task_date, t.task_time, t.status
+        FROM due AS d
+        LEFT JOIN tasks AS t
+            ON t.telegram_id = d.telegram_id
+            AND t.status = 'active'
+            AND (t.task_date = d.task_date OR ($6 AND t.task_date IS NULL))
+        ORDER BY d.telegram_id,
+                 CASE WHEN t.task_date IS NULL THEN 1 ELSE 0 END,
+                 t.task_time ASC,
+                 t.id ASC
+    """
+    QUERIES[f"mark_digest_sent:{setting_type}"] = (
+        f"UPDATE user_settings SET {sent_column}=$2 WHERE telegram_id=$1"
+    )
@@ -0,0 +1,131 @@
+import asyncio
+import time
+from collections.abc import Awaitable, Callable
+
+from bot.domain.messenger import MessagePriority
+
+_EPSILON = 1e-9
+
+
+class TokenBucket:
+    def __init__(
+        self,
+        rate: float,
+        capacity: float,
+        clock: Callable[[], float] = time.monotonic,
+    ) -> None:
+        self._rate = rate
+        self._capacity = capacity
+        self._clock = clock
+        self._tokens = capacity
+        self._updated = clock()
+        self._blocked_until = 0.0
+
+    @property
+    def is_full(self) -> bool:
+        self._refill()
+        return self._tokens >= self._capacity and self._clock() >= self._blocked_until
+
+    def delay(self, amount: float = 1) -> float:
+        self._refill()
+        blocked = self._blocked_until - self._clock()
+        missing = amount - self._tokens
+        wait = missing / self._rate if missing > _EPSILON else 0.0
+        return max(wait, blocked if blocked > _EPSILON else 0.0)
+
+    def consume(self, amount: float = 1) -> None:
+        self._refill()
+        self._tokens -= amount
+
+    def block(self, seconds: float) -> None:
+        self._blocked_until = max(self._blocked_until, self._clock() + seconds)
+
+    def _refill(self) -> None:
+        now = self._clock()
+        elapsed = now - self._updated
+        self._updated = now
+        self._tokens = min(self._capacity, self._tokens + elapsed * self._rate)
+
+
+class TelegramRateLimiter:
+    """Темп исходящих запросов под лимиты Telegram Bot API.
+
+    Глобальный bucket (~30 сообщений/с) и bucket на каждый чат
+    (~1 сообщение/с для личных чатов, 20/мин для групп). Интерактивные
+    запросы, ждущие глобальный лимит, получают токены раньше BULK-рассылок.
+    """
+
+    def __init__(
+        self,
+        global_rate: float = 30,
+        private_chat_rate: float = 1,
+        private_chat_burst: float = 3,
+        group_chat_rate: float = 20 / 60,
+        group_chat_burst: float = 3,
+        max_chat_buckets: int = 10_000,
+        clock: Callable[[], float] = time.monotonic,
+        sleep: Callable[[float], Awaitable[None]] = asyncio.sleep,
+    ) -> None:
+        self._clock = clock
+        self._sleep = sleep
+        self._global = TokenBucket(global_rate, global_rate, clock)
+        self._private_chat_rate = private_chat_rate
+        self._private_chat_burst = private_chat_burst
+        self._group_chat_rate = group_chat_rate
+        self._group_chat_burst = group_chat_burst
+        self._max_chat_buckets = max_chat_buckets
+        self._chats: dict[int, TokenBucket] = {}
+        self._interactive_waiting = 0
+
+    async def acquire(self, chat_id: int | None, priority: MessagePriority) -> None:
+        chat = self._get_chat_bucket(chat_id) if chat_id is not None else None
+        waiting_as_interactive = False
+
+        try:
+            while True:
+                delay = chat.delay() if chat is not None else 0.0
+                if delay <= 0:
+                    if priority is MessagePriority.INTERACTIVE:
+                        if not waiting_as_interactive:
+                            self._interactive_waiting += 1
+                            waiting_as_interactive = True
+                        delay = self._global.delay()
+                    else:
+                        delay = self._global.delay(1 + self._interactive_waiting)
+
+                    if delay <= 0:
+                        self._global.consume()
+                        if chat is not None:
+                            chat.consume()
+                        return
+
+                await self._sleep(delay)
+        finally:
+            if waiting_as_interactive:
+                self._interactive_waiting -= 1
+
+    def block(self, chat_id: int | None, seconds: float) -> None:
+        if chat_id is not None:
+            self._get_chat_bucket(chat_id).block(seconds)
+        else:
+            self._global.block(seconds)
+
+    def _get_chat_bucket(self, chat_id: int) -> TokenBucket:
+        bucket = self._chats.get(chat_id)
+        if bucket is None:
+            if len(self._chats) >= self._max_chat_buckets:
+                self._chats = {
+                    key: value
+                    for key, value in self._chats.items()
+                    if not value.is_full
+                }
+            if chat_id < 0:
+                bucket = TokenBucket(
+                    self._group_chat_rate, self._group_chat_burst, self._clock
+                )
+            else:
+                bucket = TokenBucket(
+                    self._private_chat_rate, self._private_chat_burst, self._clock
+                )
+            self._chats[chat_id] = bucket
+        return bucket
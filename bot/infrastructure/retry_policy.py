@@ -0,0 +1,39 @@
+import random
+
+from bot.domain.messenger import (
+    MessengerError,
+    MessengerRateLimitError,
+    MessengerRequestError,
+)
+
+
+class RetryPolicy:
+    """Бюджет повторов для одного класса вызовов.
+
+    429 ждёт ровно retry_after (если он укладывается в max_retry_after),
+    5xx и сетевые ошибки — экспоненциальную задержку с full jitter.
+    """
+
+    def __init__(
+        self,
+        max_attempts: int,
+        base_delay: float = 0.5,
+        max_delay: float = 30,
+        max_retry_after: float = 60,
+    ) -> None:
+        self.max_attempts = max_attempts
+        self._base_delay = base_delay
+        self._max_delay = max_delay
+        self._max_retry_after = max_retry_after
+
+    def next_delay(self, attempt: int, error: MessengerError) -> float | None:
+        if attempt >= self.max_attempts or isinstance(error, MessengerRequestError):
+            return None
+
+        if isinstance(error, MessengerRateLimitError):
+            if error.retry_after > self._max_retry_after:
+                return None
+            return error.retry_after + random.uniform(0, 0.1 * error.retry_after)
+
+        backoff = min(self._max_delay, self._base_delay * 2 ** (attempt - 1))
+        return random.uniform(0, backoff)
@@ -1,11 +1,26 @@
+import inspect
 import json
 import logging
 import os
 import time
+from collections.abc import Awaitable, Callable
+from datetime import date, datetime
+from datetime import time as dt_time
+from functools import partial, wraps
+from typing import Any
 
 import asyncpg
+from asyncpg.prepared_stmt import PreparedStatement
 from dotenv import load_dotenv
+
 from bot.domain.storage import Storage
+from bot.infrastructure.migrations import MIGRATIONS_LOCK, get_pending_migrations
+from bot.infrastructure.queries import (
+    QUERIES,
+    SETTING_TIME_COLUMNS,
+    TASK_DATE_FILTERS,
+)
+from bot.timezones import DEFAULT_TIMEZONE
 
 load_dotenv()
 
@@ -17,9 +32,142 @@ logging.basicConfig(
 )
 
 
+# Хендлеры и notifier работают со строками YYYY-MM-DD / HH:MM, в БД — DATE
+# и TIME. Преобразование происходит только здесь, на границе storage.
+def _parse_date(value: str | None) -> date | None:
+    return date.fromisoformat(value) if value else None
+
+
+def _parse_time(value: str | None) -> dt_time | None:
+    return datetime.strptime(value, "%H:%M").time() if value else None
+
+
+def _row_to_dict(row: asyncpg.Record) -> dict:
+    result = dict(row)
+    for key, value in result.items():
+        if isinstance(value, dt_time):
+            result[key] = value.strftime("%H:%M")
+        elif isinstance(value, date) and not isinstance(value, datetime):
+            result[key] = value.isoformat()
+    return result
+
+
+# Ошибки потерянного или сломанного соединения: их при работе с leader
+# соединением только логируют, остальные пробрасываются.
+_CONNECTION_ERRORS = (OSError, asyncpg.PostgresError, asyncpg.InterfaceError)
+
+
+# Параметры, которые попадают в лог: идентификаторы и ключи запросов, без
+# текста задач и данных пользователя.
+_LOGGED_ARGS = frozenset(
+    {
+        "telegram_id",
+        "task_id",
+        "task_ids",
+        "filter_type",
+        "setting_type",
+        "new_status",
+        "state",
+        "limit",
+        "after",
+        "before",
+        "name",
+    }
+)
+
+
+def _summarize_args(
+    signature: inspect.Signature, args: tuple[Any, ...], kwargs: dict[str, Any]
+) -> str:
+    bound = signature.bind_partial(None, *args, **kwargs)
+    parts = []
+    for name, value in bound.arguments.items():
+        if name not in _LOGGED_ARGS:
+            continue
+        if isinstance(value, list):
+            more = f",…+{len(value) - 5}" if len(value) > 5 else ""
+            value = f"[{','.join(map(str, value[:5]))}{more}]"
+        parts.append(f"{name}={value}")
+    return f" ({', '.join(parts)})" if parts else ""
+
+
+def _timed(method: Callable[..., Awaitable[Any]]) -> Callable[..., Awaitable[Any]]:
+    # Единое место для логов, времени и ошибок всех методов storage —
+    # сюда же добавляются метрики по запросам.
+    method_name = method.__name__
+    signature = inspect.signature(method)
+
+    @wraps(method)
+    async def wrapper(self: "StoragePostgres", *args: Any, **kwargs: Any) -> Any:
+        start_time = time.time()
+        call = method_name + _summarize_args(signature, args, kwargs)
+        logger.info(f"[DB] → {call}")
+        try:
+            result = await method(self, *args, **kwargs)
+        except Exception as e:
+            duration_ms = (time.time() - start_time) * 1000
+            logger.error(f"[DB] ✗ {call} - {duration_ms:.2f}ms - Error: {e}")
+            raise
+
+        duration_ms = (time.time() - start_time) * 1000
+        rows = f" ({len(result)} rows)" if isinstance(result, list) else ""
+        logger.info(f"[DB] ← {method_name} - {duration_ms:.2f}ms{rows}")
+        return result
+
+    return wrapper
+
+
+class PreparedConnection(asyncpg.Connection):
+    """Соединение пула с подготовленными запросами из QUERIES.
+
+    Запросы готовятся при создании соединения (init пула), а если это
+    отключено — при первом использовании; дальше каждый вызов идёт без
+    повторного parse/plan.
+    """
+
+    __slots__ = ("_prepared",)
+
+    def __init__(self, *args: Any, **kwargs: Any) -> None:
+        super().__init__(*args, **kwargs)
+        self._prepared: dict[str, PreparedStatement] = {}
+
+    async def prepare_queries(self) -> None:
+        for name in QUERIES:
+            await self._statement(name)
+
+    async def run_query(self, mode: str, name: str, *args: Any) -> Any:
+        statement = await self._statement(name)
+        try:
+            return await getattr(statement, mode)(*args)
+        except asyncpg.InvalidCachedStatementError:
+            # Схема поменялась после подготовки (например, миграцией).
+            del self._prepared[name]
+            statement = await self._statement(name)
+            return await getattr(statement, mode)(*args)
+
+    async def _statement(self, name: str) -> PreparedStatement:
+        statement = self._prepared.get(name)
+        if statement is None:
+            statement = await self.prepare(QUERIES[name])
+            self._prepared[name] = statement
+        return statement
+
+
 class StoragePostgres(Storage):
-    def __init__(self) -> None:
+    def __init__(
+        self, compact_update_json: bool = False, prepare_statements: bool = True
+    ) -> None:
         self._pool: asyncpg.Pool | None = None
+        self._listen_conn: asyncpg.Connection | None = None
+        self._leader_conn: asyncpg.Connection | None = None
+        self._leader_lock: str | None = None
+        self._compact_update_json = compact_update_json
+        self._prepare_statements = prepare_statements
+
+    def _dump_update(self, update: dict) -> str:
+        if self._compact_update_json:
+            return json.dumps(update, ensure_ascii=False, separators=(",", ":"))
+        return json.dumps(update, ensure_ascii=False, indent=2)
 
     async def _get_pool(self) -> asyncpg.Pool:
         if self._pool is None:
@@ -38,603 +186,409 @@ class StoragePostgres(Storage):
                 user=user,
                 password=password,
                 database=database,
+                connection_class=PreparedConnection,
+                init=self._init_connection,
             )
         return self._pool
 
+    async def _init_connection(self, conn: PreparedConnection) -> None:
+        # JSONB приходит из запросов уже словарём, а словарь можно передавать
+        # параметром без json.dumps. Кодек ставится до подготовки запросов.
+        await conn.set_type_codec(
+            "jsonb",
+            encoder=partial(json.dumps, ensure_ascii=False),
+            decoder=json.loads,
+            schema="pg_catalog",
+        )
+        if self._prepare_statements:
+            await conn.prepare_queries()
+
+    async def _query(self, mode: str, name: str, *args: Any) -> Any:
+        pool = await self._get_pool()
+        async with pool.acquire() as conn:
+            return await conn.run_query(mode, name, *args)
+
+    async def _fetch(self, name: str, *args: Any) -> list[dict]:
+        rows = await self._query("fetch", name, *args)
+        return [_row_to_dict(r) for r in rows]
+
+    async def _fetchrow(self, name: str, *args: Any) -> dict | None:
+        row = await self._query("fetchrow", name, *args)
+        return _row_to_dict(row) if row else None
+
+    async def _fetchval(self, name: str, *args: Any) -> Any:
+        return await self._query("fetchval", name, *args)
+
+    async def _execute(self, name: str, *args: Any) -> None:
+        # У PreparedStatement нет execute с параметрами; fetch DML без
+        # RETURNING возвращает пустой список.
+        await self._query("fetch", name, *args)
+
     async def close(self) -> None:
+        await self.unlisten_task_changes()
+        await self.release_leadership()
         if self._pool:
             await self._pool.close()
             self._pool = None
 
-    async def recreate_database(self) -> None:
-        method_name = "recreate_database"
-        start_time = time.time()
-        logger.info(f"[DB] → {method_name} - DROP/CREATE TABLES")
-
-        try:
-            pool = await self._get_pool()
-            async with pool.acquire() as conn:
-                await conn.execute("DROP TABLE IF EXISTS telegram_updates")
-                await conn.execute("DROP TABLE IF EXISTS user_settings")
-                await conn.execute("DROP TABLE IF EXISTS tasks")
-                await conn.execute("DROP TABLE IF EXISTS users")
-
-                await conn.execute(
-                    """
-                    CREATE TABLE IF NOT EXISTS telegram_updates
-                    (id SERIAL PRIMARY KEY, payload TEXT NOT NULL)
-                    """
-                )
-                await conn.execute(
-                    """
-                    CREATE TABLE IF NOT EXISTS users
+    @_timed
+    async def migrate_database(self) -> None:
+        pool = await self._get_pool()
+        async with pool.acquire() as conn:
+            # Сессионный advisory lock: несколько контейнеров, стартующих
+            # одновременно, применяют миграции по очереди, а не параллельно.
+            await conn.execute("SELECT pg_advisory_lock(hashtext($1))", MIGRATIONS_LOCK)
+            try:
+                await conn.execute("""
+                    CREATE TABLE IF NOT EXISTS schema_migrations
                     (
-                        id SERIAL PRIMARY KEY,
-                        telegram_id BIGINT NOT NULL UNIQUE,
-                        created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
-                        state TEXT DEFAULT NULL,
-                        data_json TEXT DEFAULT NULL
+                        version INTEGER PRIMARY KEY,
+                        name TEXT NOT NULL,
+                        applied_at TIMESTAMPTZ DEFAULT CURRENT_TIMESTAMP
                     )
-                    """
-                )
+                    """)
+                rows = await conn.fetch("SELECT version FROM schema_migrations")
+                pending = get_pending_migrations({r["version"] for r in rows})
+
+                for version, name, statements in pending:
+                    async with conn.transaction():
+                        for statement in statements:
+                            await conn.execute(statement)
+                        await conn.execute(
+                            "INSERT INTO schema_migrations (version, name) VALUES ($1, $2)",
+                            version,
+                            name,
+                        )
+                    logger.info(f"[DB] migrate_database - applied {version} {name}")
+            finally:
                 await conn.execute(
-                    """
-                    CREATE TABLE IF NOT EXISTS tasks
-                    (
-                        id SERIAL PRIMARY KEY,
-                        telegram_id BIGINT NOT NULL,
-                        text TEXT NOT NULL,
-                        task_date TEXT DEFAULT NULL,
-                        task_time TEXT DEFAULT NULL,
-                        status TEXT NOT NULL DEFAULT 'active',
-                        notified BOOLEAN DEFAULT FALSE,
-                        created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
-                        FOREIGN KEY (telegram_id) REFERENCES users (telegram_id)
-                    )
-                    """
-                )
-                await conn.execute(
-                    """
-                    CREATE TABLE IF NOT EXISTS user_settings
-                    (
-                        id SERIAL PRIMARY KEY,
-                        telegram_id BIGINT NOT NULL UNIQUE,
-                        morning_digest_time TEXT NOT NULL DEFAULT '09:00',
-                        evening_review_time TEXT NOT NULL DEFAULT '21:00',
-                        FOREIGN KEY (telegram_id) REFERENCES users (telegram_id)
-                    )
-                    """
+                    "SELECT pg_advisory_unlock(hashtext($1))", MIGRATIONS_LOCK
                 )
 
-            duration_ms = (time.time() - start_time) * 1000
-            logger.info(f"[DB] ← {method_name} - {duration_ms:.2f}ms")
-        except Exception as e:
-            duration_ms = (time.time() - start_time) * 1000
-            logger.error(f"[DB] ✗ {method_name} - {duration_ms:.2f}ms - Error: {e}")
-            raise
-
+    async def recreate_database(self) -> None:
+        await self._drop_tables()
+        await self.migrate_database()
+
+    @_timed
+    async def _drop_tables(self) -> None:
+        pool = await self._get_pool()
+        async with pool.acquire() as conn:
+            # Только для локальной разработки: стирает все данные.
+            # Смещение update_offsets не удаляется — Telegram помнит
+            # подтверждённые updates и после пересоздания БД.
+            await conn.execute("DROP TABLE IF EXISTS telegram_updates")
+            await conn.execute("DROP TABLE IF EXISTS user_settings")
+            await conn.execute("DROP TABLE IF EXISTS tasks")
+            await conn.execute("DROP TABLE IF EXISTS users")
+            await conn.execute("DROP TABLE IF EXISTS schema_migrations")
+
+    @_timed
     async def persist_update(self, update: dict) -> None:
-        method_name = "persist_update"
-        start_time = time.time()
-        payload = json.dumps(update, ensure_ascii=False, indent=2)
-        logger.info(f"[DB] → {method_name} - INSERT INTO telegram_updates")
-
-        try:
-            pool = await self._get_pool()
-            async with pool.acquire() as conn:
-                await conn.execute(
-                    "INSERT INTO telegram_updates (payload) VALUES ($1)",
-                    payload,
-                )
-            duration_ms = (time.time() - start_time) * 1000
-            logger.info(f"[DB] ← {method_name} - {duration_ms:.2f}ms")
-        except Exception as e:
-            duration_ms = (time.time() - start_time) * 1000
-            logger.error(f"[DB] ✗ {method_name} - {duration_ms:.2f}ms - Error: {e}")
-            raise
+        await self._execute("persist_update", self._dump_update(update))
+
+    @_timed
+    async def persist_updates(self, updates: list[dict]) -> None:
+        records = [(self._dump_update(update),) for update in updates]
+        pool = await self._get_pool()
+        async with pool.acquire() as conn:
+            await conn.copy_records_to_table(
+                "telegram_updates", records=records, columns=["payload"]
+            )
 
-    async def ensure_user_exists(self, telegram_id: int) -> None:
-        method_name = "ensure_user_exists"
-        start_time = time.time()
-        logger.info(f"[DB] → {method_name} - INSERT users/user_settings if not exists")
+    @_timed
+    async def get_update_offset(self) -> int:
+        return await self._fetchval("get_update_offset") or 0
 
-        try:
-            pool = await self._get_pool()
-            async with pool.acquire() as conn:
-                await conn.execute(
-                    "INSERT INTO users (telegram_id) VALUES ($1) ON CONFLICT (telegram_id) DO NOTHING",
-                    telegram_id,
-                )
-                await conn.execute(
-                    "INSERT INTO user_settings (telegram_id) VALUES ($1) ON CONFLICT (telegram_id) DO NOTHING",
-                    telegram_id,
-                )
+    @_timed
+    async def save_update_offset(self, last_update_id: int) -> None:
+        await self._execute("save_update_offset", last_update_id)
 
-            duration_ms = (time.time() - start_time) * 1000
-            logger.info(f"[DB] ← {method_name} - {duration_ms:.2f}ms")
-        except Exception as e:
-            duration_ms = (time.time() - start_time) * 1000
-            logger.error(f"[DB] ✗ {method_name} - {duration_ms:.2f}ms - Error: {e}")
-            raise
+    @_timed
+    async def ensure_user_exists(self, telegram_id: int) -> None:
+        await self._execute("ensure_user_exists", telegram_id)
 
+    @_timed
     async def get_user(self, telegram_id: int) -> dict | None:
-        method_name = "get_user"
-        start_time = time.time()
-        logger.info(f"[DB] → {method_name} - SELECT user")
-
-        try:
-            pool = await self._get_pool()
-            async with pool.acquire() as conn:
-                row = await conn.fetchrow(
-                    "SELECT id, telegram_id, state, data_json FROM users WHERE telegram_id=$1",
-                    telegram_id,
-                )
-                if row:
-                    user_data = dict(row)
-                    duration_ms = (time.time() - start_time) * 1000
-                    logger.info(f"[DB] ← {method_name} - {duration_ms:.2f}ms")
-                    return user_data
-                duration_ms = (time.time() - start_time) * 1000
-                logger.info(f"[DB] ← {method_name} - {duration_ms:.2f}ms (no result)")
-                return None
-        except Exception as e:
-            duration_ms = (time.time() - start_time) * 1000
-            logger.error(f"[DB] ✗ {method_name} - {duration_ms:.2f}ms - Error: {e}")
-            raise
+        return await self._fetchrow("get_user", telegram_id)
 
+    @_timed
     async def clear_user_state_and_temp_data(self, telegram_id: int) -> None:
-        method_name = "clear_user_state_and_temp_data"
-        start_time = time.time()
-        logger.info(f"[DB] → {method_name} - CLEAR state/data_json for user")
-
-        try:
-            pool = await self._get_pool()
-            async with pool.acquire() as conn:
-                await conn.execute(
-                    "UPDATE users SET state=NULL, data_json=NULL WHERE telegram_id=$1",
-                    telegram_id,
-                )
-            duration_ms = (time.time() - start_time) * 1000
-            logger.info(f"[DB] ← {method_name} - {duration_ms:.2f}ms")
-        except Exception as e:
-            duration_ms = (time.time() - start_time) * 1000
-            logger.error(f"[DB] ✗ {method_name} - {duration_ms:.2f}ms - Error: {e}")
-            raise
+        await self._execute("clear_user_state_and_temp_data", telegram_id)
 
+    @_timed
     async def update_user_state(self, telegram_id: int, state: str | None) -> None:
-        method_name = "update_user_state"
-        start_time = time.time()
-        logger.info(f"[DB] → {method_name}")
-
-        try:
-            pool = await self._get_pool()
-            async with pool.acquire() as conn:
-                await conn.execute(
-                    "UPDATE users SET state=$1 WHERE telegram_id=$2",
-                    state,
-                    telegram_id,
-                )
-            duration_ms = (time.time() - start_time) * 1000
-            logger.info(f"[DB] ← {method_name} - {duration_ms:.2f}ms")
-        except Exception as e:
-            duration_ms = (time.time() - start_time) * 1000
-            logger.error(f"[DB] ✗ {method_name} - {duration_ms:.2f}ms - Error: {e}")
-            raise
+        await self._execute("update_user_state", state, telegram_id)
 
+    @_timed
     async def update_user_data(self, telegram_id: int, new_data: dict) -> None:
-        method_name = "update_user_data"
-        start_time = time.time()
-        logger.info(f"[DB] → {method_name}")
-
-        user = await self.get_user(telegram_id)
-        if not user:
-            duration_ms = (time.time() - start_time) * 1000
-            logger.info(f"[DB] ← {method_name} - {duration_ms:.2f}ms (user not found)")
-            return
+        await self._execute("update_user_data", new_data, telegram_id)
 
-        existing_data = json.loads(user["data_json"]) if user["data_json"] else {}
-        existing_data.update(new_data)
+    @_timed
+    async def merge_user_state_and_data(
+        self, telegram_id: int, state: str | None, data_patch: dict
+    ) -> None:
+        await self._execute("merge_user_state_and_data", state, data_patch, telegram_id)
 
-        try:
-            pool = await self._get_pool()
-            async with pool.acquire() as conn:
-                await conn.execute(
-                    "UPDATE users SET data_json=$1 WHERE telegram_id=$2",
-                    json.dumps(existing_data, ensure_ascii=False, indent=2),
-                    telegram_id,
-                )
-            duration_ms = (time.time() - start_time) * 1000
-            logger.info(f"[DB] ← {method_name} - {duration_ms:.2f}ms")
-        except Exception as e:
-            duration_ms = (time.time() - start_time) * 1000
-            logger.error(f"[DB] ✗ {method_name} - {duration_ms:.2f}ms - Error: {e}")
-            raise
+    @_timed
+    async def save_user_state_and_data(
+        self, telegram_id: int, state: str | None, data: dict | None
+    ) -> None:
+        await self._execute(
+            "save_user_state_and_data", state, data or None, telegram_id
+        )
 
+    @_timed
     async def create_task(
         self, telegram_id: int, text: str, task_date: str | None, task_time: str | None
     ) -> int:
-        method_name = "create_task"
-        start_time = time.time()
-        logger.info(f"[DB] → {method_name}")
-
-        try:
-            pool = await self._get_pool()
-            async with pool.acquire() as conn:
-                row = await conn.fetchrow(
-                    """
-                    INSERT INTO tasks (telegram_id, text, task_date, task_time, status, notified)
-                    VALUES ($1,$2,$3,$4,'active',FALSE)
-                    RETURNING id
-                    """,
-                    telegram_id,
-                    text,
-                    task_date,
-                    task_time,
-                )
-            duration_ms = (time.time() - start_time) * 1000
-            logger.info(f"[DB] ← {method_name} - {duration_ms:.2f}ms")
-            return row["id"] if row else 0
-        except Exception as e:
-            duration_ms = (time.time() - start_time) * 1000
-            logger.error(f"[DB] ✗ {method_name} - {duration_ms:.2f}ms - Error: {e}")
-            raise
+        task_id = await self._fetchval(
+            "create_task",
+            telegram_id,
+            text,
+            _parse_date(task_date),
+            _parse_time(task_time),
+        )
+        return task_id or 0
 
+    @_timed
     async def get_tasks_by_filter(
         self, telegram_id: int, filter_type: str
     ) -> list[dict]:
-        method_name = "get_tasks_by_filter"
-        start_time = time.time()
-        logger.info(f"[DB] → {method_name} - filter={filter_type}")
-
-        query = ""
-        if filter_type == "show_today":
-            query = """
-                SELECT * FROM tasks
-                WHERE telegram_id=$1 AND status='active'
-                AND task_date = TO_CHAR(CURRENT_DATE, 'YYYY-MM-DD')
-            """
-
-        elif filter_type == "show_tomorrow":
-            query = """
-                SELECT * FROM tasks
-                WHERE telegram_id=$1 AND status='active'
-                AND task_date = TO_CHAR(CURRENT_DATE + INTERVAL '1 day', 'YYYY-MM-DD')
-            """
-
-        elif filter_type == "show_nodate":
-            query = """
-                SELECT * FROM tasks
-                WHERE telegram_id=$1 AND status='active'
-                AND task_date IS NULL
-            """
-        else:
-            duration_ms = (time.time() - start_time) * 1000
-            logger.info(f"[DB] ← {method_name} - {duration_ms:.2f}ms (invalid filter)")
+        if filter_type not in TASK_DATE_FILTERS:
+            logger.warning(
+                f"[DB] ✗ get_tasks_by_filter - Invalid filter: {filter_type}"
+            )
+            return []
+        return await self._fetch(f"get_tasks_by_filter:{filter_type}", telegram_id)
+
+    @_timed
+    async def get_tasks_page(
+        self,
+        telegram_id: int,
+        filter_type: str,
+        limit: int,
+        after: tuple[str, int] | None = None,
+        before: tuple[str, int] | None = None,
+    ) -> list[dict]:
+        if filter_type not in TASK_DATE_FILTERS:
+            logger.warning(f"[DB] ✗ get_tasks_page - Invalid filter: {filter_type}")
             return []
 
-        try:
-            pool = await self._get_pool()
-            async with pool.acquire() as conn:
-                rows = await conn.fetch(query, telegram_id)
-            result = [dict(r) for r in rows]
-            duration_ms = (time.time() - start_time) * 1000
-            logger.info(
-                f"[DB] ← {method_name} - {duration_ms:.2f}ms ({len(result)} rows)"
+        if after is None and before is None:
+            return await self._fetch(
+                f"get_tasks_page:{filter_type}:first", telegram_id, limit
             )
-            return result
-        except Exception as e:
-            duration_ms = (time.time() - start_time) * 1000
-            logger.error(f"[DB] ✗ {method_name} - {duration_ms:.2f}ms - Error: {e}")
-            raise
 
-    async def get_user_settings(self, telegram_id: int) -> dict:
-        method_name = "get_user_settings"
-        start_time = time.time()
-        logger.info(f"[DB] → {method_name}")
-
-        try:
-            pool = await self._get_pool()
-            async with pool.acquire() as conn:
-                row = await conn.fetchrow(
-                    "SELECT morning_digest_time, evening_review_time FROM user_settings WHERE telegram_id=$1",
-                    telegram_id,
-                )
-            if row:
-                result = dict(row)
-                duration_ms = (time.time() - start_time) * 1000
-                logger.info(f"[DB] ← {method_name} - {duration_ms:.2f}ms")
-                return result
-            return {"morning_digest_time": "09:00", "evening_review_time": "21:00"}
-        except Exception as e:
-            duration_ms = (time.time() - start_time) * 1000
-            logger.error(f"[DB] ✗ {method_name} - {duration_ms:.2f}ms - Error: {e}")
-            raise
+        # Задача без времени приходит в курсоре с ключом '~'.
+        # Страница назад читается в обратном порядке и разворачивается.
+        cursor = "after" if after is not None else "before"
+        cursor_time, cursor_id = after or before
+        result = await self._fetch(
+            f"get_tasks_page:{filter_type}:{cursor}",
+            telegram_id,
+            None if cursor_time == "~" else _parse_time(cursor_time),
+            cursor_id,
+            limit,
+        )
+        if before is not None:
+            result.reverse()
+        return result
 
+    @_timed
+    async def get_user_settings(self, telegram_id: int) -> dict:
+        settings = await self._fetchrow("get_user_settings", telegram_id)
+        return settings or {
+            "morning_digest_time": "09:00",
+            "evening_review_time": "21:00",
+            "timezone": DEFAULT_TIMEZONE,
+        }
+
+    @_timed
+    async def get_user_timezone(self, telegram_id: int) -> str:
+        return await self._fetchval("get_user_timezone", telegram_id)
+
+    @_timed
+    async def update_user_timezone(self, telegram_id: int, timezone: str) -> None:
+        pool = await self._get_pool()
+        async with pool.acquire() as conn, conn.transaction():
+            await conn.run_query("fetch", "update_user_timezone", timezone, telegram_id)
+            await conn.run_query("fetch", "recompute_due_at", telegram_id)
+
+    @_timed
     async def update_user_setting_time(
         self, telegram_id: int, setting_type: str, new_time: str
     ) -> None:
-        method_name = "update_user_setting_time"
-        start_time = time.time()
-        logger.info(f"[DB] → {method_name}")
-
-        if setting_type not in ("morning_digest_time", "evening_review_time"):
-            logger.warning(f"[DB] ✗ {method_name} - Invalid setting_type")
+        if setting_type not in SETTING_TIME_COLUMNS:
+            logger.warning("[DB] ✗ update_user_setting_time - Invalid setting_type")
             return
+        await self._execute(
+            f"update_user_setting_time:{setting_type}",
+            _parse_time(new_time),
+            telegram_id,
+        )
 
-        try:
-            pool = await self._get_pool()
-            async with pool.acquire() as conn:
-                await conn.execute(
-                    f"UPDATE user_settings SET {setting_type}=$1 WHERE telegram_id=$2",
-                    new_time,
-                    telegram_id,
-                )
-            duration_ms = (time.time() - start_time) * 1000
-            logger.info(f"[DB] ← {method_name} - {duration_ms:.2f}ms")
-        except Exception as e:
-            duration_ms = (time.time() - start_time) * 1000
-            logger.error(f"[DB] ✗ {method_name} - {duration_ms:.2f}ms - Error: {e}")
-            raise
-
+    @_timed
     async def update_task_status(self, task_id: int, new_status: str) -> None:
-        method_name = "update_task_status"
-        start_time = time.time()
-        logger.info(f"[DB] → {method_name}")
+        await self._execute("update_task_status", new_status, task_id)
 
-        try:
-            pool = await self._get_pool()
-            async with pool.acquire() as conn:
-                await conn.execute(
-                    "UPDATE tasks SET status=$1 WHERE id=$2", new_status, task_id
-                )
-            duration_ms = (time.time() - start_time) * 1000
-            logger.info(f"[DB] ← {method_name} - {duration_ms:.2f}ms")
-        except Exception as e:
-            duration_ms = (time.time() - start_time) * 1000
-            logger.error(f"[DB] ✗ {method_name} - {duration_ms:.2f}ms - Error: {e}")
-            raise
+    @_timed
+    async def update_tasks_status(self, task_ids: list[int], new_status: str) -> None:
+        await self._execute("update_tasks_status", new_status, task_ids)
 
+    @_timed
     async def update_task(
         self, task_id: int, task_date: str | None, task_time: str | None, status: str
     ) -> None:
-        method_name = "update_task"
-        start_time = time.time()
-        logger.info(f"[DB] → {method_name}")
-
-        try:
-            pool = await self._get_pool()
-            async with pool.acquire() as conn:
-                await conn.execute(
-                    "UPDATE tasks SET task_date=$1, task_time=$2, status=$3 WHERE id=$4",
-                    task_date,
-                    task_time,
-                    status,
-                    task_id,
-                )
-            duration_ms = (time.time() - start_time) * 1000
-            logger.info(f"[DB] ← {method_name} - {duration_ms:.2f}ms")
-        except Exception as e:
-            duration_ms = (time.time() - start_time) * 1000
-            logger.error(f"[DB] ✗ {method_name} - {duration_ms:.2f}ms - Error: {e}")
-            raise
+        await self._execute(
+            "update_task",
+            _parse_date(task_date),
+            _parse_time(task_time),
+            status,
+            task_id,
+        )
 
+    @_timed
     async def get_task_by_id(self, task_id: int) -> dict | None:
-        method_name = "get_task_by_id"
-        start_time = time.time()
-        logger.info(f"[DB] → {method_name}")
-
+        return await self._fetchrow("get_task_by_id", task_id)
+
+    @_timed
+    async def get_due_tasks(self, until: datetime) -> list[dict]:
+        return await self._fetch("get_due_tasks", until)
+
+    @_timed
+    async def listen_task_changes(self, callback: Callable[[int], None]) -> None:
+        def on_notification(conn, pid, channel, payload) -> None:
+            callback(int(payload))
+
+        pool = await self._get_pool()
+        if self._listen_conn is None:
+            self._listen_conn = await pool.acquire()
+        await self._listen_conn.add_listener("task_changes", on_notification)
+
+    async def unlisten_task_changes(self) -> None:
+        # Возврат соединения в пул сбрасывает LISTEN и его колбэки.
+        if self._listen_conn is not None:
+            conn, self._listen_conn = self._listen_conn, None
+            await self._pool.release(conn)
+            logger.info("[DB] ← unlisten_task_changes")
+
+    @_timed
+    async def try_acquire_leadership(self, name: str) -> bool:
         try:
             pool = await self._get_pool()
-            async with pool.acquire() as conn:
-                row = await conn.fetchrow("SELECT * FROM tasks WHERE id=$1", task_id)
-            if row:
-                result = dict(row)
-                duration_ms = (time.time() - start_time) * 1000
-                logger.info(f"[DB] ← {method_name} - {duration_ms:.2f}ms")
-                return result
-            duration_ms = (time.time() - start_time) * 1000
-            logger.info(f"[DB] ← {method_name} - {duration_ms:.2f}ms (no result)")
-            return None
-        except Exception as e:
-            duration_ms = (time.time() - start_time) * 1000
-            logger.error(f"[DB] ✗ {method_name} - {duration_ms:.2f}ms - Error: {e}")
-            raise
-
-    async def get_due_tasks(self, current_date: str, current_time: str) -> list[dict]:
-        method_name = "get_due_tasks"
-        start_time = time.time()
-        logger.info(f"[DB] → {method_name}")
-
-        try:
-            pool = await self._get_pool()
-            async with pool.acquire() as conn:
-                rows = await conn.fetch(
-                    """
-                    SELECT t.*, t.telegram_id AS chat_id FROM tasks t
-                    WHERE t.status='active' AND t.task_date IS NOT NULL AND t.task_time IS NOT NULL
-                    AND t.notified=FALSE
-                    AND (t.task_date<$1 OR (t.task_date=$1 AND t.task_time<=$2))
-                    """,
-                    current_date,
-                    current_time,
-                )
-            result = [dict(r) for r in rows]
-            duration_ms = (time.time() - start_time) * 1000
-            logger.info(
-                f"[DB] ← {method_name} - {duration_ms:.2f}ms ({len(result)} rows)"
+            if self._leader_conn is None:
+                self._leader_conn = await pool.acquire()
+            # Session-level advisory lock: живёт, пока живо соединение, поэтому
+            # при падении лидера Postgres отпускает его сам.
+            acquired = await self._leader_conn.run_query(
+                "fetchval", "try_acquire_leadership", name
             )
-            return result
-        except Exception as e:
-            duration_ms = (time.time() - start_time) * 1000
-            logger.error(f"[DB] ✗ {method_name} - {duration_ms:.2f}ms - Error: {e}")
+        except Exception:
+            await self.release_leadership()
             raise
-
-    async def mark_task_as_notified(self, task_id: int) -> None:
-        method_name = "mark_task_as_notified"
-        start_time = time.time()
-        logger.info(f"[DB] → {method_name}")
-
+        if acquired:
+            self._leader_lock = name
+        else:
+            await self.release_leadership()
+        logger.info(f"[DB] try_acquire_leadership - {name} acquired={acquired}")
+        return acquired
+
+    async def check_leadership(self) -> bool:
+        # Живого соединения мало: lock могли снять (pg_advisory_unlock_all,
+        # сброс сессии пулером), поэтому ищем его в pg_locks.
+        if self._leader_conn is None:
+            return False
         try:
-            pool = await self._get_pool()
-            async with pool.acquire() as conn:
-                await conn.execute(
-                    "UPDATE tasks SET notified=TRUE WHERE id=$1", task_id
-                )
-            duration_ms = (time.time() - start_time) * 1000
-            logger.info(f"[DB] ← {method_name} - {duration_ms:.2f}ms")
-        except Exception as e:
-            duration_ms = (time.time() - start_time) * 1000
-            logger.error(f"[DB] ✗ {method_name} - {duration_ms:.2f}ms - Error: {e}")
-            raise
-
-    async def get_users_for_time_check(
-        self, setting_type: str, current_time: str
+            held = await self._leader_conn.run_query(
+                "fetchval", "check_leadership", self._leader_lock
+            )
+        except _CONNECTION_ERRORS as e:
+            logger.error(f"[DB] ✗ check_leadership - leader connection lost: {e}")
+            await self.release_leadership()
+            return False
+        if not held:
+            logger.error(f"[DB] ✗ check_leadership - {self._leader_lock} not held")
+            await self.release_leadership()
+        return held
+
+    async def release_leadership(self) -> None:
+        # Возврат соединения в пул снимает все advisory locks сессии.
+        self._leader_lock = None
+        if self._leader_conn is not None:
+            conn, self._leader_conn = self._leader_conn, None
+            try:
+                await self._pool.release(conn)
+            except _CONNECTION_ERRORS as e:
+                logger.error(f"[DB] ✗ release_leadership - Error: {e}")
+
+    @_timed
+    async def claim_due_tasks(
+        self,
+        task_ids: list[int],
+        now: datetime,
+        lease_seconds: float,
     ) -> list[dict]:
-        method_name = "get_users_for_time_check"
-        start_time = time.time()
-        logger.info(
-            f"[DB] → {method_name} - Get users for {setting_type} at {current_time}"
-        )
+        return await self._fetch("claim_due_tasks", task_ids, now, lease_seconds)
 
-        if setting_type not in ("morning_digest_time", "evening_review_time"):
+    @_timed
+    async def extend_task_claims(
+        self, task_ids: list[int], lease_seconds: float
+    ) -> None:
+        await self._execute("extend_task_claims", task_ids, lease_seconds)
+
+    @_timed
+    async def release_task_claim(self, task_id: int) -> None:
+        await self._execute("release_task_claim", task_id)
+
+    @_timed
+    async def mark_tasks_as_notified(self, task_ids: list[int]) -> None:
+        await self._execute("mark_tasks_as_notified", task_ids)
+
+    @_timed
+    async def get_scheduled_digests(
+        self,
+        setting_type: str,
+        windows: list[dict],
+        include_undated: bool = False,
+    ) -> list[dict]:
+        if setting_type not in SETTING_TIME_COLUMNS:
             logger.warning(
-                f"[DB] ✗ {method_name} - Invalid setting_type: {setting_type}"
+                f"[DB] ✗ get_scheduled_digests - Invalid setting_type: {setting_type}"
             )
             return []
 
-        try:
-            pool = await self._get_pool()
-            async with pool.acquire() as conn:
-                rows = await conn.fetch(
-                    f"""
-                    SELECT t1.telegram_id, t2.{setting_type} AS setting_time
-                    FROM users t1
-                    JOIN user_settings t2 ON t1.telegram_id = t2.telegram_id
-                    WHERE t2.{setting_type} = $1
-                    """,
-                    current_time,
-                )
-
-            result = [dict(row) for row in rows]
-            duration_ms = (time.time() - start_time) * 1000
-            logger.info(
-                f"[DB] ← {method_name} - {duration_ms:.2f}ms ({len(result)} rows)"
-            )
-            return result
-        except Exception as e:
-            duration_ms = (time.time() - start_time) * 1000
-            logger.error(f"[DB] ✗ {method_name} - {duration_ms:.2f}ms - Error: {e}")
-            raise
-
-    async def get_active_tasks_for_digest(
-        self, telegram_id: int, today_date: str
-    ) -> list[dict]:
-        method_name = "get_active_tasks_for_digest"
-        start_time = time.time()
-        logger.info(
-            f"[DB] → {method_name} - Get active tasks for digest for {telegram_id} on {today_date}"
+        rows = await self._fetch(
+            f"get_scheduled_digests:{setting_type}",
+            [w["timezone"] for w in windows],
+            [_parse_time(w["window_start"]) for w in windows],
+            [_parse_time(w["window_end"]) for w in windows],
+            [_parse_date(w["local_date"]) for w in windows],
+            [_parse_date(w["task_date"]) for w in windows],
+            include_undated,
         )
 
-        try:
-            pool = await self._get_pool()
-            async with pool.acquire() as conn:
-                rows = await conn.fetch(
-                    """
-                    SELECT id, text, task_date, task_time, status
-                    FROM tasks
-                    WHERE telegram_id = $1 
-                        AND status = 'active'
-                        AND (task_date = $2 OR task_date IS NULL)
-                    ORDER BY CASE WHEN task_date IS NULL THEN 1 ELSE 0 END, 
-                             task_time ASC, 
-                             id ASC
-                    """,
-                    telegram_id,
-                    today_date,
+        result: list[dict] = []
+        for row in rows:
+            telegram_id = row.pop("telegram_id")
+            local_date = row.pop("local_date")
+            if not result or result[-1]["telegram_id"] != telegram_id:
+                result.append(
+                    {"telegram_id": telegram_id, "local_date": local_date, "tasks": []}
                 )
+            if row["id"] is not None:
+                result[-1]["tasks"].append(row)
+        return result
 
-            result = [dict(row) for row in rows]
-            duration_ms = (time.time() - start_time) * 1000
-            logger.info(
-                f"[DB] ← {method_name} - {duration_ms:.2f}ms ({len(result)} rows)"
-            )
-            return result
-        except Exception as e:
-            duration_ms = (time.time() - start_time) * 1000
-            logger.error(f"[DB] ✗ {method_name} - {duration_ms:.2f}ms - Error: {e}")
-            raise
-
-    async def get_tasks_for_tomorrow(
-        self, telegram_id: int, tomorrow_date: str
-    ) -> list[dict]:
-        method_name = "get_tasks_for_tomorrow"
-        start_time = time.time()
-        logger.info(
-            f"[DB] → {method_name} - Get tasks for tomorrow for {telegram_id} on {tomorrow_date}"
-        )
-
-        try:
-            pool = await self._get_pool()
-            async with pool.acquire() as conn:
-                rows = await conn.fetch(
-                    """
-                    SELECT id, text, task_date, task_time, status
-                    FROM tasks
-                    WHERE telegram_id = $1 
-                        AND status = 'active'
-                        AND task_date = $2
-                    ORDER BY task_time ASC, id ASC
-                    """,
-                    telegram_id,
-                    tomorrow_date,
-                )
-
-            result = [dict(row) for row in rows]
-            duration_ms = (time.time() - start_time) * 1000
-            logger.info(
-                f"[DB] ← {method_name} - {duration_ms:.2f}ms ({len(result)} rows)"
-            )
-            return result
-        except Exception as e:
-            duration_ms = (time.time() - start_time) * 1000
-            logger.error(f"[DB] ✗ {method_name} - {duration_ms:.2f}ms - Error: {e}")
-            raise
-
-    async def get_users_for_scheduled_notifications(
-        self, current_time: str, setting_type: str
-    ) -> list[dict]:
-        method_name = "get_users_for_scheduled_notifications"
-        start_time = time.time()
-        logger.info(
-            f"[DB] → {method_name} - Get users for scheduled notifications at {current_time} ({setting_type})"
-        )
-
-        if setting_type not in ("morning_digest_time", "evening_review_time"):
+    @_timed
+    async def mark_digest_sent(
+        self, setting_type: str, telegram_id: int, local_date: str
+    ) -> None:
+        if setting_type not in SETTING_TIME_COLUMNS:
             logger.warning(
-                f"[DB] ✗ {method_name} - Invalid setting_type: {setting_type}"
+                f"[DB] ✗ mark_digest_sent - Invalid setting_type: {setting_type}"
             )
-            return []
-
-        try:
-            pool = await self._get_pool()
-            async with pool.acquire() as conn:
-                rows = await conn.fetch(
-                    f"""
-                    SELECT t1.telegram_id
-                    FROM users AS t1
-                    JOIN user_settings AS t2 ON t1.telegram_id = t2.telegram_id
-                    WHERE t2.{setting_type} = $1
-                    """,
-                    current_time,
-                )
+            return
 
-            result = [dict(row) for row in rows]
-            duration_ms = (time.time() - start_time) * 1000
-            logger.info(
-                f"[DB] ← {method_name} - {duration_ms:.2f}ms ({len(result)} rows)"
-            )
-            return result
-        except Exception as e:
-            duration_ms = (time.time() - start_time) * 1000
-            logger.error(f"[DB] ✗ {method_name} - {duration_ms:.2f}ms - Error: {e}")
-            raise
+        await self._execute(
+            f"mark_digest_sent:{setting_type}", telegram_id, _parse_date(local_date)
+        )
@@ -1,5 +1,7 @@
 import json
 
+from bot.timezones import SUPPORTED_TIMEZONES
+
 MAIN_MENU_KEYBOARD = json.dumps(
     {
         "keyboard": [
@@ -18,6 +20,16 @@ SETTINGS_KEYBOARD = json.dumps(
         "inline_keyboard": [
             [{"text": "☀️ Изменить утро", "callback_data": "set_morning"}],
             [{"text": "🌙 Изменить вечер", "callback_data": "set_evening"}],
+            [{"text": "🌍 Часовой пояс", "callback_data": "set_timezone"}],
+        ]
+    }
+)
+
+TIMEZONE_KEYBOARD = json.dumps(
+    {
+        "inline_keyboard": [
+            [{"text": label, "callback_data": f"set_tz:{timezone}"}]
+            for timezone, label in SUPPORTED_TIMEZONES.items()
         ]
     }
 )
@@ -0,0 +1,57 @@
+import asyncio
+import logging
+from collections.abc import Awaitable, Callable, Hashable
+from typing import Any
+
+logger = logging.getLogger(__name__)
+logging.basicConfig(
+    level=logging.INFO,
+    format="[%(asctime)s.%(msecs)03d] %(message)s",
+    datefmt="%Y-%m-%d %H:%M:%S",
+)
+
+
+class KeyedExecutor:
+    """Выполняет задания параллельно, но строго по порядку внутри одного ключа."""
+
+    def __init__(self, max_concurrency: int, max_pending: int | None = None) -> None:
+        if max_concurrency < 1:
+            raise ValueError("max_concurrency must be >= 1")
+        self._running = asyncio.Semaphore(max_concurrency)
+        self._pending = asyncio.Semaphore(max_pending or max_concurrency * 4)
+        self._tails: dict[Hashable, asyncio.Task] = {}
+        self._tasks: set[asyncio.Task] = set()
+
+    async def submit(
+        self, key: Hashable | None, job: Callable[[], Awaitable[Any]]
+    ) -> asyncio.Task:
+        await self._pending.acquire()
+
+        previous = self._tails.get(key) if key is not None else None
+        task = asyncio.create_task(self._run(job, previous))
+        self._tasks.add(task)
+        if key is not None:
+            self._tails[key] = task
+        task.add_done_callback(lambda done: self._on_done(key, done))
+        return task
+
+    async def join(self) -> None:
+        while self._tasks:
+            await asyncio.wait(list(self._tasks))
+
+    async def _run(
+        self, job: Callable[[], Awaitable[Any]], previous: asyncio.Task | None
+    ) -> Any:
+        if previous is not None:
+            await asyncio.wait([previous])
+        async with self._running:
+            return await job()
+
+    def _on_done(self, key: Hashable | None, task: asyncio.Task) -> None:
+        self._tasks.discard(task)
+        self._pending.release()
+        if key is not None and self._tails.get(key) is task:
+            del self._tails[key]
+
+        if not task.cancelled() and task.exception() is not None:
+            logger.error(f"[EXECUTOR] ✗ job for key={key} failed: {task.exception()}")
@@ -1,11 +1,78 @@
-from bot.domain.messenger import Messenger
+import asyncio
+import logging
+
 from bot.dispatcher import Dispatcher
+from bot.domain.messenger import Messenger, MessengerError
+from bot.keyed_executor import KeyedExecutor
+from bot.update_offset_tracker import UpdateOffsetTracker
+from bot.update_queue import drain_updates
+
+logger = logging.getLogger(__name__)
+logging.basicConfig(
+    level=logging.INFO,
+    format="[%(asctime)s.%(msecs)03d] %(message)s",
+    datefmt="%Y-%m-%d %H:%M:%S",
+)
+
+FETCH_ERROR_PAUSE_SECONDS = 5
+
 
+async def start_long_polling(
+    dispatcher: Dispatcher,
+    messenger: Messenger,
+    max_concurrency: int = 1,
+    timeout: int = 30,
+    batch_size: int = 100,
+    offset_tracker: UpdateOffsetTracker | None = None,
+) -> None:
+    # Следующий getUpdates подтверждает Telegram всё, что уже получено, даже
+    # если оно ещё ждёт в очереди. Очередь на одну пачку ограничивает, сколько
+    # подтверждённых, но не обработанных updates теряется при падении.
+    queue: asyncio.Queue = asyncio.Queue(maxsize=batch_size)
+    executor = KeyedExecutor(max_concurrency)
+    first_offset = await offset_tracker.load() if offset_tracker else 0
 
-async def start_long_polling(dispatcher: Dispatcher, messenger: Messenger) -> None:
-    next_update_offset = 0
+    await messenger.delete_webhook()
+    drainer = asyncio.create_task(
+        drain_updates(queue, dispatcher, executor, offset_tracker)
+    )
+    try:
+        await _fetch_updates(
+            messenger,
+            queue,
+            timeout,
+            batch_size,
+            dispatcher.get_allowed_updates(),
+            first_offset,
+        )
+    finally:
+        drainer.cancel()
+        await executor.join()
+
+
+async def _fetch_updates(
+    messenger: Messenger,
+    queue: asyncio.Queue,
+    timeout: int,
+    batch_size: int,
+    allowed_updates: list[str],
+    first_offset: int = 0,
+) -> None:
+    params: dict = {
+        "timeout": timeout,
+        "limit": batch_size,
+        "allowed_updates": allowed_updates,
+    }
+
+    next_update_offset = first_offset
     while True:
-        updates = await messenger.get_updates(offset=next_update_offset)
+        try:
+            updates = await messenger.get_updates(offset=next_update_offset, **params)
+        except MessengerError as e:
+            logger.error(f"[POLLING] ✗ getUpdates failed, pausing - Error: {e}")
+            await asyncio.sleep(FETCH_ERROR_PAUSE_SECONDS)
+            continue
+
         for update in updates:
             next_update_offset = max(next_update_offset, update["update_id"] + 1)
-            await dispatcher.dispatch(update)
+            await queue.put(update)
@@ -0,0 +1,16 @@
+import asyncio
+
+from bot.infrastructure.storage_postgres import StoragePostgres
+
+
+async def main():
+    # Таблиц может ещё не быть: запросы реестра не готовим заранее.
+    storage = StoragePostgres(prepare_statements=False)
+    try:
+        await storage.migrate_database()
+    finally:
+        await storage.close()
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
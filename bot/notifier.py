@@ -1,80 +1,319 @@
 import asyncio
-from datetime import datetime, timedelta
+import logging
+import time
+from datetime import UTC, datetime, timedelta
+from functools import partial
+from zoneinfo import ZoneInfo
+
+from bot.domain.messenger import (
+    MessagePriority,
+    Messenger,
+    MessengerError,
+    message_priority,
+)
 from bot.domain.storage import Storage
-from bot.domain.messenger import Messenger
 from bot.handlers.tools.task_card import (
     format_task_card_text,
+    format_task_list_messages,
     get_task_card_reply_markup,
 )
+from bot.keyed_executor import KeyedExecutor
+from bot.reminder_scheduler import ReminderScheduler
+from bot.timezones import SUPPORTED_TIMEZONES
+
+logger = logging.getLogger(__name__)
+logging.basicConfig(
+    level=logging.INFO,
+    format="[%(asctime)s.%(msecs)03d] %(message)s",
+    datefmt="%Y-%m-%d %H:%M:%S",
+)
+
+NOTIFIER_LEADER_LOCK = "todo_bot_notifier"
+
+_wave_reports: set[asyncio.Task] = set()
+_pending_digests: set[tuple[str, int]] = set()
 
 
-async def start_notifier(storage: Storage, messenger: Messenger) -> None:
+async def run_notifier_as_leader(
+    storage: Storage,
+    messenger: Messenger,
+    max_concurrency: int = 32,
+    check_interval: float = 5,
+    catch_up: timedelta = timedelta(hours=1),
+    compact_digests: bool = True,
+) -> None:
+    """Запускает notifier только в той реплике, что держит advisory lock.
+
+    Остальные реплики раз в check_interval пробуют захватить lock. Если
+    лидер падает, Postgres отпускает lock вместе с его соединением, и
+    notifier переезжает в другую реплику.
+    """
     while True:
         try:
-            now = datetime.now()
-            current_date = now.strftime("%Y-%m-%d")
-            current_time = now.strftime("%H:%M")
-            tomorrow_date = (now + timedelta(days=1)).strftime("%Y-%m-%d")
+            acquired = await storage.try_acquire_leadership(NOTIFIER_LEADER_LOCK)
+        except Exception:
+            logger.exception("[NOTIFIER] ✗ leader election failed")
+            acquired = False
+
+        if not acquired:
+            await asyncio.sleep(check_interval)
+            continue
+
+        logger.info("[NOTIFIER] → became leader, starting notifier")
+        notifier = asyncio.create_task(
+            start_notifier(
+                storage, messenger, max_concurrency, catch_up, compact_digests
+            )
+        )
+        try:
+            while not notifier.done():
+                await asyncio.wait([notifier], timeout=check_interval)
+                if not notifier.done() and not await storage.check_leadership():
+                    logger.error("[NOTIFIER] ✗ leadership lost, stopping notifier")
+                    break
+        finally:
+            notifier.cancel()
+            await asyncio.gather(notifier, return_exceptions=True)
+            if not notifier.cancelled() and notifier.exception() is not None:
+                logger.error(f"[NOTIFIER] ✗ notifier failed: {notifier.exception()}")
+            await storage.release_leadership()
 
-            due_tasks = await storage.get_due_tasks(current_date, current_time)
 
-            for task in due_tasks:
-                task_id = task["id"]
-                chat_id = task["chat_id"]
+async def start_notifier(
+    storage: Storage,
+    messenger: Messenger,
+    max_concurrency: int = 32,
+    catch_up: timedelta = timedelta(hours=1),
+    compact_digests: bool = True,
+) -> None:
+    message_priority.set(MessagePriority.BULK)
+    # Ключ — chat_id: чаты обслуживаются параллельно, а сообщения внутри
+    # одного чата уходят по порядку. Темп задаёт rate limiter мессенджера.
+    # У напоминаний своя очередь, чтобы не стоять за волной дайджестов.
+    reminder_executor = KeyedExecutor(max_concurrency)
+    digest_executor = KeyedExecutor(max_concurrency)
+    scheduler = ReminderScheduler(
+        storage, partial(_send_reminders, reminder_executor, storage, messenger)
+    )
+    await scheduler.start()
+    try:
+        await _run_digests(
+            storage, messenger, digest_executor, catch_up, compact_digests
+        )
+    finally:
+        await scheduler.close()
+        await reminder_executor.join()
+        await digest_executor.join()
 
-                card_text = "⏰ НАПОМИНАНИЕ!\n" + format_task_card_text(task)
-                card_markup = get_task_card_reply_markup(task_id)
 
-                await messenger.send_message(
-                    chat_id=chat_id, text=card_text, reply_markup=card_markup
-                )
+async def _send_reminders(
+    executor: KeyedExecutor,
+    storage: Storage,
+    messenger: Messenger,
+    tasks: list[dict],
+    mark_interval: float = 1,
+) -> None:
+    jobs = {
+        await executor.submit(
+            task["telegram_id"], partial(_send_reminder, storage, messenger, task)
+        ): task["id"]
+        for task in tasks
+    }
 
-                await storage.mark_task_as_notified(task_id)
+    # Отправленные отмечаются пачками не реже раза в mark_interval: одна
+    # медленная отправка не держит остальные неотмеченными до конца пачки.
+    pending = set(jobs)
+    while pending:
+        done, pending = await asyncio.wait(pending, timeout=mark_interval)
+        sent_ids = [
+            jobs[job]
+            for job in done
+            if not job.cancelled() and job.exception() is None and job.result()
+        ]
+        if sent_ids:
+            await storage.mark_tasks_as_notified(sorted(sent_ids))
 
-            morning_users = await storage.get_users_for_scheduled_notifications(
-                current_time, "morning_digest_time"
-            )
 
-            for user in morning_users:
-                chat_id = user["telegram_id"]
+async def _send_reminder(storage: Storage, messenger: Messenger, task: dict) -> bool:
+    task_id = task["id"]
+    card_text = "⏰ НАПОМИНАНИЕ!\n" + format_task_card_text(task)
+    card_markup = get_task_card_reply_markup(task_id)
 
-                tasks_for_digest = await storage.get_active_tasks_for_digest(
-                    chat_id, current_date
-                )
+    try:
+        await messenger.send_message(
+            chat_id=task["telegram_id"], text=card_text, reply_markup=card_markup
+        )
+    except MessengerError as e:
+        logger.error(f"[NOTIFIER] ✗ reminder {task_id} not sent - Error: {e}")
+        # Снимаем захват, чтобы напоминание подобрало следующее обновление окна.
+        await storage.release_task_claim(task_id)
+        return False
+
+    return True
 
-                await _send_task_list(
-                    messenger,
-                    chat_id,
-                    "Утренний дайджест на сегодня",
-                    tasks_for_digest,
-                )
 
-            evening_users = await storage.get_users_for_scheduled_notifications(
-                current_time, "evening_review_time"
+async def _run_digests(
+    storage: Storage,
+    messenger: Messenger,
+    executor: KeyedExecutor,
+    catch_up: timedelta = timedelta(hours=1),
+    compact_digests: bool = True,
+) -> None:
+    while True:
+        now = datetime.now(UTC)
+        try:
+            await _send_scheduled_digests(
+                storage, messenger, executor, now, catch_up, compact_digests
             )
+        except Exception:
+            logger.exception("[NOTIFIER] ✗ digest tick failed")
+
+        next_minute = now.replace(second=0, microsecond=0) + timedelta(minutes=1)
+        delay = (next_minute - datetime.now(UTC)).total_seconds()
+        await asyncio.sleep(max(0.0, delay))
+
+
+async def _send_scheduled_digests(
+    storage: Storage,
+    messenger: Messenger,
+    executor: KeyedExecutor,
+    now: datetime,
+    catch_up: timedelta = timedelta(hours=1),
+    compact_digests: bool = True,
+) -> None:
+    """Одна минута расписания: выборка наступивших дайджестов и их отправка.
+
+    Отметка *_sent_on ставится per chat после попытки отправки. Рестарт
+    посреди волны не теряет ещё не отправленные дайджесты — они выберутся
+    снова. Дайджест, не ушедший из-за ошибки мессенджера, тоже отмечается и
+    не повторяется: дубль хуже пропуска, а следующий придёт по расписанию.
+    """
+    morning_digests = await storage.get_scheduled_digests(
+        "morning_digest_time",
+        _digest_windows(now, catch_up, days_ahead=0),
+        include_undated=True,
+    )
 
-            for user in evening_users:
-                chat_id = user["telegram_id"]
+    await _send_digest_wave(
+        executor,
+        storage,
+        messenger,
+        "morning_digest_time",
+        "Утренний дайджест на сегодня",
+        morning_digests,
+        compact_digests,
+    )
 
-                tasks_for_tomorrow = await storage.get_tasks_for_tomorrow(
-                    chat_id, tomorrow_date
-                )
+    evening_digests = await storage.get_scheduled_digests(
+        "evening_review_time", _digest_windows(now, catch_up, days_ahead=1)
+    )
 
-                await _send_task_list(
-                    messenger,
-                    chat_id,
-                    "Вечерний обзор задач на завтра",
-                    tasks_for_tomorrow,
-                )
+    await _send_digest_wave(
+        executor,
+        storage,
+        messenger,
+        "evening_review_time",
+        "Вечерний обзор задач на завтра",
+        evening_digests,
+        compact_digests,
+    )
 
-        except Exception as e:
-            print(f"Error in notifier: {e}")
 
-        await asyncio.sleep(60)
+def _digest_windows(now: datetime, catch_up: timedelta, days_ahead: int) -> list[dict]:
+    # Для каждого часового пояса — окно [local_now - catch_up, local_now] в
+    # пределах текущих локальных суток: дайджесты, пропущенные из-за
+    # рестарта или долгой итерации, уходят с опозданием, а не теряются.
+    windows = []
+    for tz_name in SUPPORTED_TIMEZONES:
+        local = now.astimezone(ZoneInfo(tz_name))
+        midnight = local.replace(hour=0, minute=0, second=0, microsecond=0)
+        windows.append(
+            {
+                "timezone": tz_name,
+                "window_start": max(local - catch_up, midnight).strftime("%H:%M"),
+                "window_end": local.strftime("%H:%M"),
+                "local_date": local.strftime("%Y-%m-%d"),
+                "task_date": (local + timedelta(days=days_ahead)).strftime("%Y-%m-%d"),
+            }
+        )
+    return windows
+
+
+async def _send_digest_wave(
+    executor: KeyedExecutor,
+    storage: Storage,
+    messenger: Messenger,
+    setting_type: str,
+    title: str,
+    digests: list[dict],
+    compact: bool = True,
+) -> None:
+    started = time.monotonic()
+    jobs = []
+    for digest in digests:
+        chat_id = digest["telegram_id"]
+        # Дайджест из прошлой волны ещё ждёт в executor и не отмечен —
+        # выборка вернула его снова.
+        if (setting_type, chat_id) in _pending_digests:
+            continue
+        _pending_digests.add((setting_type, chat_id))
+        job = partial(
+            _send_digest, storage, messenger, setting_type, title, digest, compact
+        )
+        jobs.append(await executor.submit(chat_id, job))
+
+    if not jobs:
+        return
+
+    # submit ждёт, пока в executor освободится место (max_pending), так что
+    # большая волна держит минутный цикл, пока её хвост не встанет в очередь.
+    # Завершения хвоста здесь не ждём — итог волны пишет _report_wave.
+    report = asyncio.create_task(_report_wave(title, jobs, started))
+    _wave_reports.add(report)
+    report.add_done_callback(_wave_reports.discard)
+
+
+async def _send_digest(
+    storage: Storage,
+    messenger: Messenger,
+    setting_type: str,
+    title: str,
+    digest: dict,
+    compact: bool = True,
+) -> None:
+    chat_id = digest["telegram_id"]
+    mark_sent = partial(
+        storage.mark_digest_sent, setting_type, chat_id, digest["local_date"]
+    )
+    try:
+        try:
+            await _send_task_list(messenger, chat_id, title, digest["tasks"], compact)
+        except Exception:
+            # Неудачная отправка тоже отмечается: дубль хуже пропуска.
+            # Отменённая (остановка notifier) не отмечается и уйдёт позже.
+            await mark_sent()
+            raise
+        await mark_sent()
+    finally:
+        _pending_digests.discard((setting_type, chat_id))
+
+
+async def _report_wave(title: str, jobs: list[asyncio.Task], started: float) -> None:
+    await asyncio.wait(jobs)
+    failed = sum(1 for job in jobs if job.cancelled() or job.exception() is not None)
+    duration_ms = (time.monotonic() - started) * 1000
+    logger.info(
+        f"[NOTIFIER] ← {title}: {len(jobs)} chats, {failed} failed - "
+        f"{duration_ms:.2f}ms"
+    )
 
 
 async def _send_task_list(
-    messenger: Messenger, chat_id: int, title: str, tasks: list[dict]
+    messenger: Messenger,
+    chat_id: int,
+    title: str,
+    tasks: list[dict],
+    compact: bool = True,
 ) -> None:
     header_text = f"{'☀️' if 'Утренний дайджест' in title else '🌙'} {title}\n"
 
@@ -82,6 +321,11 @@ async def _send_task_list(
         await messenger.send_message(
             chat_id=chat_id, text=f"{header_text}Список задач пуст!"
         )
+    elif compact:
+        for text, reply_markup in format_task_list_messages(header_text, tasks):
+            await messenger.send_message(
+                chat_id=chat_id, text=text, reply_markup=reply_markup
+            )
     else:
         await messenger.send_message(chat_id=chat_id, text=header_text)
 
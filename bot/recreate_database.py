@@ -1,9 +1,10 @@
 import asyncio
+
 from bot.infrastructure.storage_postgres import StoragePostgres
 
 
 async def main():
-    await StoragePostgres().recreate_database()
+    await StoragePostgres(prepare_statements=False).recreate_database()
 
 
 if __name__ == "__main__":
@@ -0,0 +1,195 @@
+import asyncio
+import heapq
+import logging
+from collections.abc import Awaitable, Callable
+from datetime import UTC, datetime, timedelta
+from functools import partial
+
+from bot.domain.storage import Storage
+
+logger = logging.getLogger(__name__)
+logging.basicConfig(
+    level=logging.INFO,
+    format="[%(asctime)s.%(msecs)03d] %(message)s",
+    datefmt="%Y-%m-%d %H:%M:%S",
+)
+
+
+class ReminderScheduler:
+    """Min-heap напоминаний, которые наступят в ближайшие horizon.
+
+    Цикл спит ровно до ближайшего due_at. Изменения задач приходят через
+    storage.listen_task_changes, а раз в refresh_interval окно перечитывается
+    из базы на случай пропущенных уведомлений. Отменённые и перенесённые
+    записи не удаляются из кучи, а пропускаются при извлечении. Наступившие
+    напоминания захватываются в storage на claim_lease, поэтому несколько
+    процессов с одним расписанием не отправят одно напоминание дважды. Пока
+    доставка не закончилась, аренда продлевается каждые claim_lease / 2:
+    ожидание в очереди и повторы отправки могут длиться дольше аренды.
+    """
+
+    def __init__(
+        self,
+        storage: Storage,
+        on_due: Callable[[list[dict]], Awaitable[None]],
+        horizon: timedelta = timedelta(hours=1),
+        refresh_interval: timedelta = timedelta(minutes=5),
+        claim_lease: timedelta = timedelta(minutes=5),
+        now: Callable[[], datetime] | None = None,
+    ) -> None:
+        self._storage = storage
+        self._on_due = on_due
+        self._horizon = horizon
+        self._refresh_interval = refresh_interval.total_seconds()
+        self._claim_lease = claim_lease.total_seconds()
+        self._now = now or partial(datetime.now, UTC)
+
+        self._heap: list[tuple[datetime, int]] = []
+        self._due_at: dict[int, datetime] = {}
+        self._changed = asyncio.Event()
+        self._tasks: set[asyncio.Task] = set()
+        self._in_flight: set[int] = set()
+
+    def __len__(self) -> int:
+        return len(self._due_at)
+
+    async def start(self) -> None:
+        try:
+            await self.refresh()
+        except Exception:
+            logger.exception("[REMINDERS] ✗ initial refresh failed")
+        try:
+            await self._storage.listen_task_changes(self.on_task_changed)
+        except Exception:
+            logger.exception("[REMINDERS] ✗ LISTEN failed, relying on refresh")
+        self._spawn(self._run())
+        self._spawn(self._refresh_periodically())
+
+    async def close(self) -> None:
+        try:
+            await self._storage.unlisten_task_changes()
+        except Exception:
+            logger.exception("[REMINDERS] ✗ UNLISTEN failed")
+        for task in list(self._tasks):
+            task.cancel()
+        await asyncio.gather(*self._tasks, return_exceptions=True)
+
+    def schedule(self, task_id: int, due_at: datetime) -> None:
+        if self._due_at.get(task_id) == due_at:
+            return
+        self._due_at[task_id] = due_at
+        heapq.heappush(self._heap, (due_at, task_id))
+        if self._heap[0] == (due_at, task_id):
+            self._changed.set()
+
+    def cancel(self, task_id: int) -> None:
+        self._due_at.pop(task_id, None)
+
+    async def refresh(self) -> None:
+        until = self._now() + self._horizon
+        tasks = await self._storage.get_due_tasks(until)
+        for task in tasks:
+            if (due_at := get_reminder_due_at(task)) is not None:
+                self.schedule(task["id"], due_at)
+        logger.info(f"[REMINDERS] refreshed - {len(self)} reminders scheduled")
+
+    def on_task_changed(self, task_id: int) -> None:
+        self._spawn(self._reload_task(task_id))
+
+    async def _reload_task(self, task_id: int) -> None:
+        # Ошибку только логируем: задачу подберёт следующий refresh.
+        try:
+            task = await self._storage.get_task_by_id(task_id)
+        except Exception:
+            logger.exception(f"[REMINDERS] ✗ reloading task {task_id} failed")
+            return
+        due_at = get_reminder_due_at(task) if task else None
+        if due_at is None or due_at > self._now() + self._horizon:
+            self.cancel(task_id)
+        else:
+            self.schedule(task_id, due_at)
+
+    async def _run(self) -> None:
+        while True:
+            if task_ids := self._pop_due():
+                try:
+                    await self._fire(task_ids)
+                except Exception:
+                    logger.exception(f"[REMINDERS] ✗ claiming {task_ids} failed")
+
+            self._changed.clear()
+            try:
+                await asyncio.wait_for(self._changed.wait(), self._seconds_to_next())
+            except TimeoutError:
+                pass
+
+    async def _fire(self, task_ids: list[int]) -> None:
+        # Claim заново проверяет строки и не отдаёт их другому воркеру, пока
+        # не истекла аренда. Выполненные, перенесённые и уже захваченные
+        # задачи просто не вернутся.
+        # Задачи, которые этот процесс ещё доставляет, refresh вернёт в кучу
+        # снова — их не захватываем повторно.
+        task_ids = [task_id for task_id in task_ids if task_id not in self._in_flight]
+        if not task_ids:
+            return
+        now = self._now()
+        tasks = await self._storage.claim_due_tasks(task_ids, now, self._claim_lease)
+        if tasks:
+            self._spawn(self._deliver(tasks))
+
+    async def _deliver(self, tasks: list[dict]) -> None:
+        task_ids = [task["id"] for task in tasks]
+        self._in_flight.update(task_ids)
+        renewal = asyncio.create_task(self._renew_claims(task_ids))
+        try:
+            await self._on_due(tasks)
+        except Exception:
+            logger.exception(f"[REMINDERS] ✗ reminders {task_ids} failed")
+        finally:
+            renewal.cancel()
+            self._in_flight.difference_update(task_ids)
+
+    async def _renew_claims(self, task_ids: list[int]) -> None:
+        # Отмеченные и освобождённые задачи storage не продлевает.
+        while True:
+            await asyncio.sleep(self._claim_lease / 2)
+            try:
+                await self._storage.extend_task_claims(task_ids, self._claim_lease)
+            except Exception:
+                logger.exception(f"[REMINDERS] ✗ extending claims {task_ids} failed")
+
+    def _pop_due(self) -> list[int]:
+        now = self._now()
+        due = []
+        while self._heap and self._heap[0][0] <= now:
+            due_at, task_id = heapq.heappop(self._heap)
+            if self._due_at.get(task_id) == due_at:
+                del self._due_at[task_id]
+                due.append(task_id)
+        return due
+
+    def _seconds_to_next(self) -> float | None:
+        while self._heap and self._due_at.get(self._heap[0][1]) != self._heap[0][0]:
+            heapq.heappop(self._heap)
+        if not self._heap:
+            return None
+        return max(0.0, (self._heap[0][0] - self._now()).total_seconds())
+
+    async def _refresh_periodically(self) -> None:
+        while True:
+            await asyncio.sleep(self._refresh_interval)
+            try:
+                await self.refresh()
+            except Exception:
+                logger.exception("[REMINDERS] ✗ refresh failed")
+
+    def _spawn(self, coro: Awaitable[None]) -> None:
+        task = asyncio.create_task(coro)
+        self._tasks.add(task)
+        task.add_done_callback(self._tasks.discard)
+
+
+def get_reminder_due_at(task: dict) -> datetime | None:
+    if task.get("status") != "active" or task.get("notified"):
+        return None
+    return task.get("due_at")
@@ -0,0 +1,71 @@
+from itertools import chain
+
+from bot.handlers.tools.handler import Handler
+
+_OTHER = object()
+
+
+def _matches(declared: tuple | None, value: object) -> bool:
+    return declared is None or (value is not _OTHER and value in declared)
+
+
+class _RouteBucket:
+    def __init__(self, kind: object, state: object, handlers: list[Handler]) -> None:
+        self.always: list[int] = []
+        self.by_text: dict[str, list[int]] = {}
+        self.by_prefix: dict[str, list[int]] = {}
+
+        for index, handler in enumerate(handlers):
+            if not _matches(handler.update_kinds, kind):
+                continue
+            if not _matches(handler.states, state):
+                continue
+
+            if kind == "message" and handler.texts is not None:
+                for text in handler.texts:
+                    self.by_text.setdefault(text, []).append(index)
+            elif kind == "callback_query" and handler.callback_prefixes is not None:
+                for prefix in handler.callback_prefixes:
+                    self.by_prefix.setdefault(prefix, []).append(index)
+            else:
+                self.always.append(index)
+
+    def candidates(self, kind: object, update: dict) -> list[int]:
+        if kind == "message":
+            text = update["message"].get("text")
+            return sorted(chain(self.always, self.by_text.get(text, ())))
+
+        if kind == "callback_query":
+            data = update["callback_query"].get("data") or ""
+            matched = [
+                indexes
+                for prefix, indexes in self.by_prefix.items()
+                if data.startswith(prefix)
+            ]
+            return sorted(chain(self.always, *matched))
+
+        return self.always
+
+
+class RoutingTable:
+    """Заранее собранный индекс: вид update × состояние → текст/префикс → хендлеры."""
+
+    def __init__(self, handlers: list[Handler]) -> None:
+        self._handlers = list(handlers)
+
+        self._kinds = {"message", "callback_query"}
+        self._states: set[str | None] = set()
+        for handler in self._handlers:
+            self._kinds.update(handler.update_kinds or ())
+            self._states.update(handler.states or ())
+
+        self._buckets: dict[tuple[object, object], _RouteBucket] = {}
+        for kind in (*self._kinds, _OTHER):
+            for state in (*self._states, _OTHER):
+                self._buckets[(kind, state)] = _RouteBucket(kind, state, self._handlers)
+
+    def candidates(self, update: dict, state: str | None) -> list[Handler]:
+        kind = next((key for key in update if key in self._kinds), _OTHER)
+        state_key = state if state in self._states else _OTHER
+        bucket = self._buckets[(kind, state_key)]
+        return [self._handlers[i] for i in bucket.candidates(kind, update)]
@@ -0,0 +1,32 @@
+import asyncio
+import os
+from datetime import timedelta
+
+from bot.domain.messenger import Messenger
+from bot.domain.storage import Storage
+from bot.infrastructure.messenger_telegram import MessengerTelegram
+from bot.infrastructure.storage_postgres import StoragePostgres
+from bot.notifier import run_notifier_as_leader
+
+
+async def main() -> None:
+    storage: Storage = StoragePostgres()
+    messenger: Messenger = MessengerTelegram()
+    try:
+        await run_notifier_as_leader(
+            storage,
+            messenger,
+            max_concurrency=int(os.getenv("NOTIFIER_MAX_CONCURRENCY", "32")),
+            check_interval=float(os.getenv("NOTIFIER_LEADER_CHECK_INTERVAL", "5")),
+            catch_up=timedelta(minutes=int(os.getenv("DIGEST_CATCH_UP_MINUTES", "60"))),
+            compact_digests=os.getenv("DIGEST_COMPACT", "true") == "true",
+        )
+    except KeyboardInterrupt:
+        print("\nBye!")
+    finally:
+        await messenger.close()
+        await storage.close()
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,23 @@
+from datetime import datetime
+from zoneinfo import ZoneInfo
+
+DEFAULT_TIMEZONE = "Europe/Moscow"
+
+SUPPORTED_TIMEZONES = {
+    "Europe/Kaliningrad": "Калининград (UTC+2)",
+    "Europe/Moscow": "Москва (UTC+3)",
+    "Europe/Samara": "Самара (UTC+4)",
+    "Asia/Yekaterinburg": "Екатеринбург (UTC+5)",
+    "Asia/Omsk": "Омск (UTC+6)",
+    "Asia/Novosibirsk": "Новосибирск (UTC+7)",
+    "Asia/Irkutsk": "Иркутск (UTC+8)",
+    "Asia/Yakutsk": "Якутск (UTC+9)",
+    "Asia/Vladivostok": "Владивосток (UTC+10)",
+    "Asia/Magadan": "Магадан (UTC+11)",
+    "Asia/Kamchatka": "Камчатка (UTC+12)",
+    "UTC": "UTC",
+}
+
+
+def local_now(timezone: str | None) -> datetime:
+    return datetime.now(ZoneInfo(timezone or DEFAULT_TIMEZONE))
@@ -0,0 +1,113 @@
+import asyncio
+import logging
+import time
+
+from bot.domain.storage import Storage
+
+logger = logging.getLogger(__name__)
+logging.basicConfig(
+    level=logging.INFO,
+    format="[%(asctime)s.%(msecs)03d] %(message)s",
+    datefmt="%Y-%m-%d %H:%M:%S",
+)
+
+
+class UpdateLogWriter:
+    """Write-behind буфер для telegram_updates.
+
+    Updates копятся в памяти и пишутся пачками через storage.persist_updates,
+    когда набралось batch_size строк или прошло flush_interval_ms. add никогда
+    не ждёт базу: при переполнении буфера старые updates отбрасываются.
+    """
+
+    def __init__(
+        self,
+        storage: Storage,
+        batch_size: int = 200,
+        flush_interval_ms: int = 500,
+        max_buffer_size: int = 10_000,
+    ) -> None:
+        self._storage = storage
+        self._batch_size = batch_size
+        self._flush_interval = flush_interval_ms / 1000
+        self._max_buffer_size = max(max_buffer_size, batch_size)
+
+        self._buffer: list[dict] = []
+        self._flush_lock = asyncio.Lock()
+        self._batch_ready = asyncio.Event()
+        self._task: asyncio.Task | None = None
+        self._stopping = False
+
+    def start(self) -> None:
+        if self._task is None:
+            self._task = asyncio.create_task(self._run())
+
+    async def add(self, update: dict) -> None:
+        self._drop_overflow()
+        self._buffer.append(update)
+        if len(self._buffer) >= self._batch_size:
+            self._batch_ready.set()
+
+    async def flush(self) -> None:
+        async with self._flush_lock:
+            while self._buffer:
+                batch = self._buffer[: self._batch_size]
+                del self._buffer[: len(batch)]
+
+                start_time = time.time()
+                try:
+                    await self._storage.persist_updates(batch)
+                except Exception as e:
+                    self._buffer[:0] = batch
+                    duration_ms = (time.time() - start_time) * 1000
+                    logger.error(
+                        f"[UPDATE LOG] ✗ flush of {len(batch)} updates failed - "
+                        f"{duration_ms:.2f}ms - Error: {e}"
+                    )
+                    raise
+                except asyncio.CancelledError:
+                    self._buffer[:0] = batch
+                    raise
+
+    async def close(self) -> None:
+        if self._task is not None:
+            # Не отменяем _run: отмена посреди persist_updates оборвала бы
+            # пачку на лету. Будим цикл и ждём, пока он допишет её и выйдет.
+            self._stopping = True
+            self._batch_ready.set()
+            await self._task
+            self._task = None
+        # Ошибку только логируем: close вызывается при остановке, и за ним
+        # ещё должны закрыться messenger и storage.
+        try:
+            await self.flush()
+        except Exception:
+            logger.exception(
+                f"[UPDATE LOG] ✗ final flush failed, {len(self._buffer)} updates lost"
+            )
+
+    async def _run(self) -> None:
+        while not self._stopping:
+            try:
+                await asyncio.wait_for(
+                    self._batch_ready.wait(), timeout=self._flush_interval
+                )
+            except TimeoutError:
+                pass
+            self._batch_ready.clear()
+            if self._stopping:
+                return
+
+            try:
+                await self.flush()
+            except Exception:
+                logger.exception(
+                    f"[UPDATE LOG] ✗ retrying flush in {self._flush_interval}s"
+                )
+                await asyncio.sleep(self._flush_interval)
+
+    def _drop_overflow(self) -> None:
+        overflow = len(self._buffer) - self._max_buffer_size + 1
+        if overflow > 0:
+            del self._buffer[:overflow]
+            logger.error(f"[UPDATE LOG] ✗ buffer is full, dropped {overflow} updates")
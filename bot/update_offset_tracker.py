@@ -0,0 +1,92 @@
+import asyncio
+import logging
+
+from bot.domain.storage import Storage
+from bot.lru_set import LRUSet
+
+logger = logging.getLogger(__name__)
+logging.basicConfig(
+    level=logging.INFO,
+    format="[%(asctime)s.%(msecs)03d] %(message)s",
+    datefmt="%Y-%m-%d %H:%M:%S",
+)
+
+
+class UpdateOffsetTracker:
+    """Водяной знак обработанных update_id с периодическим сохранением в storage.
+
+    committed — наибольший update_id, до которого включительно все updates
+    уже обработаны. После рестарта получение начинается с committed + 1, а
+    повторные доставки отсекаются по committed и по окну недавних update_id.
+
+    Webhook не гарантирует порядок доставки: update 4 может прийти после
+    уже сохранённого 5. Поэтому в этом режиме (load(ordered=False))
+    дубликаты отсекаются только по окну недавних update_id.
+    """
+
+    def __init__(
+        self,
+        storage: Storage,
+        checkpoint_interval_ms: int = 1000,
+        dedup_window: int = 10_000,
+    ) -> None:
+        self._storage = storage
+        self._checkpoint_interval = checkpoint_interval_ms / 1000
+        self._recent = LRUSet(dedup_window)
+        self._in_flight: set[int] = set()
+        self._max_started = 0
+        self._saved = 0
+        self._ordered = True
+        self._task: asyncio.Task | None = None
+
+    @property
+    def committed(self) -> int:
+        if self._in_flight:
+            return min(self._in_flight) - 1
+        return self._max_started
+
+    async def load(self, ordered: bool = True) -> int:
+        self._ordered = ordered
+        self._saved = self._max_started = await self._storage.get_update_offset()
+        logger.info(f"[UPDATE OFFSET] resuming after update_id={self._saved}")
+        return self._saved + 1
+
+    def start(self) -> None:
+        if self._task is None:
+            self._task = asyncio.create_task(self._run())
+
+    def begin(self, update_id: int) -> bool:
+        if (self._ordered and update_id <= self._saved) or update_id in self._recent:
+            logger.info(f"[UPDATE OFFSET] skipping duplicate update_id={update_id}")
+            return False
+        self._recent.add(update_id)
+        self._in_flight.add(update_id)
+        self._max_started = max(self._max_started, update_id)
+        return True
+
+    def finish(self, update_id: int) -> None:
+        self._in_flight.discard(update_id)
+
+    async def checkpoint(self) -> None:
+        committed = self.committed
+        if committed > self._saved:
+            await self._storage.save_update_offset(committed)
+            self._saved = committed
+
+    async def close(self) -> None:
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+        await self.checkpoint()
+
+    async def _run(self) -> None:
+        while True:
+            await asyncio.sleep(self._checkpoint_interval)
+            try:
+                await self.checkpoint()
+            except Exception:
+                logger.exception("[UPDATE OFFSET] ✗ checkpoint failed")
@@ -0,0 +1,38 @@
+import asyncio
+from functools import partial
+
+from bot.dispatcher import Dispatcher
+from bot.keyed_executor import KeyedExecutor
+from bot.update_offset_tracker import UpdateOffsetTracker
+
+
+async def drain_updates(
+    queue: asyncio.Queue,
+    dispatcher: Dispatcher,
+    executor: KeyedExecutor,
+    offset_tracker: UpdateOffsetTracker | None = None,
+) -> None:
+    while True:
+        update = await queue.get()
+        try:
+            if offset_tracker is None:
+                job = partial(dispatcher.dispatch, update)
+            elif offset_tracker.begin(update["update_id"]):
+                job = partial(_dispatch_tracked, dispatcher, offset_tracker, update)
+            else:
+                continue
+            telegram_id = dispatcher._get_telegram_id_from_update(update)
+            await executor.submit(telegram_id, job)
+        finally:
+            queue.task_done()
+
+
+async def _dispatch_tracked(
+    dispatcher: Dispatcher, offset_tracker: UpdateOffsetTracker, update: dict
+) -> None:
+    try:
+        await dispatcher.dispatch(update)
+    finally:
+        # Упавший update тоже считается обработанным, иначе водяной знак
+        # застрянет на нём навсегда.
+        offset_tracker.finish(update["update_id"])
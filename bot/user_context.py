@@ -0,0 +1,110 @@
+import copy
+import json
+from typing import Any
+
+from bot.domain.storage import Storage
+from bot.timezones import DEFAULT_TIMEZONE
+
+
+class UserContext:
+    """Строка users на время одного update.
+
+    Dispatcher читает её один раз, хендлеры получают контекст вместо storage
+    и меняют state/data_json в памяти, а в конце dispatch изменения
+    записываются одним UPDATE. Изменённые ключи data_json сливаются с
+    колонкой через ||; колонка перезаписывается целиком, только если ключи
+    удалялись. Остальные методы делегируются в storage.
+    """
+
+    def __init__(self, storage: Storage, telegram_id: int, user: dict | None) -> None:
+        self._storage = storage
+        self.telegram_id = telegram_id
+        self.state: str | None = user.get("state") if user else None
+        self.data: dict = _load_data(user.get("data_json") if user else None)
+        self.timezone: str = (
+            user.get("timezone") if user else None
+        ) or DEFAULT_TIMEZONE
+
+        self._touched = False
+        self._snapshot = self._dump()
+        self._saved_data = copy.deepcopy(self.data)
+
+    def __getattr__(self, name: str) -> Any:
+        return getattr(self._storage, name)
+
+    @property
+    def is_dirty(self) -> bool:
+        return self._touched and self._dump() != self._snapshot
+
+    async def get_user(self, telegram_id: int) -> dict | None:
+        if telegram_id != self.telegram_id:
+            return await self._storage.get_user(telegram_id)
+        return {
+            "telegram_id": self.telegram_id,
+            "state": self.state,
+            "data_json": dict(self.data),
+        }
+
+    async def get_user_timezone(self, telegram_id: int) -> str:
+        if telegram_id != self.telegram_id:
+            return await self._storage.get_user_timezone(telegram_id)
+        return self.timezone
+
+    async def update_user_timezone(self, telegram_id: int, timezone: str) -> None:
+        await self._storage.update_user_timezone(telegram_id, timezone)
+        if telegram_id == self.telegram_id:
+            self.timezone = timezone
+
+    async def update_user_state(self, telegram_id: int, state: str | None) -> None:
+        if telegram_id != self.telegram_id:
+            return await self._storage.update_user_state(telegram_id, state)
+        self.state = state
+        self._touched = True
+
+    async def update_user_data(self, telegram_id: int, new_data: dict) -> None:
+        if telegram_id != self.telegram_id:
+            return await self._storage.update_user_data(telegram_id, new_data)
+        self.data.update(new_data)
+        self._touched = True
+
+    async def clear_user_state_and_temp_data(self, telegram_id: int) -> None:
+        if telegram_id != self.telegram_id:
+            return await self._storage.clear_user_state_and_temp_data(telegram_id)
+        self.state = None
+        self.data.clear()
+        self._touched = True
+
+    async def flush(self) -> None:
+        if not self.is_dirty:
+            return
+        # Хендлеры меняют data и на месте, поэтому изменения считаются
+        # относительно последней записанной версии, а не по вызовам.
+        if self._saved_data.keys() - self.data.keys():
+            await self._storage.save_user_state_and_data(
+                self.telegram_id, self.state, self.data or None
+            )
+        else:
+            await self._storage.merge_user_state_and_data(
+                self.telegram_id,
+                self.state,
+                {
+                    key: value
+                    for key, value in self.data.items()
+                    if key not in self._saved_data or self._saved_data[key] != value
+                },
+            )
+        self._touched = False
+        self._snapshot = self._dump()
+        self._saved_data = copy.deepcopy(self.data)
+
+    def _dump(self) -> tuple[str | None, str]:
+        return self.state, json.dumps(self.data, sort_keys=True)
+
+
+def _load_data(data_json: dict | str | None) -> dict:
+    # StoragePostgres отдаёт JSONB словарём; строка — для хранилищ без кодека.
+    if not data_json:
+        return {}
+    if isinstance(data_json, str):
+        return json.loads(data_json)
+    return dict(data_json)
@@ -0,0 +1,84 @@
+import asyncio
+import hmac
+import logging
+
+from aiohttp import web
+
+from bot.dispatcher import Dispatcher
+from bot.domain.messenger import Messenger
+from bot.keyed_executor import KeyedExecutor
+from bot.update_offset_tracker import UpdateOffsetTracker
+from bot.update_queue import drain_updates
+
+logger = logging.getLogger(__name__)
+logging.basicConfig(
+    level=logging.INFO,
+    format="[%(asctime)s.%(msecs)03d] %(message)s",
+    datefmt="%Y-%m-%d %H:%M:%S",
+)
+
+SECRET_TOKEN_HEADER = "X-Telegram-Bot-Api-Secret-Token"
+
+
+def create_webhook_app(
+    queue: asyncio.Queue, secret_token: str | None, path: str = "/webhook"
+) -> web.Application:
+    async def receive_update(request: web.Request) -> web.Response:
+        if secret_token and not hmac.compare_digest(
+            request.headers.get(SECRET_TOKEN_HEADER, ""), secret_token
+        ):
+            logger.warning("[WEBHOOK] ✗ rejected update with a wrong secret token")
+            return web.Response(status=401)
+
+        try:
+            update = await request.json()
+        except ValueError:
+            return web.Response(status=400)
+
+        try:
+            queue.put_nowait(update)
+        except asyncio.QueueFull:
+            # Telegram повторит доставку позже — это и есть backpressure.
+            logger.warning("[WEBHOOK] ✗ update queue is full, asking to retry")
+            return web.Response(status=503)
+
+        return web.Response(status=200)
+
+    app = web.Application()
+    app.router.add_post(path, receive_update)
+    return app
+
+
+async def start_webhook(
+    dispatcher: Dispatcher,
+    messenger: Messenger,
+    url: str,
+    secret_token: str | None,
+    host: str = "0.0.0.0",
+    port: int = 8080,
+    path: str = "/webhook",
+    max_concurrency: int = 1,
+    queue_size: int = 1000,
+    offset_tracker: UpdateOffsetTracker | None = None,
+) -> None:
+    queue: asyncio.Queue = asyncio.Queue(maxsize=queue_size)
+    executor = KeyedExecutor(max_concurrency)
+    if offset_tracker is not None:
+        await offset_tracker.load(ordered=False)
+
+    runner = web.AppRunner(create_webhook_app(queue, secret_token, path))
+    await runner.setup()
+    await web.TCPSite(runner, host, port).start()
+    logger.info(f"[WEBHOOK] listening on {host}:{port}{path}")
+
+    try:
+        params: dict = {}
+        if secret_token:
+            params["secret_token"] = secret_token
+        await messenger.set_webhook(
+            url, allowed_updates=dispatcher.get_allowed_updates(), **params
+        )
+        await drain_updates(queue, dispatcher, executor, offset_tracker)
+    finally:
+        await runner.cleanup()
+        await executor.join()
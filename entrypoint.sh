@@ -1,5 +1,5 @@
 #!/bin/sh
 set -e
 
-python -m bot.recreate_database
+python -m bot.migrate_database
 exec python -m bot
\ No newline at end of file
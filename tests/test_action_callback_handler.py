@@ -80,8 +80,7 @@ async def test_task_action_postpone_start():
     }
 
     calls = {
-        "update_data": False,
-        "update_state": False,
+        "save_user": 0,
         "delete_msg": False,
         "send_msg": False,
     }
@@ -90,13 +89,11 @@ async def test_task_action_postpone_start():
         assert telegram_id == 999
         return {"state": None, "data_json": "{}"}
 
-    async def mock_update_user_data(telegram_id: int, data: dict):
-        assert data == {"postpone_task_id": 66}
-        calls["update_data"] = True
-
-    async def mock_update_user_state(telegram_id: int, state):
+    async def mock_merge_user_state_and_data(telegram_id: int, state, data_patch):
+        assert telegram_id == 999
         assert state == "WAIT_POSTPONE_TIME"
-        calls["update_state"] = True
+        assert data_patch == {"postpone_task_id": 66}
+        calls["save_user"] += 1
 
     async def mock_delete_message(chat_id: int, message_id: int):
         assert chat_id == 999
@@ -117,8 +114,7 @@ async def test_task_action_postpone_start():
     mock_storage = Mock(
         {
             "get_user": mock_get_user,
-            "update_user_data": mock_update_user_data,
-            "update_user_state": mock_update_user_state,
+            "merge_user_state_and_data": mock_merge_user_state_and_data,
         }
     )
     mock_messenger = Mock(
@@ -134,7 +130,58 @@ async def test_task_action_postpone_start():
 
     await dispatcher.dispatch(test_update)
 
-    assert calls["update_data"]
-    assert calls["update_state"]
+    assert calls["save_user"] == 1
     assert calls["delete_msg"]
     assert calls["send_msg"]
+
+
+@pytest.mark.asyncio
+async def test_task_action_open_sends_card():
+    test_update = {
+        "update_id": 1000,
+        "callback_query": {
+            "id": "cb_5",
+            "from": {"id": 789},
+            "message": {"message_id": 31, "chat": {"id": 789}},
+            "data": "task_open:55",
+        },
+    }
+
+    sent = []
+
+    async def mock_get_user(telegram_id: int):
+        return {"state": None, "data_json": "{}"}
+
+    async def mock_get_task_by_id(task_id: int):
+        return {
+            "id": 55,
+            "telegram_id": 789,
+            "text": "Тест",
+            "task_time": "12:00",
+            "status": "active",
+        }
+
+    async def mock_send_message(chat_id: int, text: str, **params):
+        sent.append((chat_id, text, params.get("reply_markup")))
+
+    async def mock_answer_callback_query(cb_id: str):
+        pass
+
+    mock_storage = Mock(
+        {"get_user": mock_get_user, "get_task_by_id": mock_get_task_by_id}
+    )
+    mock_messenger = Mock(
+        {
+            "send_message": mock_send_message,
+            "answer_callback_query": mock_answer_callback_query,
+        }
+    )
+
+    dispatcher = Dispatcher(mock_storage, mock_messenger)
+    dispatcher.add_handlers(TaskActionCallbackHandler())
+
+    await dispatcher.dispatch(test_update)
+
+    assert len(sent) == 1
+    assert sent[0][1] == "[12:00] Тест"
+    assert "task_done:55" in sent[0][2]
@@ -42,3 +42,34 @@ async def test_database_logger_handler():
     await dispatcher.dispatch(test_update)
 
     assert calls["persist_update"]
+
+
+@pytest.mark.asyncio
+async def test_database_logger_handler_with_writer():
+    test_update = {
+        "update_id": 1001,
+        "message": {
+            "message_id": 2,
+            "from": {"id": 123},
+            "chat": {"id": 123},
+            "text": "test",
+        },
+    }
+
+    calls = {"add": []}
+
+    async def mock_add(update: dict):
+        calls["add"].append(update)
+
+    async def mock_get_user(telegram_id: int):
+        return {"state": None, "data_json": "{}"}
+
+    mock_storage = Mock({"get_user": mock_get_user})
+    mock_writer = Mock({"add": mock_add})
+
+    dispatcher = Dispatcher(mock_storage, Mock({}))
+    dispatcher.add_handlers(DatabaseLogger(mock_writer))
+
+    await dispatcher.dispatch(test_update)
+
+    assert calls["add"] == [test_update]
@@ -41,3 +41,40 @@ async def test_ensure_user_exists_handler():
     await dispatcher.dispatch(test_update)
 
     assert calls["ensure_user_exists"]
+
+
+@pytest.mark.asyncio
+async def test_ensure_user_exists_skips_known_users():
+    test_update = {
+        "update_id": 1002,
+        "message": {
+            "message_id": 2,
+            "from": {"id": 12345},
+            "chat": {"id": 12345},
+            "text": "/help",
+        },
+    }
+
+    calls = {"ensure_user_exists": 0}
+
+    async def mock_ensure_user_exists(telegram_id: int):
+        calls["ensure_user_exists"] += 1
+
+    async def mock_get_user(telegram_id: int):
+        return {"state": None, "data_json": "{}"}
+
+    mock_storage = Mock(
+        {
+            "ensure_user_exists": mock_ensure_user_exists,
+            "get_user": mock_get_user,
+        }
+    )
+    mock_messenger = Mock({})
+
+    dispatcher = Dispatcher(mock_storage, mock_messenger)
+    dispatcher.add_handlers(EnsureUserExists(max_known_users=10))
+
+    await dispatcher.dispatch(test_update)
+    await dispatcher.dispatch(test_update)
+
+    assert calls["ensure_user_exists"] == 1
@@ -0,0 +1,59 @@
+import asyncio
+
+import pytest
+
+from bot.keyed_executor import KeyedExecutor
+
+
+@pytest.mark.asyncio
+async def test_keyed_executor_keeps_order_per_key():
+    executor = KeyedExecutor(max_concurrency=4)
+    events = []
+
+    async def job(key: int, number: int, delay: float):
+        await asyncio.sleep(delay)
+        events.append((key, number))
+
+    await executor.submit(1, lambda: job(1, 1, 0.03))
+    await executor.submit(1, lambda: job(1, 2, 0.0))
+    await executor.submit(2, lambda: job(2, 1, 0.01))
+    await executor.join()
+
+    assert [e for e in events if e[0] == 1] == [(1, 1), (1, 2)]
+    assert events[0] == (2, 1)
+
+
+@pytest.mark.asyncio
+async def test_keyed_executor_runs_different_keys_concurrently():
+    executor = KeyedExecutor(max_concurrency=3)
+    active = {"now": 0, "max": 0}
+
+    async def job():
+        active["now"] += 1
+        active["max"] = max(active["max"], active["now"])
+        await asyncio.sleep(0.01)
+        active["now"] -= 1
+
+    for key in range(10):
+        await executor.submit(key, job)
+    await executor.join()
+
+    assert active["max"] == 3
+
+
+@pytest.mark.asyncio
+async def test_keyed_executor_continues_after_failed_job():
+    executor = KeyedExecutor(max_concurrency=1)
+    calls = []
+
+    async def failing_job():
+        raise RuntimeError("boom")
+
+    async def next_job():
+        calls.append("next")
+
+    await executor.submit(1, failing_job)
+    await executor.submit(1, next_job)
+    await executor.join()
+
+    assert calls == ["next"]
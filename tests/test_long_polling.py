@@ -0,0 +1,106 @@
+import asyncio
+
+import pytest
+
+from bot.dispatcher import Dispatcher
+from bot.handlers import get_handlers
+from bot.long_polling import start_long_polling
+from tests.mocks import Mock
+
+
+def _update(update_id: int, telegram_id: int) -> dict:
+    return {
+        "update_id": update_id,
+        "message": {
+            "message_id": update_id,
+            "from": {"id": telegram_id},
+            "chat": {"id": telegram_id},
+            "text": "/help",
+        },
+    }
+
+
+@pytest.mark.asyncio
+async def test_long_polling_fetches_next_batch_while_dispatching():
+    batches = [[_update(1, 10)], [_update(2, 20)]]
+    calls = {"get_updates": []}
+    second_fetch = asyncio.Event()
+    dispatched = []
+
+    async def mock_get_updates(**params):
+        calls["get_updates"].append(params)
+        if len(calls["get_updates"]) == 2:
+            second_fetch.set()
+        if batches:
+            return batches.pop(0)
+        await asyncio.Event().wait()
+
+    async def mock_delete_webhook(**params):
+        return True
+
+    messenger = Mock(
+        {"get_updates": mock_get_updates, "delete_webhook": mock_delete_webhook}
+    )
+    dispatcher = Dispatcher(Mock({}), messenger)
+    dispatcher.add_handlers(*get_handlers())
+
+    async def mock_dispatch(update: dict):
+        if update["update_id"] == 1:
+            await second_fetch.wait()
+        dispatched.append(update["update_id"])
+
+    dispatcher.dispatch = mock_dispatch
+
+    polling = asyncio.create_task(
+        start_long_polling(dispatcher, messenger, max_concurrency=4, timeout=25)
+    )
+    await asyncio.wait_for(second_fetch.wait(), timeout=1)
+    await asyncio.sleep(0.01)
+    polling.cancel()
+
+    assert sorted(dispatched) == [1, 2]
+    # Список передаётся явно: иначе Telegram оставит прежний.
+    assert calls["get_updates"][0] == {
+        "offset": 0,
+        "timeout": 25,
+        "limit": 100,
+        "allowed_updates": ["callback_query", "message"],
+    }
+    assert calls["get_updates"][1]["offset"] == 2
+
+
+@pytest.mark.asyncio
+async def test_long_polling_prefetches_at_most_about_one_batch():
+    calls = {"get_updates": 0}
+    next_update_id = iter(range(1, 1000))
+
+    async def mock_get_updates(**params):
+        calls["get_updates"] += 1
+        return [_update(next(next_update_id), 10) for _ in range(params["limit"])]
+
+    async def mock_delete_webhook(**params):
+        return True
+
+    messenger = Mock(
+        {"get_updates": mock_get_updates, "delete_webhook": mock_delete_webhook}
+    )
+    dispatcher = Dispatcher(Mock({}), messenger)
+    dispatch_unblocked = asyncio.Event()
+
+    async def mock_dispatch(update: dict):
+        await dispatch_unblocked.wait()
+
+    dispatcher.dispatch = mock_dispatch
+
+    polling = asyncio.create_task(
+        start_long_polling(dispatcher, messenger, timeout=25, batch_size=2)
+    )
+    await asyncio.sleep(0.05)
+    fetched = calls["get_updates"]
+    polling.cancel()
+    dispatch_unblocked.set()
+    await asyncio.gather(polling, return_exceptions=True)
+
+    # Обработка стоит: получение останавливается, как только очередь и
+    # executor заполнены, а не тянет updates без конца.
+    assert fetched <= 5
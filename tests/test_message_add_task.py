@@ -2,8 +2,8 @@ import pytest
 
 from bot.dispatcher import Dispatcher
 from bot.handlers.menu_handlers.message_add_task import MessageAddTask
-from tests.mocks import Mock
 from bot.interface.keyboards import REMOVE_KEYBOARD
+from tests.mocks import Mock
 
 
 @pytest.mark.asyncio
@@ -24,9 +24,10 @@ async def test_message_add_task_handler():
         assert telegram_id == 123
         return {"state": None, "data_json": "{}"}
 
-    async def mock_update_user_state(telegram_id: int, state: str):
+    async def mock_merge_user_state_and_data(telegram_id: int, state, data_patch):
         assert telegram_id == 123
         assert state == "WAIT_TASK_NAME"
+        assert data_patch == {}
         calls["update_state"] = True
 
     async def mock_send_message(chat_id: int, text: str, **params):
@@ -39,7 +40,7 @@ async def test_message_add_task_handler():
     mock_storage = Mock(
         {
             "get_user": mock_get_user,
-            "update_user_state": mock_update_user_state,
+            "merge_user_state_and_data": mock_merge_user_state_and_data,
         }
     )
     mock_messenger = Mock({"send_message": mock_send_message})
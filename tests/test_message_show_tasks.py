@@ -1,3 +1,5 @@
+import json
+
 import pytest
 
 from bot.dispatcher import Dispatcher
@@ -17,34 +19,26 @@ async def test_message_show_tasks_handler_with_tasks():
         },
     }
 
-    calls = {"clear_state": False, "get_tasks": [], "send_message": []}
+    calls = {"save_user": False, "get_tasks": [], "send_message": []}
 
     mock_tasks_today = [
-        {"id": 1, "text": "Купить молоко", "task_time": "14:00", "status": "active"}
-    ]
-    mock_tasks_tomorrow = []
-    mock_tasks_nodate = [
-        {"id": 2, "text": "Позвонить", "task_time": None, "status": "active"}
+        {"id": 1, "text": "Купить молоко", "task_time": "14:00", "status": "active"},
+        {"id": 2, "text": "Позвонить", "task_time": None, "status": "active"},
     ]
 
     async def mock_get_user(telegram_id: int):
         assert telegram_id == 111
         return {"state": None, "data_json": "{}"}
 
-    async def mock_clear_user_state_and_temp_data(telegram_id: int):
-        assert telegram_id == 111
-        calls["clear_state"] = True
+    async def mock_save_user_state_and_data(telegram_id: int, state, data):
+        calls["save_user"] = True
 
-    async def mock_get_tasks_by_filter(telegram_id: int, filter_type: str):
+    async def mock_get_tasks_page(
+        telegram_id: int, filter_type: str, limit: int, after=None, before=None
+    ):
         assert telegram_id == 111
-        calls["get_tasks"].append(filter_type)
-        if filter_type == "show_today":
-            return mock_tasks_today
-        if filter_type == "show_tomorrow":
-            return mock_tasks_tomorrow
-        if filter_type == "show_nodate":
-            return mock_tasks_nodate
-        return []
+        calls["get_tasks"].append((filter_type, limit, after, before))
+        return mock_tasks_today
 
     async def mock_send_message(chat_id: int, text: str, **params):
         assert chat_id == 111
@@ -54,8 +48,8 @@ async def test_message_show_tasks_handler_with_tasks():
     mock_storage = Mock(
         {
             "get_user": mock_get_user,
-            "clear_user_state_and_temp_data": mock_clear_user_state_and_temp_data,
-            "get_tasks_by_filter": mock_get_tasks_by_filter,
+            "save_user_state_and_data": mock_save_user_state_and_data,
+            "get_tasks_page": mock_get_tasks_page,
         }
     )
     mock_messenger = Mock({"send_message": mock_send_message})
@@ -65,16 +59,22 @@ async def test_message_show_tasks_handler_with_tasks():
 
     await dispatcher.dispatch(test_update)
 
-    assert calls["clear_state"]
-    assert len(calls["get_tasks"]) == 3
+    assert not calls["save_user"]
+    assert calls["get_tasks"] == [("show_today", 11, None, None)]
 
     send_messages = calls["send_message"]
-    assert len(send_messages) == 6
-    assert "📅 Задачи на Сегодня:" in send_messages[0]["text"]
-    assert "[14:00] Купить молоко" in send_messages[1]["text"]
-    assert "task_done:1" in send_messages[1]["params"].get("reply_markup", "{}")
-    assert "➡️ Задачи на Завтра:" in send_messages[2]["text"]
-    assert "Список пуст." in send_messages[3]["text"]
-    assert "📝 Задачи без даты:" in send_messages[4]["text"]
-    assert "[Без времени] Позвонить" in send_messages[5]["text"]
-    assert "task_done:2" in send_messages[5]["params"].get("reply_markup", "{}")
+    assert len(send_messages) == 1
+    text = send_messages[0]["text"]
+    assert "📅 Задачи на сегодня:" in text
+    assert "1. [14:00] Купить молоко" in text
+    assert "2. [Без времени] Позвонить" in text
+
+    keyboard = json.loads(send_messages[0]["params"]["reply_markup"])
+    rows = keyboard["inline_keyboard"]
+    assert [b["callback_data"] for b in rows[0]] == ["task_open:1", "task_open:2"]
+    assert [b["callback_data"] for b in rows[-1]] == [
+        "tasks_page:today",
+        "tasks_page:tomorrow",
+        "tasks_page:nodate",
+    ]
+    assert len(rows) == 2
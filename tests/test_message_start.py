@@ -2,8 +2,8 @@ import pytest
 
 from bot.dispatcher import Dispatcher
 from bot.handlers.state_handlers.message_start import MessageStart
-from tests.mocks import Mock
 from bot.interface.keyboards import MAIN_MENU_KEYBOARD
+from tests.mocks import Mock
 
 
 @pytest.mark.asyncio
@@ -27,8 +27,10 @@ async def test_message_start_handler():
         assert telegram_id == 54321
         return {"state": "SOME_STATE", "data_json": '{"text": "old data"}'}
 
-    async def mock_clear_user_state_and_temp_data(telegram_id: int):
+    async def mock_save_user_state_and_data(telegram_id: int, state, data):
         assert telegram_id == 54321
+        assert state is None
+        assert data is None
         calls["clear_user_data"] = True
 
     async def mock_send_message(chat_id: int, text: str, **params):
@@ -41,7 +43,7 @@ async def test_message_start_handler():
     mock_storage = Mock(
         {
             "get_user": mock_get_user,
-            "clear_user_state_and_temp_data": mock_clear_user_state_and_temp_data,
+            "save_user_state_and_data": mock_save_user_state_and_data,
         }
     )
     mock_messenger = Mock({"send_message": mock_send_message})
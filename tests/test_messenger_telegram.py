@@ -0,0 +1,149 @@
+import socket
+
+import pytest
+from aiohttp import web
+from aiohttp.test_utils import TestServer
+
+from bot.domain.messenger import (
+    MessengerConnectError,
+    MessengerRateLimitError,
+    MessengerRequestError,
+    MessengerServerError,
+)
+from bot.infrastructure.messenger_telegram import MessengerTelegram
+from bot.infrastructure.retry_policy import RetryPolicy
+
+
+async def _start_fake_telegram(responses: list[tuple[int, dict]]) -> TestServer:
+    async def handler(request: web.Request) -> web.Response:
+        status, body = responses.pop(0)
+        return web.json_response(body, status=status)
+
+    app = web.Application()
+    app.router.add_post("/bottest-token/{method}", handler)
+    server = TestServer(app)
+    await server.start_server()
+    return server
+
+
+def _messenger(server: TestServer, max_attempts: int) -> MessengerTelegram:
+    policy = RetryPolicy(max_attempts=max_attempts, base_delay=0.001, max_delay=0.01)
+    return MessengerTelegram(
+        retry_policies={"interactive": policy, "bulk": policy, "polling": policy},
+        api_uri=str(server.make_url("")).rstrip("/"),
+    )
+
+
+@pytest.mark.asyncio
+async def test_messenger_retries_idempotent_call_after_429_and_5xx(monkeypatch):
+    monkeypatch.setenv("TELEGRAM_TOKEN", "test-token")
+    responses = [
+        (
+            429,
+            {
+                "ok": False,
+                "error_code": 429,
+                "description": "Too Many Requests: retry after 0",
+                "parameters": {"retry_after": 0},
+            },
+        ),
+        (502, {"ok": False, "error_code": 502, "description": "Bad Gateway"}),
+        (200, {"ok": True, "result": []}),
+    ]
+    server = await _start_fake_telegram(responses)
+    messenger = _messenger(server, max_attempts=3)
+
+    try:
+        result = await messenger.get_updates(offset=1)
+    finally:
+        await messenger.close()
+        await server.close()
+
+    assert result == []
+    assert responses == []
+
+
+@pytest.mark.asyncio
+async def test_messenger_does_not_repeat_send_message_after_5xx(monkeypatch):
+    monkeypatch.setenv("TELEGRAM_TOKEN", "test-token")
+    responses = [
+        (502, {"ok": False, "error_code": 502, "description": "Bad Gateway"}),
+        (200, {"ok": True, "result": {"message_id": 1}}),
+    ]
+    server = await _start_fake_telegram(responses)
+    messenger = _messenger(server, max_attempts=3)
+
+    try:
+        # Сообщение могло уже уйти, повтор отправил бы его второй раз.
+        with pytest.raises(MessengerServerError):
+            await messenger.send_message(chat_id=1, text="hi")
+    finally:
+        await messenger.close()
+        await server.close()
+
+    assert len(responses) == 1
+
+
+@pytest.mark.asyncio
+async def test_messenger_repeats_send_message_that_never_connected(monkeypatch, caplog):
+    monkeypatch.setenv("TELEGRAM_TOKEN", "test-token")
+    with socket.socket() as closed:
+        closed.bind(("127.0.0.1", 0))
+        port = closed.getsockname()[1]
+    policy = RetryPolicy(max_attempts=2, base_delay=0.001, max_delay=0.01)
+    messenger = MessengerTelegram(
+        retry_policies={"interactive": policy, "bulk": policy, "polling": policy},
+        api_uri=f"http://127.0.0.1:{port}",
+    )
+
+    try:
+        with pytest.raises(MessengerConnectError):
+            await messenger.send_message(chat_id=1, text="hi")
+    finally:
+        await messenger.close()
+
+    assert "POST sendMessage retry 1/1" in caplog.text
+
+
+@pytest.mark.asyncio
+async def test_messenger_does_not_retry_bad_request(monkeypatch):
+    monkeypatch.setenv("TELEGRAM_TOKEN", "test-token")
+    responses = [
+        (400, {"ok": False, "error_code": 400, "description": "chat not found"}),
+        (200, {"ok": True, "result": {}}),
+    ]
+    server = await _start_fake_telegram(responses)
+    messenger = _messenger(server, max_attempts=3)
+
+    try:
+        with pytest.raises(MessengerRequestError) as error:
+            await messenger.send_message(chat_id=1, text="hi")
+    finally:
+        await messenger.close()
+        await server.close()
+
+    assert error.value.error_code == 400
+    assert len(responses) == 1
+
+
+@pytest.mark.asyncio
+async def test_messenger_gives_up_when_budget_is_spent(monkeypatch):
+    monkeypatch.setenv("TELEGRAM_TOKEN", "test-token")
+    too_many = {
+        "ok": False,
+        "error_code": 429,
+        "description": "Too Many Requests",
+        "parameters": {"retry_after": 0},
+    }
+    responses = [(429, too_many), (429, too_many)]
+    server = await _start_fake_telegram(responses)
+    messenger = _messenger(server, max_attempts=2)
+
+    try:
+        with pytest.raises(MessengerRateLimitError):
+            await messenger.send_message(chat_id=1, text="hi")
+    finally:
+        await messenger.close()
+        await server.close()
+
+    assert responses == []
@@ -0,0 +1,142 @@
+import os
+from datetime import UTC, date, datetime, time
+
+import asyncpg
+import pytest
+
+from bot.infrastructure.migrations import MIGRATIONS, get_pending_migrations
+
+
+def test_migration_versions_are_unique_and_ordered():
+    versions = [version for version, _, _ in MIGRATIONS]
+
+    assert versions == sorted(set(versions))
+    assert versions[0] == 1
+
+
+def test_get_pending_migrations_skips_applied_versions():
+    all_versions = [version for version, _, _ in MIGRATIONS]
+
+    assert [v for v, _, _ in get_pending_migrations(set())] == all_versions
+    assert get_pending_migrations(set(all_versions)) == []
+    assert [v for v, _, _ in get_pending_migrations({1})] == all_versions[1:]
+
+
+# Схема, которую создавал recreate_database до появления миграций.
+ORIGINAL_SCHEMA = [
+    """
+    CREATE TABLE IF NOT EXISTS telegram_updates
+    (id SERIAL PRIMARY KEY, payload TEXT NOT NULL)
+    """,
+    """
+    CREATE TABLE IF NOT EXISTS users
+    (
+        id SERIAL PRIMARY KEY,
+        telegram_id BIGINT NOT NULL UNIQUE,
+        created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+        state TEXT DEFAULT NULL,
+        data_json TEXT DEFAULT NULL
+    )
+    """,
+    """
+    CREATE TABLE IF NOT EXISTS tasks
+    (
+        id SERIAL PRIMARY KEY,
+        telegram_id BIGINT NOT NULL,
+        text TEXT NOT NULL,
+        task_date TEXT DEFAULT NULL,
+        task_time TEXT DEFAULT NULL,
+        status TEXT NOT NULL DEFAULT 'active',
+        notified BOOLEAN DEFAULT FALSE,
+        created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+        FOREIGN KEY (telegram_id) REFERENCES users (telegram_id)
+    )
+    """,
+    """
+    CREATE TABLE IF NOT EXISTS user_settings
+    (
+        id SERIAL PRIMARY KEY,
+        telegram_id BIGINT NOT NULL UNIQUE,
+        morning_digest_time TEXT NOT NULL DEFAULT '09:00',
+        evening_review_time TEXT NOT NULL DEFAULT '21:00',
+        FOREIGN KEY (telegram_id) REFERENCES users (telegram_id)
+    )
+    """,
+]
+
+
+def _normalize(sql: str) -> str:
+    return " ".join(sql.split())
+
+
+def test_baseline_is_the_original_schema():
+    _, name, statements = MIGRATIONS[0]
+
+    assert name == "baseline"
+    assert [_normalize(s) for s in statements] == [
+        _normalize(s) for s in ORIGINAL_SCHEMA
+    ]
+
+
+def test_later_migrations_only_add_columns_to_existing_tables():
+    # На существующей БД CREATE TABLE IF NOT EXISTS ничего не делает, поэтому
+    # новые колонки обязаны приходить через ALTER TABLE.
+    for _, _, statements in MIGRATIONS[1:]:
+        for statement in statements:
+            normalized = _normalize(statement)
+            assert "CREATE TABLE IF NOT EXISTS tasks" not in normalized
+            assert "CREATE TABLE IF NOT EXISTS user_settings" not in normalized
+            if "ADD COLUMN" in normalized:
+                assert normalized.count("ADD COLUMN") == normalized.count(
+                    "ADD COLUMN IF NOT EXISTS"
+                )
+
+
+POSTGRES_ENV = [
+    "POSTGRES_HOST",
+    "POSTGRES_HOST_PORT",
+    "POSTGRES_USER",
+    "POSTGRES_PASSWORD",
+    "POSTGRES_DATABASE",
+]
+
+
+@pytest.mark.asyncio
+@pytest.mark.skipif(
+    not all(os.getenv(name) for name in POSTGRES_ENV),
+    reason="POSTGRES_* environment variables are not set",
+)
+async def test_migrations_apply_on_top_of_original_schema():
+    conn = await asyncpg.connect(
+        host=os.getenv("POSTGRES_HOST"),
+        port=int(os.getenv("POSTGRES_HOST_PORT")),
+        user=os.getenv("POSTGRES_USER"),
+        password=os.getenv("POSTGRES_PASSWORD"),
+        database=os.getenv("POSTGRES_DATABASE"),
+    )
+    schema = f"migrations_test_{os.getpid()}"
+    try:
+        await conn.execute(f"CREATE SCHEMA {schema}")
+        await conn.execute(f"SET search_path TO {schema}")
+        for statement in ORIGINAL_SCHEMA:
+            await conn.execute(statement)
+        await conn.execute("INSERT INTO users (telegram_id) VALUES (1)")
+        await conn.execute(
+            "INSERT INTO tasks (telegram_id, text, task_date, task_time) "
+            "VALUES (1, 'Позвонить', '2025-01-02', '09:05')"
+        )
+
+        for _, _, statements in MIGRATIONS:
+            async with conn.transaction():
+                for statement in statements:
+                    await conn.execute(statement)
+
+        task = await conn.fetchrow("SELECT task_date, task_time, due_at FROM tasks")
+        assert task["task_date"] == date(2025, 1, 2)
+        assert task["task_time"] == time(9, 5)
+        assert task["due_at"] == datetime(2025, 1, 2, 6, 5, tzinfo=UTC)
+        user = await conn.fetchrow("SELECT data_json FROM users")
+        assert user["data_json"] is None
+    finally:
+        await conn.execute(f"DROP SCHEMA IF EXISTS {schema} CASCADE")
+        await conn.close()
@@ -0,0 +1,343 @@
+import asyncio
+import json
+from datetime import UTC, datetime, timedelta
+
+import pytest
+
+from bot import notifier
+from bot.domain.messenger import MessengerError
+from bot.infrastructure.queries import SETTING_TIME_COLUMNS
+from bot.keyed_executor import KeyedExecutor
+from bot.notifier import _send_digest_wave, _send_reminders
+from tests.mocks import Mock
+
+
+@pytest.mark.asyncio
+async def test_digest_wave_fans_out_across_chats_in_order():
+    sent = []
+    in_flight = {"now": 0, "max": 0}
+
+    async def mock_send_message(chat_id: int, text: str, reply_markup=None):
+        in_flight["now"] += 1
+        in_flight["max"] = max(in_flight["max"], in_flight["now"])
+        await asyncio.sleep(0.01)
+        in_flight["now"] -= 1
+        sent.append((chat_id, text))
+
+    messenger = Mock({"send_message": mock_send_message})
+    digests = [
+        {
+            "telegram_id": chat_id,
+            "local_date": "2025-01-01",
+            "tasks": [
+                {"id": chat_id * 10 + n, "text": f"Задача {n}", "status": "active"}
+                for n in range(2)
+            ],
+        }
+        for chat_id in range(1, 6)
+    ]
+
+    marked = []
+
+    async def mock_mark_digest_sent(
+        setting_type: str, telegram_id: int, local_date: str
+    ):
+        marked.append(telegram_id)
+
+    storage = Mock({"mark_digest_sent": mock_mark_digest_sent})
+
+    executor = KeyedExecutor(max_concurrency=3)
+    await _send_digest_wave(
+        executor,
+        storage,
+        messenger,
+        "morning_digest_time",
+        "Утренний дайджест на сегодня",
+        digests,
+        compact=False,
+    )
+    await executor.join()
+
+    assert in_flight["max"] == 3
+    assert len(sent) == 15
+    for chat_id in range(1, 6):
+        texts = [text for sent_chat_id, text in sent if sent_chat_id == chat_id]
+        assert texts[0].startswith("☀️ Утренний дайджест на сегодня")
+        assert "Задача 0" in texts[1] and "Задача 1" in texts[2]
+    assert sorted(marked) == [1, 2, 3, 4, 5]
+
+
+@pytest.mark.asyncio
+async def test_reminders_are_marked_in_batches():
+    calls = {"marked": [], "released": []}
+
+    async def mock_send_message(chat_id: int, text: str, reply_markup=None):
+        if chat_id == 2:
+            raise MessengerError("sendMessage", "Forbidden: bot was blocked", 403)
+
+    async def mock_mark_tasks_as_notified(task_ids: list[int]):
+        calls["marked"].append(task_ids)
+
+    async def mock_release_task_claim(task_id: int):
+        calls["released"].append(task_id)
+
+    storage = Mock(
+        {
+            "mark_tasks_as_notified": mock_mark_tasks_as_notified,
+            "release_task_claim": mock_release_task_claim,
+        }
+    )
+    messenger = Mock({"send_message": mock_send_message})
+    tasks = [
+        {"id": task_id, "telegram_id": task_id, "text": "Позвонить", "status": "active"}
+        for task_id in (1, 2, 3)
+    ]
+
+    await _send_reminders(KeyedExecutor(max_concurrency=4), storage, messenger, tasks)
+
+    assert calls["marked"] == [[1, 3]]
+    assert calls["released"] == [2]
+
+
+@pytest.mark.asyncio
+async def test_slow_reminder_does_not_hold_back_marking_of_others():
+    marked = []
+
+    async def mock_send_message(chat_id: int, text: str, reply_markup=None):
+        if chat_id == 1:
+            await asyncio.sleep(0.2)
+
+    async def mock_mark_tasks_as_notified(task_ids: list[int]):
+        marked.append(task_ids)
+
+    storage = Mock({"mark_tasks_as_notified": mock_mark_tasks_as_notified})
+    messenger = Mock({"send_message": mock_send_message})
+    tasks = [
+        {"id": task_id, "telegram_id": task_id, "text": "Позвонить", "status": "active"}
+        for task_id in (1, 2, 3)
+    ]
+
+    await _send_reminders(
+        KeyedExecutor(max_concurrency=4), storage, messenger, tasks, mark_interval=0.05
+    )
+
+    assert marked == [[2, 3], [1]]
+
+
+@pytest.mark.asyncio
+async def test_notifier_runs_only_while_leadership_is_held(monkeypatch):
+    calls = {"acquire": 0, "release": 0, "started": 0, "stopped": 0}
+    leader = {"held": False}
+
+    async def mock_try_acquire_leadership(name: str) -> bool:
+        calls["acquire"] += 1
+        leader["held"] = calls["acquire"] == 2
+        return leader["held"]
+
+    async def mock_check_leadership() -> bool:
+        return leader["held"]
+
+    async def mock_release_leadership():
+        calls["release"] += 1
+
+    async def mock_start_notifier(storage, messenger, *args):
+        calls["started"] += 1
+        try:
+            await asyncio.Event().wait()
+        finally:
+            calls["stopped"] += 1
+
+    monkeypatch.setattr(notifier, "start_notifier", mock_start_notifier)
+    storage = Mock(
+        {
+            "try_acquire_leadership": mock_try_acquire_leadership,
+            "check_leadership": mock_check_leadership,
+            "release_leadership": mock_release_leadership,
+        }
+    )
+
+    task = asyncio.create_task(
+        notifier.run_notifier_as_leader(storage, Mock({}), check_interval=0.01)
+    )
+    await asyncio.sleep(0.03)
+    assert calls["started"] == 1 and calls["stopped"] == 0
+
+    leader["held"] = False
+    await asyncio.sleep(0.03)
+    task.cancel()
+    await asyncio.gather(task, return_exceptions=True)
+
+    assert calls["started"] == 1 and calls["stopped"] == 1
+    assert calls["acquire"] > 2
+
+
+def _digest_storage(users: list[dict]) -> Mock:
+    # Повторяет get_scheduled_digests: окно по локальному времени без отметки;
+    # *_sent_on ставит mark_digest_sent после попытки отправки.
+    async def mock_get_scheduled_digests(
+        setting_type: str, windows: list[dict], include_undated: bool = False
+    ):
+        sent_column = SETTING_TIME_COLUMNS[setting_type]
+        due = []
+        for user in users:
+            for window in windows:
+                if (
+                    user["timezone"] == window["timezone"]
+                    and user[setting_type] is not None
+                    and window["window_start"]
+                    <= user[setting_type]
+                    <= window["window_end"]
+                    and (
+                        user[sent_column] is None
+                        or user[sent_column] < window["local_date"]
+                    )
+                ):
+                    due.append(
+                        {
+                            "telegram_id": user["telegram_id"],
+                            "local_date": window["local_date"],
+                            "tasks": [],
+                        }
+                    )
+        return due
+
+    async def mock_mark_digest_sent(
+        setting_type: str, telegram_id: int, local_date: str
+    ):
+        for user in users:
+            if user["telegram_id"] == telegram_id:
+                user[SETTING_TIME_COLUMNS[setting_type]] = local_date
+
+    return Mock(
+        {
+            "get_scheduled_digests": mock_get_scheduled_digests,
+            "mark_digest_sent": mock_mark_digest_sent,
+        }
+    )
+
+
+def _morning_users(*telegram_ids: int) -> list[dict]:
+    return [
+        {
+            "telegram_id": telegram_id,
+            "timezone": "Europe/Moscow",
+            "morning_digest_time": "09:00",
+            "morning_digest_sent_on": None,
+            "evening_review_time": None,
+            "evening_review_sent_on": None,
+        }
+        for telegram_id in telegram_ids
+    ]
+
+
+@pytest.mark.asyncio
+async def test_missed_digest_minute_is_caught_up_once():
+    sent = []
+
+    async def mock_send_message(chat_id: int, text: str, reply_markup=None):
+        sent.append(chat_id)
+        if chat_id == 2:
+            raise MessengerError("sendMessage", "Bad Gateway", 502)
+
+    users = _morning_users(1, 2)
+    storage = _digest_storage(users)
+    messenger = Mock({"send_message": mock_send_message})
+    executor = KeyedExecutor(max_concurrency=4)
+
+    # Тик 09:00 по Москве пропущен, следующий — в 09:01.
+    for minute in (1, 2):
+        now = datetime(2025, 1, 1, 6, minute, 5, tzinfo=UTC)
+        await notifier._send_scheduled_digests(
+            storage, messenger, executor, now, timedelta(hours=1)
+        )
+        await executor.join()
+
+    # Дайджест догнан один раз; неудачный не повторяется (at-most-once).
+    assert sent == [1, 2]
+    assert [user["morning_digest_sent_on"] for user in users] == [
+        "2025-01-01",
+        "2025-01-01",
+    ]
+
+
+@pytest.mark.asyncio
+async def test_digests_not_sent_before_restart_are_sent_after_it():
+    sent = []
+    chat_2_sent = asyncio.Event()
+
+    async def mock_send_message(chat_id: int, text: str, reply_markup=None):
+        if chat_id == 2:
+            await chat_2_sent.wait()
+        sent.append(chat_id)
+
+    users = _morning_users(1, 2)
+    storage = _digest_storage(users)
+    messenger = Mock({"send_message": mock_send_message})
+    now = datetime(2025, 1, 1, 6, 0, 5, tzinfo=UTC)
+
+    executor = KeyedExecutor(max_concurrency=4)
+    await notifier._send_scheduled_digests(storage, messenger, executor, now)
+    await asyncio.sleep(0.01)
+
+    # Следующий тик не ставит в очередь дайджест, который ещё отправляется.
+    await notifier._send_scheduled_digests(storage, messenger, executor, now)
+    assert [user["morning_digest_sent_on"] for user in users] == ["2025-01-01", None]
+
+    # Процесс остановлен посреди волны: дайджест для чата 2 не отмечен.
+    for job in list(executor._tasks):
+        job.cancel()
+    await executor.join()
+    assert users[1]["morning_digest_sent_on"] is None
+
+    chat_2_sent.set()
+    executor = KeyedExecutor(max_concurrency=4)
+    await notifier._send_scheduled_digests(storage, messenger, executor, now)
+    await executor.join()
+
+    assert sent == [1, 2]
+    assert users[1]["morning_digest_sent_on"] == "2025-01-01"
+
+
+def test_digest_windows_follow_each_users_local_time():
+    now = datetime(2025, 1, 1, 6, 0, 30, tzinfo=UTC)
+
+    windows = {
+        window["timezone"]: window
+        for window in notifier._digest_windows(now, timedelta(hours=1), 1)
+    }
+
+    assert windows["Europe/Moscow"] == {
+        "timezone": "Europe/Moscow",
+        "window_start": "08:00",
+        "window_end": "09:00",
+        "local_date": "2025-01-01",
+        "task_date": "2025-01-02",
+    }
+    # В Камчатке уже 18:00, а окно не уходит во вчерашний день во Владивостоке.
+    assert windows["Asia/Kamchatka"]["window_end"] == "18:00"
+    assert windows["Asia/Vladivostok"]["window_start"] == "15:00"
+    assert windows["UTC"]["window_start"] == "05:00"
+
+
+@pytest.mark.asyncio
+async def test_compact_digest_is_one_message_with_numbered_buttons():
+    sent = []
+
+    async def mock_send_message(chat_id: int, text: str, reply_markup=None):
+        sent.append((text, json.loads(reply_markup)))
+
+    tasks = [
+        {"id": 100 + n, "text": f"Задача {n}", "task_time": None, "status": "active"}
+        for n in range(1, 8)
+    ]
+
+    await notifier._send_task_list(
+        Mock({"send_message": mock_send_message}), 1, "Утренний дайджест", tasks
+    )
+
+    assert len(sent) == 1
+    text, markup = sent[0]
+    assert "7. [Без времени] Задача 7" in text
+    buttons = [button for row in markup["inline_keyboard"] for button in row]
+    assert [b["text"] for b in buttons] == [str(n) for n in range(1, 8)]
+    assert buttons[0]["callback_data"] == "task_open:101"
@@ -1,10 +1,12 @@
-import pytest
 from datetime import datetime, timedelta
+from zoneinfo import ZoneInfo
+
+import pytest
 
 from bot.dispatcher import Dispatcher
 from bot.handlers.state_handlers.postpone_handler import PostponeHandler
-from tests.mocks import Mock
 from bot.interface.keyboards import MAIN_MENU_KEYBOARD
+from tests.mocks import Mock
 
 
 @pytest.mark.asyncio
@@ -26,11 +28,16 @@ async def test_postpone_handler_callback():
         "send_message": False,
     }
 
-    expected_time = (datetime.now() + timedelta(hours=1)).strftime("%H:%M")
+    user_now = datetime.now(ZoneInfo("Asia/Vladivostok"))
+    expected_time = (user_now + timedelta(hours=1)).strftime("%H:%M")
 
     async def mock_get_user(telegram_id: int):
         assert telegram_id == 888
-        return {"state": "WAIT_POSTPONE_TIME", "data_json": '{"postpone_task_id": 123}'}
+        return {
+            "state": "WAIT_POSTPONE_TIME",
+            "data_json": '{"postpone_task_id": 123}',
+            "timezone": "Asia/Vladivostok",
+        }
 
     async def mock_update_task(
         task_id: int, task_date: str, task_time: str, status: str
@@ -40,8 +47,10 @@ async def test_postpone_handler_callback():
         assert task_time == expected_time
         calls["update_task"] = True
 
-    async def mock_clear_user_state_and_temp_data(telegram_id: int):
+    async def mock_save_user_state_and_data(telegram_id: int, state, data):
         assert telegram_id == 888
+        assert state is None
+        assert data is None
         calls["clear_state"] = True
 
     async def mock_get_task_by_id(task_id: int):
@@ -68,7 +77,7 @@ async def test_postpone_handler_callback():
         {
             "get_user": mock_get_user,
             "update_task": mock_update_task,
-            "clear_user_state_and_temp_data": mock_clear_user_state_and_temp_data,
+            "save_user_state_and_data": mock_save_user_state_and_data,
             "get_task_by_id": mock_get_task_by_id,
         }
     )
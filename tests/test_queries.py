@@ -0,0 +1,36 @@
+import re
+
+from bot.infrastructure.queries import (
+    QUERIES,
+    SETTING_TIME_COLUMNS,
+    TASK_DATE_FILTERS,
+)
+
+
+def test_registry_expands_every_variant():
+    for filter_type in TASK_DATE_FILTERS:
+        assert f"get_tasks_by_filter:{filter_type}" in QUERIES
+        for cursor in ("first", "after", "before"):
+            assert f"get_tasks_page:{filter_type}:{cursor}" in QUERIES
+
+    for setting_type in SETTING_TIME_COLUMNS:
+        assert f"update_user_setting_time:{setting_type}" in QUERIES
+        assert f"get_scheduled_digests:{setting_type}" in QUERIES
+        assert f"mark_digest_sent:{setting_type}" in QUERIES
+
+
+def test_registry_parameters_are_numbered_without_gaps():
+    for name, query in QUERIES.items():
+        numbers = {int(n) for n in re.findall(r"\$(\d+)", query)}
+        assert numbers == set(range(1, len(numbers) + 1)), name
+
+
+def test_ensure_user_exists_inserts_settings_for_existing_users_too():
+    query = " ".join(QUERIES["ensure_user_exists"].split())
+
+    # Строка настроек не должна зависеть от того, вставился ли пользователь.
+    assert "FROM new_user" not in query
+    assert (
+        "INSERT INTO user_settings (telegram_id) VALUES ($1) "
+        "ON CONFLICT (telegram_id) DO NOTHING"
+    ) in query
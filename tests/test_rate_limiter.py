@@ -0,0 +1,78 @@
+import asyncio
+
+import pytest
+
+from bot.domain.messenger import MessagePriority
+from bot.infrastructure.rate_limiter import TelegramRateLimiter
+
+
+class FakeClock:
+    def __init__(self) -> None:
+        self.now = 0.0
+
+    def __call__(self) -> float:
+        return self.now
+
+    async def sleep(self, seconds: float) -> None:
+        self.now += seconds
+        await asyncio.sleep(0)
+
+
+@pytest.mark.asyncio
+async def test_rate_limiter_paces_one_chat():
+    clock = FakeClock()
+    limiter = TelegramRateLimiter(
+        private_chat_rate=1, private_chat_burst=3, clock=clock, sleep=clock.sleep
+    )
+
+    sent_at = []
+    for _ in range(5):
+        await limiter.acquire(42, MessagePriority.INTERACTIVE)
+        sent_at.append(round(clock.now, 3))
+
+    assert sent_at == [0, 0, 0, 1, 2]
+
+
+@pytest.mark.asyncio
+async def test_rate_limiter_uses_group_limits_for_negative_chat_ids():
+    clock = FakeClock()
+    limiter = TelegramRateLimiter(
+        group_chat_rate=20 / 60, group_chat_burst=1, clock=clock, sleep=clock.sleep
+    )
+
+    await limiter.acquire(-100, MessagePriority.INTERACTIVE)
+    await limiter.acquire(-100, MessagePriority.INTERACTIVE)
+
+    assert clock.now == pytest.approx(3)
+
+
+@pytest.mark.asyncio
+async def test_rate_limiter_enforces_global_limit():
+    clock = FakeClock()
+    limiter = TelegramRateLimiter(global_rate=30, clock=clock, sleep=clock.sleep)
+
+    for chat_id in range(60):
+        await limiter.acquire(chat_id, MessagePriority.BULK)
+
+    assert clock.now == pytest.approx(1)
+
+
+@pytest.mark.asyncio
+async def test_rate_limiter_serves_interactive_before_bulk():
+    limiter = TelegramRateLimiter(global_rate=50)
+    for chat_id in range(50):
+        await limiter.acquire(chat_id, MessagePriority.BULK)
+
+    order = []
+
+    async def send(chat_id: int, priority: MessagePriority):
+        await limiter.acquire(chat_id, priority)
+        order.append(priority)
+
+    await asyncio.gather(
+        send(100, MessagePriority.BULK),
+        send(101, MessagePriority.BULK),
+        send(102, MessagePriority.INTERACTIVE),
+    )
+
+    assert order[0] is MessagePriority.INTERACTIVE
@@ -0,0 +1,210 @@
+import asyncio
+import time
+from datetime import UTC, datetime, timedelta
+
+import pytest
+
+from bot.reminder_scheduler import ReminderScheduler, get_reminder_due_at
+from tests.mocks import Mock
+
+
+def _task(task_id: int, due_at: datetime, **fields) -> dict:
+    task = {
+        "id": task_id,
+        "telegram_id": 10,
+        "text": "Купить молоко",
+        "task_date": due_at.strftime("%Y-%m-%d"),
+        "task_time": due_at.strftime("%H:%M"),
+        "due_at": due_at,
+        "status": "active",
+        "notified": False,
+    }
+    task.update(fields)
+    return task
+
+
+def _storage(tasks: dict[int, dict], listeners: list) -> Mock:
+    async def mock_get_due_tasks(until: datetime):
+        return list(tasks.values())
+
+    async def mock_get_task_by_id(task_id: int):
+        return tasks.get(task_id)
+
+    async def mock_listen_task_changes(callback):
+        listeners.append(callback)
+
+    async def mock_unlisten_task_changes():
+        listeners.clear()
+
+    async def mock_claim_due_tasks(task_ids, now: datetime, lease: float):
+        claimed = []
+        for task_id in task_ids:
+            task = tasks.get(task_id)
+            due_at = get_reminder_due_at(task) if task else None
+            claimed_until = task.get("claimed_until") if task else None
+            if (
+                due_at
+                and due_at <= now
+                and (claimed_until is None or claimed_until < time.monotonic())
+            ):
+                task["claimed_until"] = time.monotonic() + lease
+                claimed.append(task)
+        return claimed
+
+    async def mock_extend_task_claims(task_ids, lease: float):
+        for task_id in task_ids:
+            task = tasks[task_id]
+            if not task["notified"] and task.get("claimed_until") is not None:
+                task["claimed_until"] = time.monotonic() + lease
+
+    return Mock(
+        {
+            "get_due_tasks": mock_get_due_tasks,
+            "get_task_by_id": mock_get_task_by_id,
+            "listen_task_changes": mock_listen_task_changes,
+            "unlisten_task_changes": mock_unlisten_task_changes,
+            "claim_due_tasks": mock_claim_due_tasks,
+            "extend_task_claims": mock_extend_task_claims,
+        }
+    )
+
+
+@pytest.mark.asyncio
+async def test_scheduler_fires_at_due_time_and_follows_changes():
+    base = datetime(2025, 1, 1, 9, 0, tzinfo=UTC)
+    clock = {"now": base}
+    tasks = {
+        1: _task(1, base),
+        2: _task(2, base + timedelta(minutes=1)),
+        3: _task(3, base + timedelta(minutes=1)),
+    }
+    listeners = []
+    fired = []
+
+    async def on_due(tasks: list[dict]):
+        fired.extend(task["id"] for task in tasks)
+
+    scheduler = ReminderScheduler(
+        _storage(tasks, listeners), on_due, now=lambda: clock["now"]
+    )
+    await scheduler.start()
+    await asyncio.sleep(0.01)
+    assert fired == [1]
+
+    # 2 — выполнена, 3 — перенесена на час.
+    tasks[2]["status"] = "completed"
+    tasks[3] = _task(3, base + timedelta(hours=1))
+    listeners[0](2)
+    listeners[0](3)
+    await asyncio.sleep(0.01)
+
+    clock["now"] = base + timedelta(minutes=1)
+    scheduler.schedule(4, base)
+    tasks[4] = _task(4, base)
+    await asyncio.sleep(0.01)
+    await scheduler.close()
+
+    assert fired == [1, 4]
+    assert len(scheduler) == 1
+
+
+@pytest.mark.asyncio
+async def test_schedulers_sharing_storage_send_reminder_once():
+    now = datetime(2025, 1, 1, 9, 0, tzinfo=UTC)
+    tasks = {1: _task(1, now)}
+    fired = []
+
+    async def on_due(tasks: list[dict]):
+        fired.extend(task["id"] for task in tasks)
+
+    schedulers = [
+        ReminderScheduler(_storage(tasks, []), on_due, now=lambda: now)
+        for _ in range(2)
+    ]
+    for scheduler in schedulers:
+        await scheduler.start()
+    await asyncio.sleep(0.01)
+    for scheduler in schedulers:
+        await scheduler.close()
+
+    assert fired == [1]
+
+
+@pytest.mark.asyncio
+async def test_scheduler_skips_task_changed_after_scheduling():
+    now = datetime(2025, 1, 1, 9, 0, tzinfo=UTC)
+    tasks = {1: _task(1, now, notified=True)}
+    fired = []
+
+    async def on_due(tasks: list[dict]):
+        fired.extend(task["id"] for task in tasks)
+
+    scheduler = ReminderScheduler(_storage(tasks, []), on_due, now=lambda: now)
+    scheduler.schedule(1, now)
+    await scheduler.start()
+    await asyncio.sleep(0.01)
+    await scheduler.close()
+
+    assert fired == []
+
+
+@pytest.mark.asyncio
+async def test_slow_delivery_outliving_lease_is_not_sent_twice():
+    now = datetime(2025, 1, 1, 9, 0, tzinfo=UTC)
+    tasks = {1: _task(1, now)}
+    fired = []
+
+    async def on_due(due: list[dict]):
+        fired.extend(task["id"] for task in due)
+        # Отправка стоит в очереди и повторяется дольше нескольких аренд.
+        await asyncio.sleep(0.3)
+        for task in due:
+            task["notified"] = True
+            task["claimed_until"] = None
+
+    def make_scheduler():
+        return ReminderScheduler(
+            _storage(tasks, []),
+            on_due,
+            refresh_interval=timedelta(seconds=0.02),
+            claim_lease=timedelta(seconds=0.05),
+            now=lambda: now,
+        )
+
+    first = make_scheduler()
+    await first.start()
+    await asyncio.sleep(0.15)
+    # Второй процесс видит задачу уже после того, как исходная аренда истекла.
+    second = make_scheduler()
+    await second.start()
+    await asyncio.sleep(0.25)
+    await first.close()
+    await second.close()
+
+    assert fired == [1]
+
+
+@pytest.mark.asyncio
+async def test_failed_reload_of_changed_task_keeps_schedule(caplog):
+    now = datetime(2025, 1, 1, 9, 0, tzinfo=UTC)
+    tasks = {1: _task(1, now + timedelta(minutes=5))}
+    listeners = []
+
+    async def on_due(tasks: list[dict]):
+        pass
+
+    async def mock_get_task_by_id(task_id: int):
+        raise ConnectionError("db is down")
+
+    storage = _storage(tasks, listeners)
+    storage.get_task_by_id = mock_get_task_by_id
+    scheduler = ReminderScheduler(storage, on_due, now=lambda: now)
+    await scheduler.start()
+
+    listeners[0](1)
+    await asyncio.sleep(0.01)
+    await scheduler.close()
+
+    assert len(scheduler) == 1
+    assert "reloading task 1 failed" in caplog.text
+    assert "ConnectionError: db is down" in caplog.text
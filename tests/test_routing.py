@@ -0,0 +1,102 @@
+import pytest
+
+from bot.dispatcher import Dispatcher
+from bot.handlers import (
+    DatabaseLogger,
+    EnsureUserExists,
+    TaskDateHandler,
+    get_handlers,
+)
+from bot.routing import RoutingTable
+
+STATES = [
+    None,
+    "WAIT_TASK_NAME",
+    "WAIT_TASK_DATE",
+    "WAIT_TASK_TIME",
+    "WAIT_POSTPONE_TIME",
+    "WAIT_SETTING_MORNING",
+    "WAIT_SETTING_EVENING",
+    "UNKNOWN_STATE",
+]
+
+TEXTS = [
+    "/start",
+    "➕ Добавить задачу",
+    "📅 Мои задачи",
+    "⚙️ Настройки",
+    "/settings",
+    "❓ Помощь",
+    "/help",
+    "14:30",
+    "Купить молоко",
+]
+
+CALLBACKS = [
+    "set_date_today",
+    "set_time_notime",
+    "set_morning",
+    "show_today",
+    "task_done:1",
+    "task_postpone:2",
+    "postpone:1h",
+    "unknown",
+]
+
+
+def _updates() -> list[dict]:
+    updates = [
+        {"update_id": 1, "message": {"from": {"id": 1}, "chat": {"id": 1}, "text": t}}
+        for t in TEXTS
+    ]
+    updates.append({"update_id": 2, "message": {"from": {"id": 1}, "chat": {"id": 1}}})
+    updates += [
+        {
+            "update_id": 3,
+            "callback_query": {
+                "id": "cb",
+                "from": {"id": 1},
+                "message": {"message_id": 1, "chat": {"id": 1}},
+                "data": data,
+            },
+        }
+        for data in CALLBACKS
+    ]
+    updates.append({"update_id": 4, "edited_message": {"text": "x"}})
+    return updates
+
+
+@pytest.mark.parametrize("state", STATES)
+def test_routing_table_matches_linear_scan(state):
+    handlers = get_handlers()
+    routes = RoutingTable(handlers)
+
+    for update in _updates():
+        expected = [h for h in handlers if h.can_handle(update, state, {}, None, None)]
+        routed = [
+            h
+            for h in routes.candidates(update, state)
+            if h.can_handle(update, state, {}, None, None)
+        ]
+        assert routed == expected
+
+
+def test_routing_table_skips_unrelated_handlers():
+    routes = RoutingTable(get_handlers())
+    update = {
+        "update_id": 1,
+        "message": {"from": {"id": 1}, "chat": {"id": 1}, "text": "/help"},
+    }
+
+    names = [type(h).__name__ for h in routes.candidates(update, None)]
+
+    assert names == ["DatabaseLogger", "EnsureUserExists", "MessageHelp"]
+
+
+def test_allowed_updates_come_from_handlers_that_consume_updates():
+    dispatcher = Dispatcher(None, None)
+    dispatcher.add_handlers(DatabaseLogger())
+    assert dispatcher.get_allowed_updates() == []
+
+    dispatcher.add_handlers(EnsureUserExists(), TaskDateHandler())
+    assert dispatcher.get_allowed_updates() == ["callback_query", "message"]
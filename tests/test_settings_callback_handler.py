@@ -26,9 +26,10 @@ async def test_settings_callback_handler_morning():
         assert telegram_id == 456
         return {"state": None, "data_json": "{}"}
 
-    async def mock_update_user_state(telegram_id: int, state: str):
+    async def mock_merge_user_state_and_data(telegram_id: int, state, data_patch):
         assert telegram_id == 456
         assert state == "WAIT_SETTING_MORNING"
+        assert data_patch == {}
         calls["update_state"] = True
 
     async def mock_edit_message_text(
@@ -47,7 +48,7 @@ async def test_settings_callback_handler_morning():
     mock_storage = Mock(
         {
             "get_user": mock_get_user,
-            "update_user_state": mock_update_user_state,
+            "merge_user_state_and_data": mock_merge_user_state_and_data,
         }
     )
     mock_messenger = Mock(
@@ -65,3 +66,53 @@ async def test_settings_callback_handler_morning():
 
     assert calls["update_state"]
     assert calls["send_message"]
+
+
+@pytest.mark.asyncio
+async def test_settings_callback_handler_timezone():
+    test_update = {
+        "update_id": 3,
+        "callback_query": {
+            "id": "cb_3",
+            "from": {"id": 456},
+            "message": {"message_id": 21, "chat": {"id": 456}},
+            "data": "set_tz:Asia/Novosibirsk",
+        },
+    }
+
+    calls = {"timezone": None, "edited_text": None}
+
+    async def mock_get_user(telegram_id: int):
+        return {"state": None, "data_json": "{}", "timezone": "Europe/Moscow"}
+
+    async def mock_update_user_timezone(telegram_id: int, timezone: str):
+        calls["timezone"] = (telegram_id, timezone)
+
+    async def mock_edit_message_text(
+        chat_id: int, message_id: int, text: str, **params
+    ):
+        calls["edited_text"] = text
+
+    async def mock_answer_callback_query(cb_id: str):
+        pass
+
+    mock_storage = Mock(
+        {
+            "get_user": mock_get_user,
+            "update_user_timezone": mock_update_user_timezone,
+        }
+    )
+    mock_messenger = Mock(
+        {
+            "edit_message_text": mock_edit_message_text,
+            "answer_callback_query": mock_answer_callback_query,
+        }
+    )
+
+    dispatcher = Dispatcher(mock_storage, mock_messenger)
+    dispatcher.add_handlers(SettingsCallbackHandler())
+
+    await dispatcher.dispatch(test_update)
+
+    assert calls["timezone"] == (456, "Asia/Novosibirsk")
+    assert "Новосибирск" in calls["edited_text"]
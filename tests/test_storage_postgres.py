@@ -0,0 +1,265 @@
+from datetime import UTC, date, datetime, time
+
+import asyncpg
+import pytest
+
+from bot.infrastructure.queries import QUERIES
+from bot.infrastructure.storage_postgres import (
+    PreparedConnection,
+    StoragePostgres,
+    _parse_date,
+    _parse_time,
+    _row_to_dict,
+)
+from tests.mocks import Mock
+
+
+def _storage_returning(rows: list[dict], calls: list) -> StoragePostgres:
+    storage = StoragePostgres()
+
+    async def mock_query(mode: str, name: str, *args):
+        calls.append((mode, name, args))
+        return rows
+
+    storage._query = mock_query
+    return storage
+
+
+class FakeConnection(PreparedConnection):
+    # Без сокета asyncpg: prepare отдаёт заглушку, которая один раз падает
+    # с InvalidCachedStatementError, как после миграции схемы.
+    def __init__(self, stale: set[str]) -> None:
+        self._prepared = {}
+        self.prepared_queries = []
+        self.stale = stale
+
+    def __del__(self) -> None:
+        pass
+
+    async def prepare(self, query: str):
+        self.prepared_queries.append(query)
+        stale, self.stale = self.stale, set()
+
+        async def fetchval(*args):
+            if query in stale:
+                raise asyncpg.InvalidCachedStatementError(
+                    "cached statement plan is invalid due to a database schema change"
+                )
+            return args
+
+        return Mock({"fetchval": fetchval})
+
+
+@pytest.mark.asyncio
+async def test_prepared_connection_reuses_statements():
+    conn = FakeConnection(stale=set())
+
+    assert await conn.run_query("fetchval", "get_user_timezone", 1) == (1,)
+    assert await conn.run_query("fetchval", "get_user_timezone", 2) == (2,)
+
+    assert conn.prepared_queries == [QUERIES["get_user_timezone"]]
+
+
+@pytest.mark.asyncio
+async def test_prepared_connection_reprepares_statement_invalidated_by_migration():
+    query = QUERIES["get_user_timezone"]
+    conn = FakeConnection(stale={query})
+
+    assert await conn.run_query("fetchval", "get_user_timezone", 1) == (1,)
+
+    assert conn.prepared_queries == [query, query]
+
+
+@pytest.mark.asyncio
+async def test_timed_logs_arguments_and_reraises_errors(caplog):
+    storage = StoragePostgres()
+
+    async def mock_query(mode: str, name: str, *args):
+        raise ConnectionError("db is down")
+
+    storage._query = mock_query
+
+    with pytest.raises(ConnectionError):
+        await storage.get_tasks_page(10, "show_today", 11, after=("~", 7))
+    with pytest.raises(ConnectionError):
+        await storage.mark_tasks_as_notified(list(range(1, 8)))
+
+    errors = [r.message for r in caplog.records if r.levelname == "ERROR"]
+    assert errors[0].startswith(
+        "[DB] ✗ get_tasks_page (telegram_id=10, filter_type=show_today, "
+        "limit=11, after=('~', 7)) - "
+    )
+    assert errors[0].endswith("Error: db is down")
+    assert errors[1].startswith(
+        "[DB] ✗ mark_tasks_as_notified (task_ids=[1,2,3,4,5,…+2])"
+    )
+
+
+def test_storage_boundary_converts_dates_and_times():
+    assert _parse_date("2025-01-02") == date(2025, 1, 2)
+    assert _parse_time("09:05") == time(9, 5)
+    assert _parse_date(None) is None and _parse_time(None) is None
+    assert _parse_date("") is None and _parse_time("") is None
+
+    due_at = datetime(2025, 1, 2, 6, 5, tzinfo=UTC)
+    row = {
+        "id": 1,
+        "task_date": date(2025, 1, 2),
+        "task_time": time(9, 5),
+        "due_at": due_at,
+        "data_json": {"date": "2025-01-02"},
+        "text": None,
+    }
+
+    assert _row_to_dict(row) == {
+        "id": 1,
+        "task_date": "2025-01-02",
+        "task_time": "09:05",
+        "due_at": due_at,
+        "data_json": {"date": "2025-01-02"},
+        "text": None,
+    }
+
+
+@pytest.mark.asyncio
+async def test_tasks_page_cursor_without_time_maps_to_end_of_day():
+    calls = []
+    storage = _storage_returning([], calls)
+
+    await storage.get_tasks_page(10, "show_today", 11, after=("~", 7))
+    await storage.get_tasks_page(10, "show_today", 11, after=("09:30", 5))
+
+    # '~' уходит в запрос как NULL, а запрос сравнивает его как TIME '24:00' —
+    # так же, как задачи без времени в ключе сортировки.
+    assert calls == [
+        ("fetch", "get_tasks_page:show_today:after", (10, None, 7, 11)),
+        ("fetch", "get_tasks_page:show_today:after", (10, time(9, 30), 5, 11)),
+    ]
+    query = QUERIES["get_tasks_page:show_today:after"]
+    assert "COALESCE(task_time, TIME '24:00')" in query
+    assert "COALESCE($2::time, TIME '24:00')" in query
+
+
+@pytest.mark.asyncio
+async def test_tasks_page_before_cursor_is_read_backwards_and_reversed():
+    rows = [{"id": 3, "task_time": None}, {"id": 2, "task_time": time(18, 0)}]
+    calls = []
+    storage = _storage_returning(rows, calls)
+
+    page = await storage.get_tasks_page(10, "show_nodate", 11, before=("~", 4))
+
+    assert calls == [("fetch", "get_tasks_page:show_nodate:before", (10, None, 4, 11))]
+    assert "DESC" in QUERIES["get_tasks_page:show_nodate:before"]
+    assert page == [{"id": 2, "task_time": "18:00"}, {"id": 3, "task_time": None}]
+
+
+@pytest.mark.asyncio
+async def test_get_scheduled_digests_groups_left_join_rows_by_user():
+    # Пользователь 1 без задач приходит одной строкой с NULL из LEFT JOIN,
+    # у пользователя 2 — по строке на задачу.
+    empty_task = {"id": None, "text": None, "task_date": None, "task_time": None}
+    rows = [
+        {"telegram_id": 1, "local_date": "2025-01-01", **empty_task, "status": None},
+        {
+            "telegram_id": 2,
+            "local_date": "2025-01-01",
+            "id": 20,
+            "text": "Позвонить",
+            "task_date": date(2025, 1, 1),
+            "task_time": time(9, 30),
+            "status": "active",
+        },
+        {
+            "telegram_id": 2,
+            "local_date": "2025-01-01",
+            "id": 21,
+            "text": "Купить молоко",
+            "task_date": None,
+            "task_time": None,
+            "status": "active",
+        },
+    ]
+    calls = []
+    storage = _storage_returning(rows, calls)
+
+    digests = await storage.get_scheduled_digests(
+        "morning_digest_time",
+        [
+            {
+                "timezone": "Europe/Moscow",
+                "window_start": "08:00",
+                "window_end": "09:00",
+                "local_date": "2025-01-01",
+                "task_date": "2025-01-01",
+            }
+        ],
+        include_undated=True,
+    )
+
+    assert digests == [
+        {"telegram_id": 1, "local_date": "2025-01-01", "tasks": []},
+        {
+            "telegram_id": 2,
+            "local_date": "2025-01-01",
+            "tasks": [
+                {
+                    "id": 20,
+                    "text": "Позвонить",
+                    "task_date": "2025-01-01",
+                    "task_time": "09:30",
+                    "status": "active",
+                },
+                {
+                    "id": 21,
+                    "text": "Купить молоко",
+                    "task_date": None,
+                    "task_time": None,
+                    "status": "active",
+                },
+            ],
+        },
+    ]
+    assert calls[0][1] == "get_scheduled_digests:morning_digest_time"
+    assert calls[0][2] == (
+        ["Europe/Moscow"],
+        [time(8, 0)],
+        [time(9, 0)],
+        [date(2025, 1, 1)],
+        [date(2025, 1, 1)],
+        True,
+    )
+
+
+@pytest.mark.asyncio
+async def test_check_leadership_looks_up_the_session_lock():
+    calls = {"query": [], "released": 0}
+
+    async def mock_run_query(mode: str, name: str, *args):
+        calls["query"].append((mode, name, args))
+        return False
+
+    async def mock_release(conn):
+        calls["released"] += 1
+
+    storage = StoragePostgres()
+    storage._pool = Mock({"release": mock_release})
+    storage._leader_conn = Mock({"run_query": mock_run_query})
+    storage._leader_lock = "todo_bot_notifier"
+
+    # Соединение живо, но lock в pg_locks уже не числится за сессией.
+    assert not await storage.check_leadership()
+    assert calls["query"] == [("fetchval", "check_leadership", ("todo_bot_notifier",))]
+    assert calls["released"] == 1
+    assert storage._leader_conn is None and storage._leader_lock is None
+    assert "pg_locks" in QUERIES["check_leadership"]
+
+
+@pytest.mark.asyncio
+async def test_update_tasks_status_completes_tasks_in_one_statement():
+    calls = []
+    storage = _storage_returning([], calls)
+
+    await storage.update_tasks_status([3, 5, 8], "done")
+
+    assert calls == [("fetch", "update_tasks_status", ("done", [3, 5, 8]))]
+    assert "id = ANY($2::int[])" in QUERIES["update_tasks_status"]
@@ -0,0 +1,29 @@
+import json
+
+from bot.handlers.tools.task_card import (
+    MAX_LIST_BUTTONS,
+    MAX_MESSAGE_LENGTH,
+    format_task_list_messages,
+)
+
+
+def test_task_list_is_split_by_length_and_button_count():
+    tasks = [
+        {"id": n, "text": "x" * 300, "task_time": "10:00", "status": "active"}
+        for n in range(1, 31)
+    ] + [
+        {"id": n, "text": "Коротко", "task_time": None, "status": "active"}
+        for n in range(31, 121)
+    ]
+
+    messages = format_task_list_messages("☀️ Утренний дайджест\n", tasks)
+
+    assert len(messages) > 1
+    numbers = []
+    for text, markup in messages:
+        assert len(text) <= MAX_MESSAGE_LENGTH
+        buttons = [b for row in json.loads(markup)["inline_keyboard"] for b in row]
+        assert len(buttons) <= MAX_LIST_BUTTONS
+        numbers.extend(int(b["text"]) for b in buttons)
+    assert numbers == list(range(1, 121))
+    assert messages[0][0].startswith("☀️ Утренний дайджест")
@@ -18,8 +18,7 @@ async def test_task_date_handler():
     }
 
     calls = {
-        "update_data": False,
-        "update_state": False,
+        "save_user": 0,
         "edit_message": False,
     }
 
@@ -27,16 +26,12 @@ async def test_task_date_handler():
         assert telegram_id == 333
         return {"state": "WAIT_TASK_DATE", "data_json": '{"text": "Купить молоко"}'}
 
-    async def mock_update_user_data(telegram_id: int, data: dict):
-        assert telegram_id == 333
-        assert data["text"] == "Купить молоко"
-        assert "date" in data
-        calls["update_data"] = True
-
-    async def mock_update_user_state(telegram_id: int, state: str):
+    async def mock_merge_user_state_and_data(telegram_id: int, state, data_patch):
         assert telegram_id == 333
         assert state == "WAIT_TASK_TIME"
-        calls["update_state"] = True
+        # Название уже лежит в data_json, отправляется только новый ключ.
+        assert list(data_patch) == ["date"]
+        calls["save_user"] += 1
 
     async def mock_edit_message_text(
         chat_id: int, message_id: int, text: str, **params
@@ -51,8 +46,7 @@ async def test_task_date_handler():
     mock_storage = Mock(
         {
             "get_user": mock_get_user,
-            "update_user_data": mock_update_user_data,
-            "update_user_state": mock_update_user_state,
+            "merge_user_state_and_data": mock_merge_user_state_and_data,
         }
     )
     mock_messenger = Mock(
@@ -67,6 +61,5 @@ async def test_task_date_handler():
 
     await dispatcher.dispatch(test_update)
 
-    assert calls["update_data"]
-    assert calls["update_state"]
+    assert calls["save_user"] == 1
     assert calls["edit_message"]
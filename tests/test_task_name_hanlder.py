@@ -2,8 +2,8 @@ import pytest
 
 from bot.dispatcher import Dispatcher
 from bot.handlers.state_handlers.task_name_handler import TaskNameHandler
-from tests.mocks import Mock
 from bot.interface.keyboards import TASK_DATE_KEYBOARD
+from tests.mocks import Mock
 
 
 @pytest.mark.asyncio
@@ -19,8 +19,7 @@ async def test_task_name_handler():
     }
 
     calls = {
-        "update_data": False,
-        "update_state": False,
+        "save_user": 0,
         "send_message": False,
     }
 
@@ -28,15 +27,11 @@ async def test_task_name_handler():
         assert telegram_id == 222
         return {"state": "WAIT_TASK_NAME", "data_json": "{}"}
 
-    async def mock_update_user_data(telegram_id: int, data: dict):
-        assert telegram_id == 222
-        assert data == {"text": "Купить молоко"}
-        calls["update_data"] = True
-
-    async def mock_update_user_state(telegram_id: int, state: str):
+    async def mock_merge_user_state_and_data(telegram_id: int, state, data_patch):
         assert telegram_id == 222
         assert state == "WAIT_TASK_DATE"
-        calls["update_state"] = True
+        assert data_patch == {"text": "Купить молоко"}
+        calls["save_user"] += 1
 
     async def mock_send_message(chat_id: int, text: str, **params):
         assert chat_id == 222
@@ -48,8 +43,7 @@ async def test_task_name_handler():
     mock_storage = Mock(
         {
             "get_user": mock_get_user,
-            "update_user_data": mock_update_user_data,
-            "update_user_state": mock_update_user_state,
+            "merge_user_state_and_data": mock_merge_user_state_and_data,
         }
     )
     mock_messenger = Mock({"send_message": mock_send_message})
@@ -59,6 +53,5 @@ async def test_task_name_handler():
 
     await dispatcher.dispatch(test_update)
 
-    assert calls["update_data"]
-    assert calls["update_state"]
+    assert calls["save_user"] == 1
     assert calls["send_message"]
@@ -41,8 +41,10 @@ async def test_task_no_time_handler():
         calls["create_task"] = True
         return 100
 
-    async def mock_clear_user_state_and_temp_data(telegram_id: int):
+    async def mock_save_user_state_and_data(telegram_id: int, state, data):
         assert telegram_id == 555
+        assert state is None
+        assert data is None
         calls["clear_state"] = True
 
     async def mock_edit_message_text(
@@ -63,7 +65,7 @@ async def test_task_no_time_handler():
         {
             "get_user": mock_get_user,
             "create_task": mock_create_task,
-            "clear_user_state_and_temp_data": mock_clear_user_state_and_temp_data,
+            "save_user_state_and_data": mock_save_user_state_and_data,
         }
     )
     mock_messenger = Mock(
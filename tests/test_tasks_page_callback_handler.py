@@ -0,0 +1,97 @@
+import json
+
+import pytest
+
+from bot.dispatcher import Dispatcher
+from bot.handlers.tools.tasks_page_callback_handler import TasksPageCallbackHandler
+from tests.mocks import Mock
+
+
+def _callback_update(data: str) -> dict:
+    return {
+        "update_id": 2001,
+        "callback_query": {
+            "id": "cb1",
+            "from": {"id": 111},
+            "message": {"message_id": 42, "chat": {"id": 111}},
+            "data": data,
+        },
+    }
+
+
+def _make_tasks(count: int, first_id: int = 1) -> list[dict]:
+    return [
+        {
+            "id": task_id,
+            "text": f"Задача {task_id}",
+            "task_time": f"{task_id:02d}:30",
+            "status": "active",
+        }
+        for task_id in range(first_id, first_id + count)
+    ]
+
+
+async def _dispatch(data: str, tasks: list[dict]) -> dict:
+    calls = {"get_tasks": [], "edit": []}
+
+    async def mock_get_user(telegram_id: int):
+        return {"state": None, "data_json": "{}"}
+
+    async def mock_get_tasks_page(
+        telegram_id: int, filter_type: str, limit: int, after=None, before=None
+    ):
+        calls["get_tasks"].append((filter_type, limit, after, before))
+        return tasks
+
+    async def mock_answer_callback_query(callback_query_id: str, **params):
+        return {"ok": True}
+
+    async def mock_edit_message_text(
+        chat_id: int, message_id: int, text: str, **params
+    ):
+        assert (chat_id, message_id) == (111, 42)
+        calls["edit"].append(
+            {"text": text, "keyboard": json.loads(params["reply_markup"])}
+        )
+        return {"ok": True}
+
+    storage = Mock({"get_user": mock_get_user, "get_tasks_page": mock_get_tasks_page})
+    messenger = Mock(
+        {
+            "answer_callback_query": mock_answer_callback_query,
+            "edit_message_text": mock_edit_message_text,
+        }
+    )
+    dispatcher = Dispatcher(storage, messenger)
+    dispatcher.add_handlers(TasksPageCallbackHandler())
+    await dispatcher.dispatch(_callback_update(data))
+    return calls
+
+
+@pytest.mark.asyncio
+async def test_tasks_page_next_uses_cursor_and_edits_in_place():
+    calls = await _dispatch("tasks_page:tomorrow:n:10:10:30", _make_tasks(11, 11))
+
+    assert calls["get_tasks"] == [("show_tomorrow", 11, ("10:30", 10), None)]
+    assert len(calls["edit"]) == 1
+    edit = calls["edit"][0]
+    assert "➡️ Задачи на завтра:" in edit["text"]
+    assert "1. [11:30] Задача 11" in edit["text"]
+    assert "Задача 21" not in edit["text"]
+
+    navigation = edit["keyboard"]["inline_keyboard"][-2]
+    assert [b["callback_data"] for b in navigation] == [
+        "tasks_page:tomorrow:p:11:11:30",
+        "tasks_page:tomorrow:n:20:20:30",
+    ]
+
+
+@pytest.mark.asyncio
+async def test_tasks_page_prev_keeps_last_rows_and_stops_at_first_page():
+    calls = await _dispatch("tasks_page:today:p:11:11:30", _make_tasks(10))
+
+    assert calls["get_tasks"] == [("show_today", 11, None, ("11:30", 11))]
+    keyboard = calls["edit"][0]["keyboard"]["inline_keyboard"]
+    navigation = keyboard[-2]
+    assert [b["text"] for b in navigation] == ["▶️"]
+    assert keyboard[-1][0]["text"].startswith("• ")
@@ -0,0 +1,129 @@
+import asyncio
+
+import pytest
+
+from bot.update_log_writer import UpdateLogWriter
+from tests.mocks import Mock
+
+
+@pytest.mark.asyncio
+async def test_update_log_writer_flushes_full_batches():
+    batches = []
+
+    async def mock_persist_updates(updates: list[dict]):
+        batches.append([u["update_id"] for u in updates])
+
+    writer = UpdateLogWriter(
+        Mock({"persist_updates": mock_persist_updates}),
+        batch_size=2,
+        flush_interval_ms=10_000,
+    )
+    writer.start()
+
+    for update_id in range(5):
+        await writer.add({"update_id": update_id})
+    await asyncio.sleep(0.01)
+
+    assert batches[0] == [0, 1]
+
+    await writer.close()
+
+    assert [update_id for batch in batches for update_id in batch] == [0, 1, 2, 3, 4]
+
+
+@pytest.mark.asyncio
+async def test_update_log_writer_flushes_on_interval():
+    batches = []
+
+    async def mock_persist_updates(updates: list[dict]):
+        batches.append(len(updates))
+
+    writer = UpdateLogWriter(
+        Mock({"persist_updates": mock_persist_updates}),
+        batch_size=100,
+        flush_interval_ms=10,
+    )
+    writer.start()
+
+    await writer.add({"update_id": 1})
+    await asyncio.sleep(0.05)
+
+    assert batches == [1]
+    await writer.close()
+
+
+@pytest.mark.asyncio
+async def test_update_log_writer_keeps_updates_when_storage_fails():
+    state = {"fail": True, "saved": []}
+
+    async def mock_persist_updates(updates: list[dict]):
+        if state["fail"]:
+            raise ConnectionError("db is down")
+        state["saved"] += updates
+
+    writer = UpdateLogWriter(
+        Mock({"persist_updates": mock_persist_updates}),
+        batch_size=10,
+        max_buffer_size=10,
+    )
+
+    for update_id in range(12):
+        await writer.add({"update_id": update_id})
+
+    state["fail"] = False
+    await writer.close()
+
+    assert [u["update_id"] for u in state["saved"]] == list(range(2, 12))
+
+
+@pytest.mark.asyncio
+async def test_update_log_writer_add_does_not_wait_for_storage():
+    calls = {"persist": 0}
+    storage_down = asyncio.Event()
+
+    async def mock_persist_updates(updates: list[dict]):
+        calls["persist"] += 1
+        await storage_down.wait()
+        raise ConnectionError("db is down")
+
+    writer = UpdateLogWriter(
+        Mock({"persist_updates": mock_persist_updates}),
+        batch_size=2,
+        max_buffer_size=4,
+    )
+    writer.start()
+
+    for update_id in range(10):
+        await asyncio.wait_for(writer.add({"update_id": update_id}), timeout=0.1)
+    await asyncio.sleep(0.01)
+
+    # Фоновая запись висит на первой пачке, а add не ждёт её.
+    assert calls["persist"] == 1
+
+    storage_down.set()
+    await writer.close()
+
+
+@pytest.mark.asyncio
+async def test_update_log_writer_close_waits_for_flush_in_flight():
+    saved = []
+
+    async def mock_persist_updates(updates: list[dict]):
+        await asyncio.sleep(0.05)
+        saved.extend(u["update_id"] for u in updates)
+
+    writer = UpdateLogWriter(
+        Mock({"persist_updates": mock_persist_updates}),
+        batch_size=2,
+        flush_interval_ms=10_000,
+    )
+    writer.start()
+
+    for update_id in range(3):
+        await writer.add({"update_id": update_id})
+    await asyncio.sleep(0.01)
+
+    # Пачка [0, 1] уже вынута из буфера и пишется, когда приходит close.
+    await writer.close()
+
+    assert saved == [0, 1, 2]
@@ -0,0 +1,100 @@
+import asyncio
+
+import pytest
+
+from bot.keyed_executor import KeyedExecutor
+from bot.update_offset_tracker import UpdateOffsetTracker
+from bot.update_queue import drain_updates
+from tests.mocks import Mock
+
+
+def _storage(saved: list, last_update_id: int = 0) -> Mock:
+    async def mock_get_update_offset() -> int:
+        return last_update_id
+
+    async def mock_save_update_offset(update_id: int):
+        saved.append(update_id)
+
+    return Mock(
+        {
+            "get_update_offset": mock_get_update_offset,
+            "save_update_offset": mock_save_update_offset,
+        }
+    )
+
+
+@pytest.mark.asyncio
+async def test_offset_tracker_commits_only_contiguous_prefix():
+    saved = []
+    tracker = UpdateOffsetTracker(_storage(saved, last_update_id=10))
+
+    assert await tracker.load() == 11
+    for update_id in (11, 12, 13):
+        assert tracker.begin(update_id)
+
+    tracker.finish(13)
+    tracker.finish(11)
+    await tracker.checkpoint()
+    tracker.finish(12)
+    await tracker.checkpoint()
+    await tracker.checkpoint()
+
+    assert saved == [11, 13]
+
+
+@pytest.mark.asyncio
+async def test_offset_tracker_skips_redelivered_updates():
+    saved = []
+    tracker = UpdateOffsetTracker(_storage(saved, last_update_id=10))
+    await tracker.load()
+
+    assert not tracker.begin(9)
+    assert tracker.begin(15)
+    assert not tracker.begin(15)
+
+
+@pytest.mark.asyncio
+async def test_drain_updates_dispatches_duplicate_once_and_checkpoints():
+    saved = []
+    dispatched = []
+    tracker = UpdateOffsetTracker(_storage(saved))
+    await tracker.load()
+
+    async def mock_dispatch(update: dict):
+        dispatched.append(update["update_id"])
+        if update["update_id"] == 2:
+            raise RuntimeError("boom")
+
+    dispatcher = Mock(
+        {"dispatch": mock_dispatch, "_get_telegram_id_from_update": lambda u: None}
+    )
+    queue: asyncio.Queue = asyncio.Queue()
+    for update_id in (1, 2, 1, 3):
+        queue.put_nowait({"update_id": update_id})
+
+    executor = KeyedExecutor(4)
+    drainer = asyncio.create_task(drain_updates(queue, dispatcher, executor, tracker))
+    await queue.join()
+    await executor.join()
+    drainer.cancel()
+    await tracker.close()
+
+    assert sorted(dispatched) == [1, 2, 3]
+    assert saved == [3]
+
+
+@pytest.mark.asyncio
+async def test_offset_tracker_accepts_out_of_order_webhook_delivery():
+    saved = []
+    tracker = UpdateOffsetTracker(_storage(saved, last_update_id=3))
+    await tracker.load(ordered=False)
+
+    assert tracker.begin(5)
+    tracker.finish(5)
+    await tracker.checkpoint()
+
+    # 4 пришёл после уже сохранённого 5 — это не повтор.
+    assert tracker.begin(4)
+    assert not tracker.begin(5)
+    assert not tracker.begin(4)
+    assert saved == [5]
@@ -0,0 +1,108 @@
+import pytest
+
+from bot.user_context import UserContext
+from tests.mocks import Mock
+
+
+@pytest.mark.asyncio
+async def test_user_context_flushes_once():
+    saved = []
+
+    async def mock_merge_user_state_and_data(telegram_id: int, state, data_patch):
+        saved.append((telegram_id, state, data_patch))
+
+    storage = Mock({"merge_user_state_and_data": mock_merge_user_state_and_data})
+    context = UserContext(storage, 1, {"state": None, "data_json": None})
+
+    await context.update_user_data(1, {"text": "Купить молоко"})
+    await context.update_user_state(1, "WAIT_TASK_DATE")
+    await context.update_user_data(1, {"date": "2025-01-01"})
+    await context.flush()
+    await context.flush()
+
+    assert saved == [
+        (1, "WAIT_TASK_DATE", {"text": "Купить молоко", "date": "2025-01-01"})
+    ]
+
+
+@pytest.mark.asyncio
+async def test_user_context_skips_noop_and_delegates_other_users():
+    calls = {"save_user": 0, "other_state": None}
+
+    async def mock_save_user_state_and_data(telegram_id: int, state, data):
+        calls["save_user"] += 1
+
+    async def mock_update_user_state(telegram_id: int, state):
+        calls["other_state"] = (telegram_id, state)
+
+    storage = Mock(
+        {
+            "save_user_state_and_data": mock_save_user_state_and_data,
+            "update_user_state": mock_update_user_state,
+        }
+    )
+    context = UserContext(storage, 1, {"state": None, "data_json": "{}"})
+
+    await context.clear_user_state_and_temp_data(1)
+    await context.update_user_state(2, "WAIT_TASK_NAME")
+    await context.flush()
+
+    assert calls["save_user"] == 0
+    assert calls["other_state"] == (2, "WAIT_TASK_NAME")
+
+
+@pytest.mark.asyncio
+async def test_user_context_accepts_jsonb_dict():
+    saved = []
+
+    async def mock_merge_user_state_and_data(telegram_id: int, state, data_patch):
+        saved.append(data_patch)
+
+    storage = Mock({"merge_user_state_and_data": mock_merge_user_state_and_data})
+    data_json = {"text": "Купить молоко"}
+    context = UserContext(storage, 1, {"state": None, "data_json": data_json})
+
+    await context.update_user_data(1, {"date": None})
+    await context.flush()
+
+    assert data_json == {"text": "Купить молоко"}
+    assert saved == [{"date": None}]
+    assert (await context.get_user(1))["data_json"] == {
+        "text": "Купить молоко",
+        "date": None,
+    }
+
+
+@pytest.mark.asyncio
+async def test_user_context_merges_changed_keys_and_overwrites_after_clear():
+    calls = []
+
+    async def mock_merge_user_state_and_data(telegram_id: int, state, data_patch):
+        calls.append(("merge", state, data_patch))
+
+    async def mock_save_user_state_and_data(telegram_id: int, state, data):
+        calls.append(("save", state, data))
+
+    storage = Mock(
+        {
+            "merge_user_state_and_data": mock_merge_user_state_and_data,
+            "save_user_state_and_data": mock_save_user_state_and_data,
+        }
+    )
+    user = {"state": "WAIT_TASK_DATE", "data_json": {"text": "Купить молоко"}}
+    context = UserContext(storage, 1, user)
+
+    # Только новый ключ: остальное в data_json сливается на стороне базы.
+    await context.update_user_data(1, {"date": "2025-01-01"})
+    await context.update_user_state(1, "WAIT_TASK_TIME")
+    await context.flush()
+
+    # После clear ключи надо удалить, поэтому колонка перезаписывается.
+    await context.clear_user_state_and_temp_data(1)
+    await context.update_user_data(1, {"postpone_task_id": 7})
+    await context.flush()
+
+    assert calls == [
+        ("merge", "WAIT_TASK_TIME", {"date": "2025-01-01"}),
+        ("save", None, {"postpone_task_id": 7}),
+    ]
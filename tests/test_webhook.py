@@ -0,0 +1,83 @@
+import asyncio
+
+import pytest
+from aiohttp.test_utils import TestClient, TestServer
+
+from bot.dispatcher import Dispatcher
+from bot.keyed_executor import KeyedExecutor
+from bot.update_queue import drain_updates
+from bot.webhook import SECRET_TOKEN_HEADER, create_webhook_app
+from tests.mocks import Mock
+
+TEST_UPDATE = {
+    "update_id": 2001,
+    "message": {
+        "message_id": 1,
+        "from": {"id": 123},
+        "chat": {"id": 123},
+        "text": "/help",
+    },
+}
+
+
+@pytest.mark.asyncio
+async def test_webhook_accepts_update_with_secret_token():
+    queue = asyncio.Queue(maxsize=10)
+    async with TestClient(TestServer(create_webhook_app(queue, "s3cret"))) as client:
+        response = await client.post(
+            "/webhook", json=TEST_UPDATE, headers={SECRET_TOKEN_HEADER: "s3cret"}
+        )
+
+    assert response.status == 200
+    assert queue.get_nowait() == TEST_UPDATE
+
+
+@pytest.mark.asyncio
+async def test_webhook_rejects_wrong_secret_token():
+    queue = asyncio.Queue(maxsize=10)
+    async with TestClient(TestServer(create_webhook_app(queue, "s3cret"))) as client:
+        response = await client.post(
+            "/webhook", json=TEST_UPDATE, headers={SECRET_TOKEN_HEADER: "wrong"}
+        )
+
+    assert response.status == 401
+    assert queue.empty()
+
+
+@pytest.mark.asyncio
+async def test_webhook_asks_telegram_to_retry_when_queue_is_full():
+    queue = asyncio.Queue(maxsize=1)
+    async with TestClient(TestServer(create_webhook_app(queue, None))) as client:
+        first = await client.post("/webhook", json=TEST_UPDATE)
+        second = await client.post("/webhook", json=TEST_UPDATE)
+
+    assert first.status == 200
+    assert second.status == 503
+
+
+@pytest.mark.asyncio
+async def test_webhook_updates_reach_dispatcher():
+    queue = asyncio.Queue(maxsize=10)
+    dispatched = []
+
+    async def mock_get_user(telegram_id: int):
+        return {"state": None, "data_json": "{}"}
+
+    dispatcher = Dispatcher(Mock({"get_user": mock_get_user}), Mock({}))
+
+    async def mock_dispatch(update: dict):
+        dispatched.append(update["update_id"])
+
+    dispatcher.dispatch = mock_dispatch
+    executor = KeyedExecutor(max_concurrency=2)
+    drainer = asyncio.create_task(drain_updates(queue, dispatcher, executor))
+
+    async with TestClient(TestServer(create_webhook_app(queue, None))) as client:
+        for update_id in (1, 2, 3):
+            await client.post("/webhook", json={**TEST_UPDATE, "update_id": update_id})
+
+    await queue.join()
+    await executor.join()
+    drainer.cancel()
+
+    assert dispatched == [1, 2, 3]